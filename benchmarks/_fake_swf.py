@@ -0,0 +1,309 @@
+"""In-process fake SWF service, for driving deciders under load."""
+
+import time
+import uuid
+import typing as t
+import threading
+import collections
+
+
+class _Execution:
+    def __init__(self, workflow_id: str, workflow_type: t.Dict[str, str]):
+        self.workflow_id = workflow_id
+        self.run_id = uuid.uuid4().hex
+        self.workflow_type = workflow_type
+        self.events = []
+        self.started_event_id = 0
+        self.decision_in_flight = False
+        self.decision_needed = False
+        self.closed = False
+        self.start_time = time.perf_counter()
+        self.close_time = None
+
+    def add(self, event_type: str, attrs: t.Dict[str, t.Any]) -> int:
+        event_id = len(self.events) + 1
+        attr_key = event_type[0].lower() + event_type[1:] + "EventAttributes"
+        event = {
+            "eventId": event_id,
+            "eventType": event_type,
+            "eventTimestamp": time.time(),
+            attr_key: attrs,
+        }
+        self.events.append(event)
+        return event_id
+
+
+class FakeSWF:
+    """Fake SWF client, for a single domain and decider task-list.
+
+    Implements the client methods used by deciders and activity workers,
+    with long-polling, history pagination (including reverse order), and
+    one in-flight decision task per workflow execution. Decision task
+    poll-to-respond latencies are recorded.
+
+    Unlike SWF, a decision task's scheduled event is recorded when the
+    task is polled for, immediately before its started event, so events
+    never land between the two.
+
+    Args:
+        page_size: default maximum number of history events per page
+        poll_timeout: long-poll time-out (seconds)
+    """
+
+    def __init__(self, page_size: int = 1000, poll_timeout: float = 0.1):
+        self.page_size = page_size
+        self.poll_timeout = poll_timeout
+        self.executions = {}
+        self.n_open = 0
+        self.n_decision_tasks = 0
+        self.n_decisions = 0
+        self.decision_latencies = []
+        self._decision_queue = collections.deque()
+        self._activity_queue = collections.deque()
+        self._decision_poll_times = {}
+        self._lock = threading.Lock()
+        self._decision_available = threading.Condition(self._lock)
+        self._activity_available = threading.Condition(self._lock)
+        self._all_closed = threading.Condition(self._lock)
+
+    def _request_decision(self, execution: _Execution):
+        if execution.closed:
+            return
+        if execution.decision_in_flight:
+            execution.decision_needed = True
+            return
+        execution.decision_in_flight = True
+        execution.decision_needed = False
+        self._decision_queue.append(execution)
+        self._decision_available.notify()
+
+    def start_workflow_execution(
+        self,
+        domain: str,
+        workflowId: str,
+        workflowType: t.Dict[str, str],
+        input: str = None,
+        **_,
+    ) -> t.Dict[str, str]:
+        """Start a workflow execution."""
+        execution = _Execution(workflowId, workflowType)
+        with self._lock:
+            execution.add(
+                "WorkflowExecutionStarted",
+                {"workflowType": workflowType, "input": input},
+            )
+            self.executions[execution.run_id] = execution
+            self.n_open += 1
+            self._request_decision(execution)
+        return {"runId": execution.run_id}
+
+    def _get_page(
+        self,
+        execution: _Execution,
+        started_event_id: int,
+        offset: int,
+        page_size: int,
+        reverse: bool,
+    ) -> t.Dict[str, t.Any]:
+        stop = min(offset + page_size, started_event_id)
+        if reverse:
+            events = execution.events[
+                started_event_id - stop : started_event_id - offset
+            ]
+            events.reverse()
+        else:
+            events = execution.events[offset:stop]
+        page = {"events": events}
+        if stop < started_event_id:
+            page_token = (execution.run_id, started_event_id, stop, page_size, reverse)
+            page["nextPageToken"] = "|".join(map(str, page_token))
+        return page
+
+    def poll_for_decision_task(
+        self,
+        domain: str,
+        taskList: t.Dict[str, str],
+        identity: str = None,
+        nextPageToken: str = None,
+        maximumPageSize: int = None,
+        reverseOrder: bool = False,
+    ) -> t.Dict[str, t.Any]:
+        """Poll for a decision task, or for a page of a task's history."""
+        if nextPageToken:
+            run_id, started_event_id, offset, page_size, reverse = nextPageToken.split(
+                "|"
+            )
+            with self._lock:
+                return self._get_page(
+                    self.executions[run_id],
+                    int(started_event_id),
+                    int(offset),
+                    int(page_size),
+                    reverse == "True",
+                )
+
+        with self._lock:
+            if not self._decision_available.wait_for(
+                lambda: self._decision_queue, self.poll_timeout
+            ):
+                return {"taskToken": "", "startedEventId": 0, "events": []}
+            execution = self._decision_queue.popleft()
+            previous_started_event_id = execution.started_event_id
+            scheduled_event_id = execution.add("DecisionTaskScheduled", {})
+            execution.started_event_id = execution.add(
+                "DecisionTaskStarted",
+                {"identity": identity, "scheduledEventId": scheduled_event_id},
+            )
+            task_token = "%s|%d" % (execution.run_id, execution.started_event_id)
+            self._decision_poll_times[task_token] = time.perf_counter()
+            task = self._get_page(
+                execution,
+                execution.started_event_id,
+                0,
+                maximumPageSize or self.page_size,
+                reverseOrder,
+            )
+        task.update(
+            taskToken=task_token,
+            startedEventId=execution.started_event_id,
+            previousStartedEventId=previous_started_event_id,
+            workflowType=execution.workflow_type,
+            workflowExecution={
+                "workflowId": execution.workflow_id,
+                "runId": execution.run_id,
+            },
+        )
+        return task
+
+    def get_workflow_execution_history(
+        self,
+        domain: str,
+        execution: t.Dict[str, str],
+        nextPageToken: str = None,
+        maximumPageSize: int = None,
+        reverseOrder: bool = False,
+    ) -> t.Dict[str, t.Any]:
+        """Get a page of a workflow execution's history."""
+        if nextPageToken:
+            return self.poll_for_decision_task(domain, {}, nextPageToken=nextPageToken)
+        with self._lock:
+            run_execution = self.executions[execution["runId"]]
+            return self._get_page(
+                run_execution,
+                len(run_execution.events),
+                0,
+                maximumPageSize or self.page_size,
+                reverseOrder,
+            )
+
+    def _close(self, execution: _Execution, event_type: str, attrs: t.Dict[str, t.Any]):
+        execution.add(event_type, attrs)
+        execution.closed = True
+        execution.close_time = time.perf_counter()
+        self.n_open -= 1
+        if not self.n_open:
+            self._all_closed.notify_all()
+
+    def respond_decision_task_completed(
+        self,
+        taskToken: str,
+        decisions: t.List[t.Dict[str, t.Any]] = None,
+        **_,
+    ):
+        """Complete a decision task, applying its decisions."""
+        respond_time = time.perf_counter()
+        run_id, started_event_id = taskToken.split("|")
+        with self._lock:
+            execution = self.executions[run_id]
+            poll_time = self._decision_poll_times.pop(taskToken)
+            self.decision_latencies.append(respond_time - poll_time)
+            self.n_decision_tasks += 1
+            self.n_decisions += len(decisions or [])
+            completed_event_id = execution.add(
+                "DecisionTaskCompleted",
+                {
+                    "scheduledEventId": int(started_event_id) - 1,
+                    "startedEventId": int(started_event_id),
+                },
+            )
+            for decision in decisions or []:
+                decision_type = decision["decisionType"]
+                attr_key = decision_type[0].lower() + decision_type[1:]
+                attrs = dict(decision.get(attr_key + "DecisionAttributes", {}))
+                attrs["decisionTaskCompletedEventId"] = completed_event_id
+                if decision_type == "ScheduleActivityTask":
+                    scheduled_event_id = execution.add("ActivityTaskScheduled", attrs)
+                    self._activity_queue.append((execution, scheduled_event_id))
+                    self._activity_available.notify()
+                elif decision_type == "CompleteWorkflowExecution":
+                    self._close(execution, "WorkflowExecutionCompleted", attrs)
+                elif decision_type == "FailWorkflowExecution":
+                    self._close(execution, "WorkflowExecutionFailed", attrs)
+                elif decision_type == "CancelWorkflowExecution":
+                    self._close(execution, "WorkflowExecutionCanceled", attrs)
+                else:
+                    raise ValueError("Unsupported decision: %s" % decision_type)
+            execution.decision_in_flight = False
+            if execution.decision_needed:
+                self._request_decision(execution)
+
+    def poll_for_activity_task(
+        self, domain: str, taskList: t.Dict[str, str], identity: str = None
+    ) -> t.Dict[str, t.Any]:
+        """Poll for an activity task, on any task-list."""
+        with self._lock:
+            if not self._activity_available.wait_for(
+                lambda: self._activity_queue, self.poll_timeout
+            ):
+                return {"taskToken": "", "startedEventId": 0}
+            execution, scheduled_event_id = self._activity_queue.popleft()
+            scheduled_attrs = execution.events[scheduled_event_id - 1][
+                "activityTaskScheduledEventAttributes"
+            ]
+            started_event_id = execution.add(
+                "ActivityTaskStarted",
+                {"identity": identity, "scheduledEventId": scheduled_event_id},
+            )
+        task_token = "%s|%d|%d" % (
+            execution.run_id,
+            scheduled_event_id,
+            started_event_id,
+        )
+        return {
+            "taskToken": task_token,
+            "activityId": scheduled_attrs["activityId"],
+            "activityType": scheduled_attrs["activityType"],
+            "input": scheduled_attrs.get("input"),
+            "startedEventId": started_event_id,
+            "workflowExecution": {
+                "workflowId": execution.workflow_id,
+                "runId": execution.run_id,
+            },
+        }
+
+    def respond_activity_task_completed(self, taskToken: str, result: str = None):
+        """Complete an activity task."""
+        run_id, scheduled_event_id, started_event_id = taskToken.split("|")
+        attrs = {
+            "scheduledEventId": int(scheduled_event_id),
+            "startedEventId": int(started_event_id),
+        }
+        if result is not None:
+            attrs["result"] = result
+        with self._lock:
+            execution = self.executions[run_id]
+            execution.add("ActivityTaskCompleted", attrs)
+            self._request_decision(execution)
+
+    def wait_closed(self, timeout: float = None) -> bool:
+        """Wait for all started workflow executions to close.
+
+        Args:
+            timeout: maximum wait time (seconds)
+
+        Returns:
+            whether all executions closed
+        """
+
+        with self._lock:
+            return self._all_closed.wait_for(lambda: not self.n_open, timeout)
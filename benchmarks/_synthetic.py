@@ -0,0 +1,286 @@
+"""Synthetic DAG workflow specifications and SWF histories."""
+
+import json
+import random
+import typing as t
+
+SHAPES = ("chain", "fan-out", "diamond", "layered")
+
+
+def _task_spec(task_id: str, dependencies: t.List[str] = None) -> t.Dict[str, t.Any]:
+    task = {
+        "id": task_id,
+        "type": {"name": "spam", "version": "1.0"},
+        "heartbeat": 60,
+        "timeout": 3600,
+    }
+    if dependencies:
+        task["dependencies"] = dependencies
+        task["input"] = {
+            "type": "object",
+            "items": {
+                "value": {
+                    "type": "dependency-result",
+                    "id": dependencies[0],
+                    "path": "$.value",
+                },
+                "foo": {"type": "workflow-input", "path": "$.foo"},
+            },
+        }
+    return task
+
+
+def _workflow_spec(name: str, tasks: t.List[t.Dict[str, t.Any]]) -> t.Dict[str, t.Any]:
+    return {"spec_type": "dag", "name": name, "version": "1.0", "tasks": tasks}
+
+
+def chain_spec(n_tasks: int) -> t.Dict[str, t.Any]:
+    """Build a DAG workflow specification of a chain of tasks.
+
+    Args:
+        n_tasks: number of tasks
+
+    Returns:
+        workflow specification
+    """
+
+    tasks = [_task_spec("task-0")]
+    for idx in range(1, n_tasks):
+        tasks.append(_task_spec("task-%d" % idx, ["task-%d" % (idx - 1)]))
+    return _workflow_spec("chain", tasks)
+
+
+def fan_out_spec(n_tasks: int) -> t.Dict[str, t.Any]:
+    """Build a DAG workflow specification of tasks all dependant on one.
+
+    Args:
+        n_tasks: number of tasks, including the root task
+
+    Returns:
+        workflow specification
+    """
+
+    tasks = [_task_spec("task-0")]
+    for idx in range(1, n_tasks):
+        tasks.append(_task_spec("task-%d" % idx, ["task-0"]))
+    return _workflow_spec("fan-out", tasks)
+
+
+def diamond_spec(n_tasks: int) -> t.Dict[str, t.Any]:
+    """Build a DAG workflow specification of a chain of diamonds.
+
+    Each diamond is two tasks dependant on the previous diamond's join
+    task, then a join task dependant on both.
+
+    Args:
+        n_tasks: number of tasks
+
+    Returns:
+        workflow specification
+    """
+
+    tasks = [_task_spec("task-0")]
+    join_id = "task-0"
+    for idx in range(1, n_tasks):
+        if idx % 3:
+            tasks.append(_task_spec("task-%d" % idx, [join_id]))
+        else:
+            tasks.append(_task_spec("task-%d" % idx, [t["id"] for t in tasks[-2:]]))
+            join_id = "task-%d" % idx
+    return _workflow_spec("diamond", tasks)
+
+
+def layered_spec(
+    n_tasks: int,
+    width: int = None,
+    max_dependencies: int = 3,
+    seed: int = 0,
+) -> t.Dict[str, t.Any]:
+    """Build a DAG workflow specification of randomly-connected layers.
+
+    Each task depends on between one and ``max_dependencies`` random
+    tasks of the previous layer.
+
+    Args:
+        n_tasks: number of tasks
+        width: number of tasks per layer, default: square-root of number
+            of tasks
+        max_dependencies: maximum number of each task's dependencies
+        seed: random number generator seed
+
+    Returns:
+        workflow specification
+    """
+
+    rng = random.Random(seed)
+    width = width or max(1, int(n_tasks**0.5))
+    tasks = []
+    layer = []
+    previous_layer = []
+    for idx in range(n_tasks):
+        if len(layer) == width:
+            previous_layer, layer = layer, []
+        task_id = "task-%d" % idx
+        dependencies = None
+        if previous_layer:
+            n_dependencies = rng.randint(1, min(max_dependencies, len(previous_layer)))
+            dependencies = rng.sample(previous_layer, n_dependencies)
+        tasks.append(_task_spec(task_id, dependencies))
+        layer.append(task_id)
+    return _workflow_spec("layered", tasks)
+
+
+def make_spec(shape: str, n_tasks: int) -> t.Dict[str, t.Any]:
+    """Build a DAG workflow specification.
+
+    Args:
+        shape: DAG shape, one of ``SHAPES``
+        n_tasks: number of tasks
+
+    Returns:
+        workflow specification
+    """
+
+    builders = {
+        "chain": chain_spec,
+        "fan-out": fan_out_spec,
+        "diamond": diamond_spec,
+        "layered": layered_spec,
+    }
+    return builders[shape](n_tasks)
+
+
+def make_workflows_spec(shape: str, n_tasks: int) -> t.Dict[str, t.Any]:
+    """Build a workflows specifications file's content.
+
+    Args:
+        shape: DAG shape, one of ``SHAPES``
+        n_tasks: number of tasks
+
+    Returns:
+        workflows specifications, of a single workflow
+    """
+
+    return {"version": "1.0", "workflows": [make_spec(shape, n_tasks)]}
+
+
+def get_waves(spec: t.Dict[str, t.Any]) -> t.List[t.List[str]]:
+    """Group a DAG's tasks by when a decider would schedule them.
+
+    Args:
+        spec: DAG workflow specification
+
+    Returns:
+        IDs of tasks scheduled by each decision, when all scheduled tasks
+            complete before the next decision
+    """
+
+    n_pending = {}
+    dependants = {}
+    wave = []
+    for task in spec["tasks"]:
+        n_pending[task["id"]] = len(task.get("dependencies") or [])
+        for dependency_id in task.get("dependencies") or []:
+            dependants.setdefault(dependency_id, []).append(task["id"])
+        if not n_pending[task["id"]]:
+            wave.append(task["id"])
+
+    waves = []
+    while wave:
+        waves.append(wave)
+        wave = []
+        for task_id in waves[-1]:
+            for dependant_id in dependants.get(task_id, []):
+                n_pending[dependant_id] -= 1
+                if not n_pending[dependant_id]:
+                    wave.append(dependant_id)
+    return waves
+
+
+class _HistoryBuilder:
+    def __init__(self, workflow_name: str = "chain", workflow_input: t.Any = None):
+        self.workflow_name = workflow_name
+        started_attrs = {"input": json.dumps(workflow_input)}
+        self.events = [
+            {
+                "eventId": 1,
+                "eventType": "WorkflowExecutionStarted",
+                "workflowExecutionStartedEventAttributes": started_attrs,
+            }
+        ]
+        self.started_event_ids = [0]
+        self.schedule_decision()
+
+    def add(self, event_type: str, attrs: t.Dict[str, t.Any] = None) -> int:
+        event_id = len(self.events) + 1
+        event = {"eventId": event_id, "eventType": event_type}
+        if attrs is not None:
+            attr_key = event_type[0].lower() + event_type[1:] + "EventAttributes"
+            event[attr_key] = attrs
+        self.events.append(event)
+        return event_id
+
+    def schedule_decision(self):
+        self.add("DecisionTaskScheduled")
+        started_id = self.add("DecisionTaskStarted", {"identity": "decider"})
+        self.started_event_ids.append(started_id)
+
+    def complete_decision(self) -> int:
+        attrs = {"startedEventId": self.started_event_ids[-1]}
+        return self.add("DecisionTaskCompleted", attrs)
+
+    def run_activities(self, activity_ids: t.Iterable[str], result: t.Any = None):
+        completed_id = self.complete_decision()
+        scheduled_ids = []
+        for activity_id in activity_ids:
+            attrs = {
+                "activityId": activity_id,
+                "activityType": {"name": "spam", "version": "1.0"},
+                "decisionTaskCompletedEventId": completed_id,
+            }
+            scheduled_ids.append(self.add("ActivityTaskScheduled", attrs))
+        for scheduled_id in scheduled_ids:
+            self.add("ActivityTaskStarted", {"scheduledEventId": scheduled_id})
+        for scheduled_id in scheduled_ids:
+            attrs = {"scheduledEventId": scheduled_id, "result": json.dumps(result)}
+            self.add("ActivityTaskCompleted", attrs)
+        self.schedule_decision()
+
+    def task(self, run_id: str = None) -> t.Dict[str, t.Any]:
+        task = {
+            "taskToken": "token",
+            "workflowType": {"name": self.workflow_name, "version": "1.0"},
+            "previousStartedEventId": self.started_event_ids[-2],
+            "startedEventId": self.started_event_ids[-1],
+            "events": self.events,
+        }
+        if run_id:
+            task["workflowExecution"] = {"workflowId": "wf", "runId": run_id}
+        return task
+
+
+def make_history(
+    spec: t.Dict[str, t.Any],
+    n_waves: int = None,
+    run_id: str = None,
+    result: t.Dict[str, t.Any] = None,
+) -> t.Dict[str, t.Any]:
+    """Build a decision task for a DAG workflow execution.
+
+    Activities are scheduled in waves (see ``get_waves``), each activity
+    completing with result ``{"value": 42}`` updated with ``result``.
+
+    Args:
+        spec: DAG workflow specification
+        n_waves: number of waves of activities completed, default: all
+        run_id: workflow execution run ID, default: no execution info
+        result: extra activity result items
+
+    Returns:
+        decision task, after the last completed wave of activities
+    """
+
+    history = _HistoryBuilder(spec["name"], workflow_input={"foo": [1, 2]})
+    for wave in get_waves(spec)[:n_waves]:
+        history.run_activities(wave, result={"value": 42, **(result or {})})
+    return history.task(run_id)
@@ -0,0 +1,120 @@
+"""Benchmark DAG workflow set-up and decision building against size."""
+
+import time
+import functools
+import tracemalloc
+
+import pytest
+import _synthetic
+
+from seddy import _specs
+
+SIZES = [10, 100, 1000, 10000]
+shapes = pytest.mark.parametrize("shape", _synthetic.SHAPES)
+sizes = pytest.mark.parametrize("n_tasks", SIZES)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_spec(shape, n_tasks):
+    return _synthetic.make_spec(shape, n_tasks)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_history(shape, n_tasks, n_waves=None, run_id=None):
+    return _synthetic.make_history(_get_spec(shape, n_tasks), n_waves, run_id)
+
+
+def _build_decisions(workflow, task):
+    builder = _specs.DAGBuilder(workflow, task)
+    builder.build_decisions()
+    return builder.decisions
+
+
+def _make_workflow(shape, n_tasks):
+    workflow = _specs.DAGWorkflow.from_spec(_get_spec(shape, n_tasks))
+    workflow.setup()
+    return workflow
+
+
+@shapes
+@sizes
+def bench_setup(benchmark, peak_memory, shape, n_tasks):
+    """Workflow DAG compilation."""
+    workflow = _specs.DAGWorkflow.from_spec(_get_spec(shape, n_tasks))
+    peak_memory(workflow.setup)
+    benchmark(workflow.setup)
+    assert len(workflow.topology.order) == n_tasks
+
+
+@shapes
+@sizes
+def bench_build_decisions(benchmark, peak_memory, shape, n_tasks):
+    """Full-history decision building."""
+    workflow = _make_workflow(shape, n_tasks)
+    task = _get_history(shape, n_tasks)
+    peak_memory(_build_decisions, workflow, task)
+    decisions = benchmark(_build_decisions, workflow, task)
+    assert decisions[0]["decisionType"] == "CompleteWorkflowExecution"
+
+
+@shapes
+@sizes
+def bench_build_decisions_first(benchmark, peak_memory, shape, n_tasks):
+    """Decision building scheduling the initial activities."""
+    workflow = _make_workflow(shape, n_tasks)
+    task = _get_history(shape, n_tasks, 0)
+    peak_memory(_build_decisions, workflow, task)
+    decisions = benchmark(_build_decisions, workflow, task)
+    assert decisions[0]["decisionType"] == "ScheduleActivityTask"
+
+
+@shapes
+@sizes
+def bench_build_decisions_cached(benchmark, shape, n_tasks):
+    """Decision building from cached execution state and new events."""
+    workflow = _make_workflow(shape, n_tasks)
+    n_waves = len(_synthetic.get_waves(_get_spec(shape, n_tasks)))
+    previous_task = _get_history(shape, n_tasks, n_waves - 1, "run")
+    task = _get_history(shape, n_tasks, None, "run")
+    new_events = task["events"][len(previous_task["events"]) :]
+
+    def setup():
+        _specs.DAGBuilder.state_cache.clear()
+        _build_decisions(workflow, previous_task)
+        return (workflow, {**task, "events": new_events}), {}
+
+    decisions = benchmark.pedantic(_build_decisions, setup=setup, rounds=20)
+    assert decisions[0]["decisionType"] == "CompleteWorkflowExecution"
+
+
+def _measure(fn, *args):
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        fn(*args)
+        runs.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(runs), peak
+
+
+@shapes
+def bench_scaling(shape):
+    """Set-up and decision building grow linearly with workflow size."""
+    small, large = 1000, 10000
+    results = {}
+    for n_tasks in (small, large):
+        workflow = _specs.DAGWorkflow.from_spec(_get_spec(shape, n_tasks))
+        setup = _measure(workflow.setup)
+        decide = _measure(_build_decisions, workflow, _get_history(shape, n_tasks))
+        results[n_tasks] = setup + decide
+
+    # Linear: ~10x, quadratic: ~100x
+    labels = ["set-up time", "set-up memory", "decision time", "decision memory"]
+    for label, small_value, large_value in zip(labels, results[small], results[large]):
+        ratio = large_value / small_value
+        assert ratio < 25, "%s grew %.0fx for 10x tasks" % (label, ratio)
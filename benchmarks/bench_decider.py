@@ -0,0 +1,24 @@
+"""Benchmark decider end-to-end throughput against a fake SWF."""
+
+import pytest
+import decider_load
+
+
+@pytest.mark.parametrize(
+    ("n_pollers", "n_workers"), [(1, 1), (4, 4)], ids=["serial", "concurrent"]
+)
+@pytest.mark.parametrize("shape", ["fan-out", "layered"])
+def bench_decider_throughput(benchmark, shape, n_pollers, n_workers):
+    """Decision throughput, latency and makespan of many executions."""
+    kwargs = dict(
+        shape=shape,
+        n_tasks=20,
+        n_executions=200,
+        activity_latency=0.001,
+        n_pollers=n_pollers,
+        n_workers=n_workers,
+        timeout=60.0,
+    )
+    result = benchmark.pedantic(decider_load.run_load, kwargs=kwargs, rounds=3)
+    benchmark.extra_info.update(result.to_dict())
+    assert result.n_closed == result.n_executions
@@ -0,0 +1,80 @@
+"""Benchmark JSON codecs, decoding activity results and workflow input."""
+
+import json
+import random
+import functools
+
+import pytest
+import _synthetic
+
+from seddy import _json, _specs
+
+CODECS = ("json", "orjson")
+PAYLOADS = ("numeric", "text")
+SIZES = [1_000, 100_000, 4_000_000]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_payload(kind: str, size: int) -> str:
+    """Build a JSON-encoded array of records, of approximately ``size`` bytes."""
+    rng = random.Random(0)
+    records = []
+    n_bytes = 2
+    while n_bytes < size:
+        if kind == "numeric":
+            record = {
+                "id": len(records),
+                "values": [rng.random() for _ in range(8)],
+                "counts": [rng.randrange(10**9) for _ in range(8)],
+                "valid": True,
+            }
+        else:
+            record = {
+                "id": "item-%d" % len(records),
+                "name": "Élément %d ☃" % len(records),
+                "description": "lorem ipsum dolor sit amet " * 8,
+                "tags": ["spam", "eggs", None],
+            }
+        records.append(record)
+        n_bytes += len(json.dumps(record)) + 2
+    return json.dumps(records)
+
+
+@pytest.fixture(params=CODECS)
+def codec(request):
+    """Select JSON codec, restoring selection after benchmark."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    original = _json.codec
+    _json.set_codec(request.param)
+    yield request.param
+    _json.set_codec(original)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("kind", PAYLOADS)
+def bench_loads(benchmark, codec, kind, size):
+    """Decode a JSON payload."""
+    benchmark.group = "json-loads-%s-%d" % (kind, size)
+    payload = _get_payload(kind, size)
+    res = benchmark(_json.loads, payload)
+    assert json.dumps(res) == payload
+
+
+@pytest.mark.parametrize("kind", PAYLOADS)
+def bench_build_decisions_large_results(benchmark, codec, kind):
+    """Build decisions with 1 MB activity results (fan-out of 10 tasks)."""
+    benchmark.group = "json-decisions-%s" % kind
+    spec = _synthetic.fan_out_spec(10)
+    workflow = _specs.DAGWorkflow.from_spec(spec)
+    workflow.setup()
+    data = json.loads(_get_payload(kind, 1_000_000))
+    task = _synthetic.make_history(spec, n_waves=1, result={"data": data})
+
+    def build_decisions():
+        builder = _specs.DAGBuilder(workflow, task)
+        builder.build_decisions()
+        return builder.decisions
+
+    decisions = benchmark(build_decisions)
+    assert len(decisions) == 9
@@ -0,0 +1,21 @@
+"""Benchmark task input path look-up."""
+
+import pytest
+
+from seddy._specs import _dag
+
+PATH = "$.spam[0].eggs.swallow[2].ham"
+OBJ = {"spam": [{"eggs": {"swallow": [None, None, {"ham": 42}]}}]}
+
+
+@pytest.mark.benchmark(group="jsonpath")
+def bench_get_item_jsonpath(benchmark):
+    """Look-up parsing the path on each call."""
+    assert benchmark(_dag._get_item_jsonpath, PATH, OBJ) == 42
+
+
+@pytest.mark.benchmark(group="jsonpath")
+def bench_get_item_compiled(benchmark):
+    """Look-up with a path compiled at specification load."""
+    indices = _dag._compile_jsonpath(PATH)
+    assert benchmark(_dag._get_item, indices, OBJ) == 42
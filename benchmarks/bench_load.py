@@ -0,0 +1,48 @@
+"""Benchmark workflows specifications file loading."""
+
+import json
+
+import yaml
+import pytest
+import _synthetic
+
+from seddy._specs import _io
+
+SIZES = [10, 100, 1000, 10000]
+
+
+def _write_specs_file(path, shape, n_tasks):
+    workflows_spec = _synthetic.make_workflows_spec(shape, n_tasks)
+    if path.suffix == ".json":
+        path.write_text(json.dumps(workflows_spec, indent=2))
+    else:
+        path.write_text(yaml.safe_dump(workflows_spec))
+
+
+@pytest.mark.parametrize("shape", _synthetic.SHAPES)
+@pytest.mark.parametrize("n_tasks", SIZES)
+@pytest.mark.parametrize("suffix", [".json", ".yaml"])
+def bench_load_workflows(
+    benchmark, peak_memory, tmp_path, monkeypatch, shape, n_tasks, suffix
+):
+    """Workflows specifications file loading and parsing, without cache."""
+    if suffix == ".yaml" and n_tasks > 1000:
+        pytest.skip("slow YAML parsing")
+    monkeypatch.setenv("SEDDY_CACHE_DIR", "")
+    workflows_file = tmp_path / ("workflows" + suffix)
+    _write_specs_file(workflows_file, shape, n_tasks)
+    peak_memory(_io.load_workflows, workflows_file)
+    workflows = benchmark(_io.load_workflows, workflows_file)
+    assert len(workflows[0].task_specs) == n_tasks
+
+
+@pytest.mark.parametrize("shape", _synthetic.SHAPES)
+@pytest.mark.parametrize("n_tasks", SIZES)
+def bench_load_workflows_cached(benchmark, tmp_path, monkeypatch, shape, n_tasks):
+    """YAML workflows specifications file loading, from parsed cache."""
+    monkeypatch.setenv("SEDDY_CACHE_DIR", str(tmp_path / "cache"))
+    workflows_file = tmp_path / "workflows.yaml"
+    _write_specs_file(workflows_file, shape, n_tasks)
+    _io.load_workflows(workflows_file)
+    workflows = benchmark(_io.load_workflows, workflows_file)
+    assert len(workflows[0].task_specs) == n_tasks
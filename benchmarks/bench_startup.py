@@ -0,0 +1,33 @@
+"""Benchmark ``seddy`` start-up."""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+FIRST_CLIENT_SCRIPT = """
+from seddy import decider, _util
+_util.get_swf_client(socket_read_timeout=70.0, max_pool_connections=10)
+"""
+
+
+def _run_python(*args):
+    env = {
+        **os.environ,
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "spam",
+        "AWS_SECRET_ACCESS_KEY": "eggs",
+    }
+    subprocess.run([sys.executable, *args], env=env, check=True, capture_output=True)
+
+
+@pytest.mark.parametrize("args", [["-h"], ["--version"]])
+def bench_cli(benchmark, args):
+    """Command-line help and version, including interpreter start-up."""
+    benchmark(_run_python, "-m", "seddy", *args)
+
+
+def bench_first_client(benchmark):
+    """Decider import and first SWF client creation, in a new interpreter."""
+    benchmark(_run_python, "-c", FIRST_CLIENT_SCRIPT)
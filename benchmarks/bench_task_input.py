@@ -0,0 +1,47 @@
+"""Benchmark activity task input building."""
+
+import json
+
+import pytest
+
+from seddy._specs import _dag
+
+WORKFLOW_INPUT = {"foo": {"spam": [1, 2, 3], "eggs": "ham" * 10}, "bar": None}
+RESULTS = {"task-%d" % i: {"value": i, "items": list(range(10))} for i in range(8)}
+
+
+def _make_input_spec(depth):
+    if not depth:
+        return _dag.DependencyResult("task-%d" % (depth % 8), "$.items[3]")
+    items = {
+        "constant": _dag.Constant({"spam": [42, "eggs"], "depth": depth}),
+        "input": _dag.WorkflowInput("$.foo.spam[1]"),
+        "result": _dag.DependencyResult("task-%d" % depth, "$.value"),
+        "missing": _dag.NoInput(),
+    }
+    for idx in range(3):
+        items["child-%d" % idx] = _make_input_spec(depth - 1)
+    return _dag.Object(items)
+
+
+INPUT_SPEC = _make_input_spec(3)
+
+
+def _build_input_json(input_spec, workflow_input, activity_results):
+    input_ = _dag._build_activity_input(input_spec, workflow_input, activity_results)
+    return json.dumps(input_)
+
+
+@pytest.mark.benchmark(group="task-input")
+def bench_build_activity_input(benchmark):
+    """Input built as an object, then JSON-encoded."""
+    res = benchmark(_build_input_json, INPUT_SPEC, WORKFLOW_INPUT, RESULTS)
+    assert res == _dag._compile_input(INPUT_SPEC)(WORKFLOW_INPUT, RESULTS)
+
+
+@pytest.mark.benchmark(group="task-input")
+def bench_build_activity_input_compiled(benchmark):
+    """Input built from compiled JSON fragments."""
+    build_input = _dag._compile_input(INPUT_SPEC)
+    res = benchmark(build_input, WORKFLOW_INPUT, RESULTS)
+    assert res == _build_input_json(INPUT_SPEC, WORKFLOW_INPUT, RESULTS)
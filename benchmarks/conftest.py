@@ -0,0 +1,27 @@
+"""Benchmark fixtures."""
+
+import tracemalloc
+
+import pytest
+
+
+@pytest.fixture
+def peak_memory(benchmark):
+    """Peak memory allocation measurer.
+
+    Calls the given function once with memory tracing, recording the peak
+    traced allocation size (bytes) in the benchmark's extra info as
+    ``peak_memory``.
+    """
+
+    def measure(fn, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            fn(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory"] = peak
+        return peak
+
+    return measure
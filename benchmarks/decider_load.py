@@ -0,0 +1,246 @@
+"""Decider end-to-end load test, against an in-process fake SWF.
+
+Starts many DAG workflow executions, completes their activities with
+simulated workers, and drives a real ``seddy.decider.Decider`` until all
+executions close. Run ``python decider_load.py --help`` for options.
+"""
+
+import sys
+import json
+import time
+import random
+import typing as t
+import argparse
+import threading
+import dataclasses
+from unittest import mock
+
+import _fake_swf
+import _synthetic
+
+from seddy import _specs, _util
+from seddy import decider as seddy_decider
+
+
+@dataclasses.dataclass
+class LoadResult:
+    """Decider load test result.
+
+    Args:
+        n_executions: number of workflow executions
+        n_closed: number of workflow executions closed
+        n_decision_tasks: number of decision tasks completed
+        n_decisions: number of decisions made
+        makespan: time from first execution start to last execution close
+            (seconds)
+        latencies: decision tasks' poll-to-respond latencies (seconds)
+    """
+
+    n_executions: int
+    n_closed: int
+    n_decision_tasks: int
+    n_decisions: int
+    makespan: float
+    latencies: t.List[float]
+
+    @property
+    def decision_tasks_per_second(self) -> float:
+        """Decision task throughput."""
+        return self.n_decision_tasks / self.makespan
+
+    @property
+    def decisions_per_second(self) -> float:
+        """Decision throughput."""
+        return self.n_decisions / self.makespan
+
+    def get_latency_percentile(self, percentile: float) -> float:
+        """Get a poll-to-respond latency percentile (nearest-rank).
+
+        Args:
+            percentile: percentile, in [0, 100]
+
+        Returns:
+            latency (seconds), or NaN with no decision tasks
+        """
+
+        if not self.latencies:
+            return float("nan")
+        latencies = sorted(self.latencies)
+        idx = max(0, -(-len(latencies) * percentile // 100) - 1)
+        return latencies[int(idx)]
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """Summarise result."""
+        return {
+            "executions": self.n_executions,
+            "closed": self.n_closed,
+            "decision_tasks": self.n_decision_tasks,
+            "decisions": self.n_decisions,
+            "makespan": self.makespan,
+            "decision_tasks_per_second": self.decision_tasks_per_second,
+            "decisions_per_second": self.decisions_per_second,
+            "latency_p50": self.get_latency_percentile(50),
+            "latency_p90": self.get_latency_percentile(90),
+            "latency_p99": self.get_latency_percentile(99),
+        }
+
+
+def _run_activity_worker(
+    swf: _fake_swf.FakeSWF,
+    latency: float,
+    stop: threading.Event,
+    seed: int,
+):
+    rng = random.Random(seed)
+    result = json.dumps({"value": 42})
+    while not stop.is_set():
+        task = swf.poll_for_activity_task("bench", {"name": "spam"})
+        if not task["taskToken"]:
+            continue
+        if latency:
+            time.sleep(rng.expovariate(1 / latency))
+        swf.respond_activity_task_completed(task["taskToken"], result)
+
+
+def run_load(
+    shape: str = "fan-out",
+    n_tasks: int = 10,
+    n_executions: int = 100,
+    activity_latency: float = 0.0,
+    n_activity_workers: int = 16,
+    n_pollers: int = 1,
+    n_workers: int = 1,
+    page_size: int = 1000,
+    timeout: float = 600.0,
+) -> LoadResult:
+    """Run a decider load test.
+
+    Args:
+        shape: workflow DAG shape, one of ``_synthetic.SHAPES``
+        n_tasks: number of tasks per workflow
+        n_executions: number of workflow executions to start
+        activity_latency: mean (exponentially-distributed) activity task
+            run time (seconds)
+        n_activity_workers: number of simulated activity workers
+        n_pollers: decider decision task pollers
+        n_workers: decider decision task workers
+        page_size: history page size
+        timeout: maximum time to wait on executions to close (seconds)
+
+    Returns:
+        load test result
+    """
+
+    spec = _synthetic.make_spec(shape, n_tasks)
+    workflow = _specs.DAGWorkflow.from_spec(spec)
+    registry = _specs.WorkflowRegistry.from_workflows([workflow])
+    swf = _fake_swf.FakeSWF(page_size=page_size)
+    _specs.execution_states.clear()
+    with mock.patch.object(_util, "get_swf_client", return_value=swf):
+        decider = seddy_decider.Decider(
+            None,
+            "bench",
+            "decisions",
+            identity="bench-decider",
+            n_pollers=n_pollers,
+            n_workers=n_workers,
+            registry=registry,
+        )
+
+    stop = threading.Event()
+    activity_workers = [
+        threading.Thread(
+            target=_run_activity_worker,
+            args=(swf, activity_latency, stop, j),
+            name="activity-worker-%d" % j,
+        )
+        for j in range(n_activity_workers)
+    ]
+    for thread in activity_workers:
+        thread.start()
+    decider_thread = threading.Thread(target=decider.run, name="decider")
+    decider_thread.start()
+
+    workflow_type = {"name": spec["name"], "version": spec["version"]}
+    workflow_input = json.dumps({"foo": [1, 2]})
+    try:
+        for j in range(n_executions):
+            swf.start_workflow_execution(
+                "bench", "wf-%d" % j, workflow_type, input=workflow_input
+            )
+        swf.wait_closed(timeout)
+    finally:
+        decider._stop.set()
+        stop.set()
+        decider_thread.join()
+        for thread in activity_workers:
+            thread.join()
+
+    executions = list(swf.executions.values())
+    closed = [e for e in executions if e.closed]
+    start = min(e.start_time for e in executions)
+    end = max((e.close_time for e in closed), default=time.perf_counter())
+    return LoadResult(
+        n_executions=n_executions,
+        n_closed=len(closed),
+        n_decision_tasks=swf.n_decision_tasks,
+        n_decisions=swf.n_decisions,
+        makespan=end - start,
+        latencies=list(swf.decision_latencies),
+    )
+
+
+def _format_result(result: LoadResult) -> str:
+    lines = [
+        "executions closed: %d / %d" % (result.n_closed, result.n_executions),
+        "decision tasks:    %d" % result.n_decision_tasks,
+        "decisions:         %d" % result.n_decisions,
+        "makespan:          %.3f s" % result.makespan,
+        "decision tasks/s:  %.1f" % result.decision_tasks_per_second,
+        "decisions/s:       %.1f" % result.decisions_per_second,
+    ]
+    for percentile in (50, 90, 99):
+        latency = result.get_latency_percentile(percentile)
+        lines.append("latency p%d:       %.2f ms" % (percentile, latency * 1e3))
+    return "\n".join(lines)
+
+
+def main(args: t.List[str] = None):
+    """Run load test from the command-line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shape", choices=_synthetic.SHAPES, default="fan-out")
+    parser.add_argument("--tasks", type=int, default=10, help="tasks per workflow")
+    parser.add_argument("--executions", type=int, default=1000)
+    parser.add_argument(
+        "--activity-latency",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="mean activity run time",
+    )
+    parser.add_argument("--activity-workers", type=int, default=16)
+    parser.add_argument("--pollers", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=600.0, metavar="SECONDS")
+    parser.add_argument("--json", action="store_true", help="output JSON")
+    args = parser.parse_args(args)
+
+    result = run_load(
+        shape=args.shape,
+        n_tasks=args.tasks,
+        n_executions=args.executions,
+        activity_latency=args.activity_latency,
+        n_activity_workers=args.activity_workers,
+        n_pollers=args.pollers,
+        n_workers=args.workers,
+        page_size=args.page_size,
+        timeout=args.timeout,
+    )
+    print(json.dumps(result.to_dict()) if args.json else _format_result(result))
+    if result.n_closed < result.n_executions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -7,17 +7,40 @@ __all__ = [
     "Workflow",
     "DAGBuilder",
     "DAGWorkflow",
+    "WorkflowRegistry",
     "load_workflows",
     "WORKFLOW",
 ]
 
-from ._specs import (
-    WORKFLOW,
-    ChildPolicy,
-    DAGBuilder,
-    DAGWorkflow,
-    DecisionsBuilder,
-    Registration,
-    Workflow,
-    load_workflows,
-)
+import sys
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    from ._specs import (
+        WORKFLOW,
+        ChildPolicy,
+        DAGBuilder,
+        DAGWorkflow,
+        DecisionsBuilder,
+        Registration,
+        Workflow,
+        WorkflowRegistry,
+        load_workflows,
+    )
+
+
+def __getattr__(name: str):
+    """Import workflows specifications on first access.
+
+    Keeps the command-line application (``python -m seddy``) from loading
+    them until a command needs them.
+    """
+
+    if name in __all__:
+        from . import _specs
+
+        return getattr(_specs, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,31 +1,100 @@
 """SWF workflow management service."""
 
+import typing as t
 import pathlib
 import argparse
+import importlib.util
 
-try:
-    from pythonjsonlogger import json as jsonlogger
-except ImportError as e:  # pragma: no cover
+
+class _VersionAction(argparse.Action):
+    """Print package version and exit, finding the version only when run."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, **kwargs):
+        kwargs.update(nargs=0, default=argparse.SUPPRESS)
+        super().__init__(option_strings, dest, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from . import _util
+
+        print(_util.get_version())
+        parser.exit()
+
+
+def _positive_int(value: str) -> int:
+    """Parse a positive integer command-line argument."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid int value: %r" % value) from None
+    if n < 1:
+        raise argparse.ArgumentTypeError("must be at least 1: %d" % n)
+    return n
+
+
+def _positive_float(value: str) -> float:
+    """Parse a positive number command-line argument."""
     try:
-        from pythonjsonlogger import jsonlogger
-    except ImportError:  # pragma: no cover
-        jsonlogger = e.with_traceback(None)
+        x = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid float value: %r" % value) from None
+    if not x > 0.0:
+        raise argparse.ArgumentTypeError("must be positive: %s" % value)
+    return x
 
 
 def run_app(args: argparse.Namespace):
     """Run application from parsed command-line arguments."""
-    from . import _util
+    from . import _json, _util
 
     _util.setup_logging(args.verbose - args.quiet, args.json_logging)
+    if args.codec:
+        _json.set_codec(args.codec)
 
     if args.command == "decider":
         from . import decider
 
-        decider.run_app(args.workflows_file, args.domain, args.task_list, args.identity)
+        decider.run_app(
+            args.workflows_file,
+            args.domain,
+            args.task_list,
+            args.identity,
+            n_pollers=args.pollers,
+            n_workers=args.workers,
+            engine=args.engine,
+            n_processes=args.processes,
+            reload_interval=args.reload_interval,
+            record_dir=args.record,
+            record_max_bytes=args.record_max_bytes,
+            record_compression=args.record_compression,
+            lazy_workflows=args.lazy_workflows,
+        )
     elif args.command == "register":
         from . import registration
 
-        registration.run_app(args.workflows_file, args.domain)
+        kwargs = dict(
+            n_workers=args.workers,
+            max_rate=args.rate or None,
+            plan=args.plan,
+            state_file=args.state_file,
+            force=args.force,
+            names=args.names,
+            name_prefix=args.name_prefix,
+        )
+        if args.manifest:
+            registration.run_manifest_app(
+                args.manifest, n_domain_workers=args.domain_workers, **kwargs
+            )
+        else:
+            registration.run_app(args.workflows_file, args.domain, **kwargs)
+    elif args.command == "replay":
+        from . import recording
+
+        recording.run_app(
+            args.workflows_file,
+            args.recordings,
+            n_processes=args.processes,
+            json_output=args.json,
+        )
     else:  # pragma: no cover
         raise ValueError(args.command)
 
@@ -33,17 +102,6 @@ def run_app(args: argparse.Namespace):
 def build_parser() -> argparse.ArgumentParser:
     """Build command-line argument parser."""
 
-    try:
-        import importlib.metadata as importlib_metadata
-    except ImportError:
-        # noinspection PyUnresolvedReferences
-        import importlib_metadata
-
-    try:
-        version = importlib_metadata.version("seddy")
-    except importlib_metadata.PackageNotFoundError:
-        version = None
-
     parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
     parser.add_argument(
         "-v", "--verbose", action="count", default=0, help="increase logging verbosity"
@@ -51,14 +109,27 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-q", "--quiet", action="count", default=0, help="decrease logging verbosity"
     )
-    if not isinstance(jsonlogger, Exception):
+    if importlib.util.find_spec("pythonjsonlogger"):
         parser.add_argument(
             "-J",
             "--json-logging",
             action="store_true",
             help="JSON-format logs (coloured-logging disabled)",
         )
-    parser.add_argument("-V", "--version", action="version", version=version)
+    parser.add_argument(
+        "--codec",
+        choices=("auto", "json", "orjson"),
+        help=(
+            "JSON codec: 'orjson', 'json' (standard library), or 'auto' "
+            "('orjson' when installed), default: $SEDDY_JSON_CODEC or 'auto'"
+        ),
+    )
+    parser.add_argument(
+        "-V",
+        "--version",
+        action=_VersionAction,
+        help="show program's version number and exit",
+    )
     subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
     subparsers.required = True
 
@@ -67,7 +138,9 @@ def build_parser() -> argparse.ArgumentParser:
         "decider", help="run SWF decider", description="Run SWF decider."
     )
     decider_parser.add_argument(
-        "workflows_file", type=pathlib.Path, help="workflows specifications file path"
+        "workflows_file",
+        type=pathlib.Path,
+        help="workflows specifications file path, directory or glob pattern",
     )
     decider_parser.add_argument("domain", help="SWF domain")
     decider_parser.add_argument("task_list", help="SWF decider task-list")
@@ -77,6 +150,68 @@ def build_parser() -> argparse.ArgumentParser:
         metavar="NAME",
         help="decider identity, default: automatically generated",
     )
+    decider_parser.add_argument(
+        "--pollers",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="number of decision task polls to keep outstanding, default: 1",
+    )
+    decider_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        metavar="M",
+        help="number of decision tasks to handle concurrently, default: 1",
+    )
+    decider_parser.add_argument(
+        "--engine",
+        choices=("thread", "asyncio"),
+        default="thread",
+        help="decider concurrency engine, default: thread",
+    )
+    decider_parser.add_argument(
+        "--processes",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="number of decider processes to fork, default: 1",
+    )
+    decider_parser.add_argument(
+        "--reload-interval",
+        type=_positive_float,
+        metavar="SECONDS",
+        help=(
+            "reload workflows specifications when the file changes, checking "
+            "with this interval, default: only reload on SIGHUP"
+        ),
+    )
+    decider_parser.add_argument(
+        "--record",
+        type=pathlib.Path,
+        metavar="DIR",
+        help="record decision tasks and decisions to files in this directory",
+    )
+    decider_parser.add_argument(
+        "--record-max-bytes",
+        type=_positive_int,
+        metavar="N",
+        help="recording file size to start a new file at, default: 64 MiB",
+    )
+    decider_parser.add_argument(
+        "--record-compression",
+        choices=("gzip", "zstd"),
+        default="gzip",
+        help="recording compression, default: gzip",
+    )
+    decider_parser.add_argument(
+        "--lazy-workflows",
+        action="store_true",
+        help=(
+            "construct and set up each workflow on its first decision task, "
+            "instead of all on start-up"
+        ),
+    )
 
     # Workflows registration
     register_parser = subparsers.add_parser(
@@ -85,16 +220,133 @@ def build_parser() -> argparse.ArgumentParser:
         description="Synchronise workflow registration status with SWF.",
     )
     register_parser.add_argument(
-        "workflows_file", type=pathlib.Path, help="workflows specifications file path"
+        "workflows_file",
+        type=pathlib.Path,
+        nargs="?",
+        help="workflows specifications file path, directory or glob pattern",
+    )
+    register_parser.add_argument("domain", nargs="?", help="SWF domain")
+    register_parser.add_argument(
+        "--manifest",
+        type=pathlib.Path,
+        metavar="FILE",
+        help=(
+            "registration manifest file path, mapping workflows specifications "
+            "files to domains, instead of a workflows file and domain"
+        ),
+    )
+    register_parser.add_argument(
+        "--domain-workers",
+        type=_positive_int,
+        default=4,
+        metavar="N",
+        help="number of manifest domains to register concurrently, default: 4",
+    )
+    register_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=8,
+        metavar="N",
+        help="number of registration changes to make concurrently, default: 8",
+    )
+    register_parser.add_argument(
+        "--rate",
+        type=float,
+        default=10.0,
+        metavar="N",
+        help="maximum SWF requests per second, 0 for unlimited, default: 10",
+    )
+    register_parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="only show the registration changes to make, without making them",
+    )
+    register_parser.add_argument(
+        "--state-file",
+        type=pathlib.Path,
+        metavar="PATH",
+        help=(
+            "registration state file: skip registration (including listing "
+            "workflows in SWF) if workflows are unchanged since the last"
+        ),
+    )
+    register_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="register even if unchanged according to the state file",
+    )
+    register_parser.add_argument(
+        "--name",
+        action="append",
+        dest="names",
+        metavar="NAME",
+        help="only register workflows with this name (repeatable)",
+    )
+    register_parser.add_argument(
+        "--name-prefix",
+        metavar="PREFIX",
+        help="only register workflows with names starting with this prefix",
+    )
+
+    # Decision tasks replay
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="replay recorded decision tasks",
+        description=(
+            "Replay recorded decision tasks, reporting decision-building time "
+            "and decisions which differ from those recorded."
+        ),
+    )
+    replay_parser.add_argument(
+        "workflows_file",
+        type=pathlib.Path,
+        help="workflows specifications file path, directory or glob pattern",
+    )
+    replay_parser.add_argument(
+        "recordings",
+        type=pathlib.Path,
+        nargs="+",
+        metavar="RECORDING",
+        help="decision task recording file, or directory of recording files",
+    )
+    replay_parser.add_argument(
+        "--processes",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="number of replay worker processes, default: 1",
+    )
+    replay_parser.add_argument(
+        "--json", action="store_true", help="output JSON summary"
     )
-    register_parser.add_argument("domain", help="SWF domain")
 
     return parser
 
 
-def main():  # pragma: no cover
+def parse_args(argv: t.List[str] = None) -> argparse.Namespace:
+    """Parse command-line arguments, exiting with usage on invalid arguments.
+
+    Args:
+        argv: command-line arguments, default: from ``sys.argv``
+
+    Returns:
+        parsed arguments
+    """
+
     parser = build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.command == "register":
+        if args.manifest and (args.workflows_file or args.domain):
+            parser.error("register: can't pass a workflows file with --manifest")
+        if not args.manifest and not (args.workflows_file and args.domain):
+            parser.error("register: workflows file and domain, or --manifest, required")
+        if not args.rate >= 0.0:
+            parser.error("register: --rate must not be negative: %s" % args.rate)
+    return args
+
+
+def main():  # pragma: no cover
+    args = parse_args()
     run_app(args)
 
 
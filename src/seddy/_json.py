@@ -0,0 +1,143 @@
+"""JSON serialisation, with a selectable decoder.
+
+Decoding uses the selected codec: ``orjson`` (when installed) or the
+standard library's ``json``. Encoding is canonical: always identical to
+``json.dumps`` with default settings, whichever codec is selected, so
+decisions don't depend on the codec.
+"""
+
+import os
+import json
+import typing as t
+import logging as lg
+import importlib.util
+
+logger = lg.getLogger(__package__)
+CODEC_ENVIRONMENT_VARIABLE = "SEDDY_JSON_CODEC"
+CODECS = ("auto", "json", "orjson")
+codec = "json"
+_loads = json.loads
+_digits_table = bytes(
+    0x30 if 0x30 <= c <= 0x39 else 0x2E if c in b".eE+" else 0x20 for c in range(256)
+)
+_long_integer = b" " + b"0" * 19
+
+
+def _get_orjson_loads() -> t.Callable[[t.Union[str, bytes]], t.Any]:
+    """Get ``orjson`` decoder, falling back to ``json`` where they differ.
+
+    ``orjson`` rejects ``NaN``, infinities and lone surrogates, and
+    decodes integers outside 64 bits as floats. Input with a run of at
+    least 19 digits not in a number's fraction or exponent (necessary for
+    such an integer), rejected input, and invalid JSON are all decoded by
+    ``json`` instead, so values and error messages are identical to the
+    standard library's.
+    """
+
+    import orjson
+
+    orjson_loads = orjson.loads
+    orjson_error = orjson.JSONDecodeError
+
+    def loads(s: t.Union[str, bytes]) -> t.Any:
+        data = s.encode("utf-8", "surrogatepass") if s.__class__ is str else s
+        digits = data.translate(_digits_table)
+        if _long_integer in digits or digits.startswith(_long_integer[1:]):
+            return json.loads(s)
+        try:
+            return orjson_loads(data)
+        except orjson_error:
+            return json.loads(s)
+
+    return loads
+
+
+def _loads_orjson_lazily(s: t.Union[str, bytes]) -> t.Any:
+    """Import ``orjson`` on first decode, then decode with it."""
+    global codec, _loads
+    try:
+        _loads = _get_orjson_loads()
+    except ImportError as e:  # pragma: no cover
+        logger.warning("Failed to import orjson (%s), using 'json'", e)
+        _loads, codec = json.loads, "json"
+    return _loads(s)
+
+
+def set_codec(name: str = "auto"):
+    """Select the JSON decoder.
+
+    With 'auto', ``orjson`` is only imported on first decode.
+
+    Args:
+        name: codec name: 'orjson', 'json' (standard library), or 'auto':
+            'orjson' when installed, otherwise 'json'
+
+    Raises:
+        ValueError: unknown codec
+        ImportError: codec isn't installed
+    """
+
+    global codec, _loads
+    if name not in CODECS:
+        raise ValueError("Unknown JSON codec: %s" % name)
+    if name == "auto":
+        try:
+            found = importlib.util.find_spec("orjson")
+        except ValueError:  # pragma: no cover
+            found = None
+        if found:
+            _loads, codec = _loads_orjson_lazily, "orjson"
+        else:
+            _loads, codec = json.loads, "json"
+    elif name == "orjson":
+        _loads, codec = _get_orjson_loads(), "orjson"
+    else:
+        _loads, codec = json.loads, "json"
+    logger.debug("Using JSON codec: %s", codec)
+
+
+def _set_codec_from_environment():
+    """Select the JSON decoder from the environment, default: 'auto'."""
+    name = os.environ.get(CODEC_ENVIRONMENT_VARIABLE) or "auto"
+    try:
+        set_codec(name)
+    except (ValueError, ImportError) as e:
+        logger.warning(
+            "Invalid %s value '%s' (%s), using 'auto'",
+            CODEC_ENVIRONMENT_VARIABLE,
+            name,
+            e,
+        )
+        set_codec("auto")
+
+
+def loads(s: t.Union[str, bytes]) -> t.Any:
+    """Decode JSON, with the selected codec.
+
+    Args:
+        s: JSON-encoded value
+
+    Returns:
+        decoded value
+
+    Raises:
+        json.JSONDecodeError: invalid JSON
+    """
+
+    return _loads(s)
+
+
+def dumps(value: t.Any) -> str:
+    """Encode a value canonically as JSON.
+
+    Args:
+        value: value to encode
+
+    Returns:
+        JSON-encoded value, identical to ``json.dumps(value)``
+    """
+
+    return json.dumps(value)
+
+
+_set_codec_from_environment()
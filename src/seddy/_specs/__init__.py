@@ -6,10 +6,16 @@ __all__ = [
     "DecisionsBuilder",
     "Workflow",
     "make_decisions_on_error",
+    "PartialHistoryError",
     "DAGBuilder",
     "DAGWorkflow",
+    "ExecutionStateCache",
+    "execution_states",
+    "RegistryWatcher",
     "WorkflowNotFound",
+    "WorkflowRegistry",
     "get_workflow",
+    "load_file",
     "load_workflows",
     "WORKFLOW",
 ]
@@ -17,12 +23,21 @@ __all__ = [
 from ._base import (
     ChildPolicy,
     DecisionsBuilder,
+    PartialHistoryError,
     Registration,
     Workflow,
     make_decisions_on_error,
 )
+from ._cache import ExecutionStateCache, execution_states
 from ._dag import DAGBuilder, DAGWorkflow
-from ._io import WorkflowNotFound, get_workflow, load_workflows
+from ._io import (
+    RegistryWatcher,
+    WorkflowNotFound,
+    WorkflowRegistry,
+    get_workflow,
+    load_file,
+    load_workflows,
+)
 
 WORKFLOW = {
     DAGWorkflow.spec_type: DAGWorkflow,
@@ -10,6 +10,12 @@ class DeciderError(RuntimeError):
     """Misconfiguration of the decider."""
 
 
+class PartialHistoryError(RuntimeError):
+    """Decision task history doesn't start at the workflow execution start,
+    and there's no cached execution state to continue from.
+    """
+
+
 class ChildPolicy(enum.Enum):
     """Policy for child executions on parent termination.
 
@@ -79,8 +85,15 @@ class DecisionsBuilder(metaclass=abc.ABCMeta):
     Args:
         workflow: workflow specification
         task: decision task
+
+    Attributes:
+        streams_events (bool): builder consumes the task's history events as
+            an iterable, allowing later pages to be fetched while it runs.
+            Otherwise, ``task["events"]`` is always a list
     """
 
+    streams_events = False
+
     def __init__(self, workflow: "Workflow", task: t.Dict[str, t.Any]):
         self.workflow = workflow
         self.task = task
@@ -175,6 +188,9 @@ class Workflow(metaclass=abc.ABCMeta):
             workflow decisions
         """
 
+        if not self.decisions_builder.streams_events:
+            if not isinstance(task.get("events", []), list):
+                task = {**task, "events": list(task["events"])}
         builder = self.decisions_builder(self, task)
         builder.build_decisions()
         return builder.decisions
@@ -0,0 +1,93 @@
+"""Workflow execution decision state caching."""
+
+import typing as t
+import logging as lg
+import threading
+import collections
+
+logger = lg.getLogger(__name__)
+
+
+class ExecutionStateCache:
+    """Least-recently-used cache of workflow executions' decision state.
+
+    State is taken out of the cache while a decision task is handled, so
+    that it's only ever used by one decision worker, and put back once
+    decisions have been made. States should have a ``last_event_id``
+    attribute: the ID of the last history event applied, and a
+    ``can_resume(workflow, previous_started_event_id)`` method: whether the
+    state can be continued from for a decision task.
+
+    Args:
+        max_size: maximum number of executions' states to keep
+        max_nbytes: maximum (estimated) total size of kept states (bytes)
+    """
+
+    def __init__(self, max_size: int = 1000, max_nbytes: int = 128 * 1024**2):
+        self.max_size = max_size
+        self.max_nbytes = max_nbytes
+        self.nbytes = 0
+        self._states = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def get(self, run_id: str) -> t.Any:
+        """Get execution state, leaving it in the cache.
+
+        Args:
+            run_id: workflow execution run ID
+
+        Returns:
+            execution state, or ``None`` if not cached
+        """
+
+        with self._lock:
+            state, _ = self._states.get(run_id, (None, 0))
+        return state
+
+    def take(self, run_id: str) -> t.Any:
+        """Take execution state out of the cache.
+
+        Args:
+            run_id: workflow execution run ID
+
+        Returns:
+            execution state, or ``None`` if not cached
+        """
+
+        with self._lock:
+            state, nbytes = self._states.pop(run_id, (None, 0))
+            self.nbytes -= nbytes
+        return state
+
+    def put(self, run_id: str, state: t.Any, nbytes: int = 0):
+        """Put execution state into the cache, evicting least-recently used.
+
+        Args:
+            run_id: workflow execution run ID
+            state: execution state
+            nbytes: estimated size of state (bytes)
+        """
+
+        if nbytes > self.max_nbytes:
+            logger.debug("Not caching state of run '%s': too large", run_id)
+            return
+        with self._lock:
+            _, old_nbytes = self._states.pop(run_id, (None, 0))
+            self.nbytes += nbytes - old_nbytes
+            self._states[run_id] = (state, nbytes)
+            while len(self._states) > self.max_size or self.nbytes > self.max_nbytes:
+                evicted_run_id, (_, evicted_nbytes) = self._states.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+                logger.debug("Evicted state of run '%s'", evicted_run_id)
+
+    def clear(self):
+        """Remove all execution states."""
+        with self._lock:
+            self._states.clear()
+            self.nbytes = 0
+
+
+execution_states = ExecutionStateCache()
@@ -1,16 +1,20 @@
 """SWF decisions making."""
 
-import json
+import types
 import string
 import typing as t
 import logging as lg
 import dataclasses
+import collections.abc
+from json import encoder as json_encoder
 
-from . import _base
+from .. import _json
+from . import _base, _cache
 
 logger = lg.getLogger(__name__)
 _jsonpath_characters = string.digits + string.ascii_letters + "_"
 _sentinel = object()
+_encode_json_str = json_encoder.encode_basestring_ascii
 _attr_keys = {
     "ActivityTaskCancelRequested": "activityTaskCancelRequestedEventAttributes",
     "ActivityTaskCanceled": "activityTaskCanceledEventAttributes",
@@ -101,6 +105,11 @@ _decision_failed_events = {
     "ContinueAsNewWorkflowExecutionFailed",
     "FailWorkflowExecutionFailed",
 }
+_closing_decisions = {
+    "CancelWorkflowExecution",
+    "CompleteWorkflowExecution",
+    "FailWorkflowExecution",
+}
 
 
 @dataclasses.dataclass
@@ -139,6 +148,12 @@ class WorkflowInput(TaskInput):
     type: t.ClassVar = "workflow-input"
     path: str = "$"
     default: t.Any = _sentinel
+    path_indices: t.Tuple[t.Union[str, int], ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.path_indices = _compile_jsonpath(self.path)
 
     @classmethod
     def from_spec(cls, spec) -> "WorkflowInput":
@@ -156,6 +171,12 @@ class DependencyResult(TaskInput):
     id: t.Any
     path: str = "$"
     default: t.Any = _sentinel
+    path_indices: t.Tuple[t.Union[str, int], ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.path_indices = _compile_jsonpath(self.path)
 
     @classmethod
     def from_spec(cls, spec) -> "DependencyResult":
@@ -176,7 +197,7 @@ class Object(TaskInput):
     def from_spec(cls, spec) -> "Object":
         items = {}
         for key, subspec in spec["items"].items():
-            items[key] = cls.from_spec(subspec)
+            items[key] = TaskInput.from_spec(subspec)
         return cls(items)
 
 
@@ -234,26 +255,22 @@ class Task:  # TODO: unit-test
         if "priority" in spec:
             kwargs["priority"] = spec["priority"]
         if "dependencies" in spec:
-            kwargs["dependencies"] = spec["dependencies"]
+            dependencies = spec["dependencies"]
+            if isinstance(dependencies, str):
+                dependencies = [dependencies]
+            kwargs["dependencies"] = dependencies
         return cls(*args, **kwargs)
 
 
-def _get(item_id, items, id_key):
-    """Get item from list with given ID."""
-    return next(item for item in items if item[id_key] == item_id)
-
-
-def _get_item_jsonpath(path: str, obj, default: t.Any = _sentinel) -> t.Any:
-    """Get a child item from an object.
+def _compile_jsonpath(path: str) -> t.Tuple[t.Union[str, int], ...]:
+    """Compile a path to a child item.
 
     Args:
         path: path to child item, using basic single-valued JSONPath
             syntax
-        obj: object to get child item from
-        default: default value if missing
 
     Returns:
-        pointed-to child item
+        keys and indices of child item, from root
 
     Raises:
         ValueError: invalid path
@@ -294,6 +311,22 @@ def _get_item_jsonpath(path: str, obj, default: t.Any = _sentinel) -> t.Any:
         raise ValueError("invalid path (missing closing ']'): %s" % path)
     elif state == ".":
         indices.append("".join(chars))
+    return tuple(indices)
+
+
+def _get_item(
+    indices: t.Tuple[t.Union[str, int], ...], obj, default: t.Any = _sentinel
+) -> t.Any:
+    """Get a child item from an object.
+
+    Args:
+        indices: keys and indices of child item, from root
+        obj: object to get child item from
+        default: default value if missing
+
+    Returns:
+        pointed-to child item
+    """
 
     item = obj
     for index in indices:
@@ -306,6 +339,25 @@ def _get_item_jsonpath(path: str, obj, default: t.Any = _sentinel) -> t.Any:
     return item
 
 
+def _get_item_jsonpath(path: str, obj, default: t.Any = _sentinel) -> t.Any:
+    """Get a child item from an object.
+
+    Args:
+        path: path to child item, using basic single-valued JSONPath
+            syntax
+        obj: object to get child item from
+        default: default value if missing
+
+    Returns:
+        pointed-to child item
+
+    Raises:
+        ValueError: invalid path
+    """
+
+    return _get_item(_compile_jsonpath(path), obj, default)
+
+
 def _build_activity_input(
     input_spec: TaskInput,
     workflow_input: t.Union[t.Dict[str, t.Any], None],
@@ -328,12 +380,12 @@ def _build_activity_input(
     if isinstance(input_spec, Constant):
         return input_spec.value
     if isinstance(input_spec, WorkflowInput):
-        path = input_spec.path
-        return _get_item_jsonpath(path, workflow_input, input_spec.default)
+        indices = input_spec.path_indices
+        return _get_item(indices, workflow_input, input_spec.default)
     if isinstance(input_spec, DependencyResult):
-        path = input_spec.path
+        indices = input_spec.path_indices
         dependency_result = activity_results[input_spec.id]
-        return _get_item_jsonpath(path, dependency_result, input_spec.default)
+        return _get_item(indices, dependency_result, input_spec.default)
     if isinstance(input_spec, Object):
         input_ = {}
         for key, subspec in input_spec.items.items():
@@ -345,113 +397,549 @@ def _build_activity_input(
         raise TypeError(input_spec)
 
 
+def _encode_json(value: t.Any) -> str:
+    """JSON-encode a value, as ``json.dumps``, faster for scalars."""
+    if value.__class__ is str:
+        return _encode_json_str(value)
+    elif value is None:
+        return "null"
+    elif value is True:
+        return "true"
+    elif value is False:
+        return "false"
+    elif value.__class__ is int:
+        return int.__repr__(value)
+    return _json.dumps(value)
+
+
+def _compile_input_fragments(
+    input_spec: TaskInput,
+) -> t.Union[
+    t.List[t.Union[str, t.Callable[[t.Any, t.Mapping[str, t.Any]], str]]], None
+]:
+    """Compile activity task input specification into JSON fragments.
+
+    Args:
+        input_spec: activity task input specification
+
+    Returns:
+        JSON-encoded constant fragments and fragment-encoding functions,
+            or ``None`` for no input
+    """
+
+    input_spec = input_spec or NoInput()
+    if isinstance(input_spec, NoInput):
+        return None
+    if isinstance(input_spec, Constant):
+        return [_json.dumps(input_spec.value)]
+    if isinstance(input_spec, WorkflowInput):
+        indices, default = input_spec.path_indices, input_spec.default
+
+        def encode_workflow_input(workflow_input, _):
+            return _encode_json(_get_item(indices, workflow_input, default))
+
+        return [encode_workflow_input]
+    if isinstance(input_spec, DependencyResult):
+        id_, indices, default = (
+            input_spec.id,
+            input_spec.path_indices,
+            input_spec.default,
+        )
+
+        def encode_dependency_result(_, activity_results):
+            dependency_result = activity_results[id_]
+            return _encode_json(_get_item(indices, dependency_result, default))
+
+        return [encode_dependency_result]
+    if isinstance(input_spec, Object):
+        fragments = ["{"]
+        for key, subspec in input_spec.items.items():
+            item_fragments = _compile_input_fragments(subspec)
+            if item_fragments is None:
+                continue
+            if len(fragments) > 1:
+                fragments.append(", ")
+            fragments.append(_json.dumps({key: 0})[1:-4] + ": ")  # encoded key
+            fragments.extend(item_fragments)
+        fragments.append("}")
+        return fragments
+    else:
+        raise TypeError(input_spec)
+
+
+def _compile_input(
+    input_spec: TaskInput,
+) -> t.Union[t.Callable[[t.Any, t.Mapping[str, t.Any]], str], None]:
+    """Compile activity task input specification into an input builder.
+
+    The built input is identical to JSON-encoding (with default settings)
+    the result of ``_build_activity_input``.
+
+    Args:
+        input_spec: activity task input specification
+
+    Returns:
+        function building JSON-encoded activity task input from workflow
+            input and activities' results, or ``None`` for no input
+    """
+
+    fragments = _compile_input_fragments(input_spec)
+    if fragments is None:
+        return None
+
+    # Merge constant fragments
+    parts = []
+    for fragment in fragments:
+        if isinstance(fragment, str) and parts and isinstance(parts[-1], str):
+            parts[-1] += fragment
+        else:
+            parts.append(fragment)
+
+    if len(parts) == 1 and isinstance(parts[0], str):
+        constant = parts[0]
+        return lambda workflow_input, activity_results: constant
+    if len(parts) == 1:
+        return parts[0]
+
+    parts = tuple(parts)
+
+    def build_input(workflow_input, activity_results):
+        return "".join(
+            p if p.__class__ is str else p(workflow_input, activity_results)
+            for p in parts
+        )
+
+    return build_input
+
+
+@dataclasses.dataclass(frozen=True)
+class _ScheduleTemplate:
+    """Compiled activity task scheduling decision attributes.
+
+    Attribute values are shared by all decisions built from the template,
+    and so must not be modified.
+
+    Args:
+        attributes: static schedule-activity-task decision attributes
+        build_input: activity task input builder, ``None`` for no input
+    """
+
+    attributes: t.Mapping[str, t.Any]
+    build_input: t.Union[t.Callable[[t.Any, t.Mapping[str, t.Any]], str], None]
+
+    @classmethod
+    def compile(cls, task: Task) -> "_ScheduleTemplate":
+        """Compile an activity task's scheduling decision attributes.
+
+        Args:
+            task: activity task specification
+
+        Returns:
+            compiled decision attributes
+        """
+
+        attributes = {"activityId": task.id, "activityType": task.type}
+        if task.heartbeat is not None:
+            attributes["heartbeatTimeout"] = str(task.heartbeat)
+        if task.timeout is not None:
+            attributes["startToCloseTimeout"] = str(task.timeout)
+        if task.task_list is not None:
+            attributes["taskList"] = {"name": task.task_list}
+        if task.priority is not None:
+            attributes["taskPriority"] = str(task.priority)
+        return cls(types.MappingProxyType(attributes), _compile_input(task.input))
+
+    def build(
+        self,
+        get_workflow_input: t.Callable[[], t.Any],
+        activity_results: t.Mapping[str, t.Any],
+    ) -> t.Dict[str, t.Any]:
+        """Build activity task scheduling decision attributes.
+
+        Args:
+            get_workflow_input: workflow input getter, only called if the
+                task has input
+            activity_results: activities' results
+
+        Returns:
+            schedule-activity-task decision attributes
+        """
+
+        attributes = self.attributes.copy()
+        if self.build_input:
+            workflow_input = get_workflow_input()
+            attributes["input"] = self.build_input(workflow_input, activity_results)
+        return attributes
+
+
+@dataclasses.dataclass(frozen=True)
+class _Topology:
+    """Compiled DAG of activity tasks, with tasks referenced by index.
+
+    Args:
+        task_ids: task IDs, in specification order
+        indices: task indices by ID
+        dependencies: indices of each task's dependencies
+        dependant_offsets: offsets into ``dependant_indices`` of each
+            task's dependants (and the total number of dependants)
+        dependant_indices: indices of each task's dependants, in order
+        roots: indices of tasks without dependencies
+        order: task indices, in topological order
+    """
+
+    task_ids: t.Tuple[str, ...]
+    indices: t.Mapping[str, int]
+    dependencies: t.Tuple[t.Tuple[int, ...], ...]
+    dependant_offsets: t.Tuple[int, ...]
+    dependant_indices: t.Tuple[int, ...]
+    roots: t.Tuple[int, ...]
+    order: t.Tuple[int, ...]
+
+    @classmethod
+    def compile(cls, task_specs: t.List[Task]) -> "_Topology":
+        """Compile tasks specifications' dependency graph.
+
+        Args:
+            task_specs: DAG task specifications
+
+        Returns:
+            compiled DAG
+
+        Raises:
+            ValueError: on duplicate task IDs, unknown dependencies or
+                dependency cycles
+        """
+
+        task_ids = tuple(task.id for task in task_specs)
+        indices = {}
+        for idx, task_id in enumerate(task_ids):
+            if task_id in indices:
+                raise ValueError("Duplicate task ID: %s" % task_id)
+            indices[task_id] = idx
+
+        dependencies = []
+        for task in task_specs:
+            for dependency_id in task.dependencies or []:
+                if dependency_id not in indices:
+                    _fmt = "Unknown dependency of task '%s': %s"
+                    raise ValueError(_fmt % (task.id, dependency_id))
+            dependency_ids = dict.fromkeys(task.dependencies or [])
+            dependencies.append(tuple(indices[d] for d in dependency_ids))
+
+        # Compressed sparse rows of dependants
+        dependant_offsets = [0] * (len(task_ids) + 1)
+        for task_dependencies in dependencies:
+            for dependency_idx in task_dependencies:
+                dependant_offsets[dependency_idx + 1] += 1
+        for idx in range(len(task_ids)):
+            dependant_offsets[idx + 1] += dependant_offsets[idx]
+        dependant_indices = [0] * dependant_offsets[-1]
+        fill_offsets = dependant_offsets[:-1]
+        for idx, task_dependencies in enumerate(dependencies):
+            for dependency_idx in task_dependencies:
+                dependant_indices[fill_offsets[dependency_idx]] = idx
+                fill_offsets[dependency_idx] += 1
+
+        # Topological sort
+        remaining = [len(d) for d in dependencies]
+        order = [idx for idx, n in enumerate(remaining) if not n]
+        roots = tuple(order)
+        for idx in order:
+            start, stop = dependant_offsets[idx], dependant_offsets[idx + 1]
+            for dependant_idx in dependant_indices[start:stop]:
+                remaining[dependant_idx] -= 1
+                if not remaining[dependant_idx]:
+                    order.append(dependant_idx)
+        if len(order) < len(task_ids):
+            cyclic = [task_ids[idx] for idx, n in enumerate(remaining) if n]
+            raise ValueError("Dependency cycle between tasks: %s" % ", ".join(cyclic))
+
+        return cls(
+            task_ids,
+            types.MappingProxyType(indices),
+            tuple(dependencies),
+            tuple(dependant_offsets),
+            tuple(dependant_indices),
+            roots,
+            tuple(order),
+        )
+
+    def get_dependants(self, idx: int) -> t.Tuple[int, ...]:
+        """Get indices of a task's dependants.
+
+        Args:
+            idx: task index
+
+        Returns:
+            dependants' indices
+        """
+
+        start, stop = self.dependant_offsets[idx], self.dependant_offsets[idx + 1]
+        return self.dependant_indices[start:stop]
+
+
+class _JSONValues(collections.abc.Mapping):
+    """JSON-encoded values, each decoded on first access."""
+
+    def __init__(self):
+        self.encoded = {}
+        self._decoded = {}
+
+    def __getitem__(self, key: str) -> t.Any:
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        value = self._decoded[key] = _json.loads(self.encoded[key])
+        return value
+
+    def __iter__(self):
+        return iter(self.encoded)
+
+    def __len__(self):
+        return len(self.encoded)
+
+    def set(self, key: str, encoded: str):
+        """Set a value.
+
+        Args:
+            key: value key
+            encoded: JSON-encoded value
+        """
+
+        self.encoded[key] = encoded
+        self._decoded.pop(key, None)
+
+    def discard(self, key: str):
+        """Remove a value, if present.
+
+        Args:
+            key: value key
+        """
+
+        self.encoded.pop(key, None)
+        self._decoded.pop(key, None)
+
+
+@dataclasses.dataclass
+class _ExecutionState:
+    """DAG-type workflow execution decision state, up to an event.
+
+    Args:
+        workflow: workflow specification state is for
+        last_event_id: ID of last processed event
+        workflow_input: JSON-encoded workflow input
+        activity_ids: activity task IDs by activity-scheduled event ID
+        task_events: event type of last event per activity task
+        task_results: results of completed activity tasks, decoded on
+            first access
+        decoded_workflow_input: workflow input, once decoded
+        pending_dependencies: number of incomplete dependencies per task
+        n_complete: number of complete tasks
+        decider_identities: decider identities by decision-started event ID
+        decision_started_ids: decision-started event IDs by
+            decision-completed event ID
+        nbytes: estimated size of state (bytes)
+    """
+
+    workflow: "DAGWorkflow"
+    last_event_id: int = 0
+    workflow_input: str = None
+    activity_ids: t.Dict[int, str] = dataclasses.field(default_factory=dict)
+    task_events: t.Dict[str, t.Union[str, None]] = dataclasses.field(
+        default_factory=dict
+    )
+    task_results: _JSONValues = dataclasses.field(default_factory=_JSONValues)
+    decoded_workflow_input: t.Any = _sentinel
+    pending_dependencies: t.List[int] = dataclasses.field(default_factory=list)
+    n_complete: int = 0
+    decider_identities: t.Dict[int, str] = dataclasses.field(default_factory=dict)
+    decision_started_ids: t.Dict[int, int] = dataclasses.field(default_factory=dict)
+    nbytes: int = 0
+
+    def can_resume(
+        self, workflow: "DAGWorkflow", previous_started_event_id: int
+    ) -> bool:
+        """Check if state can be continued from for a decision task.
+
+        State is kept across reloads of its workflow (when name, version and
+        DAG are unchanged).
+
+        Args:
+            workflow: decision task's workflow specification
+            previous_started_event_id: decision task's previous
+                decision-task-started event ID
+
+        Returns:
+            whether state is up to the task's previous decision task, and for
+                an equivalent workflow
+        """
+
+        if self.last_event_id != previous_started_event_id:
+            return False
+        if self.workflow is workflow:
+            return True
+        return (
+            self.workflow.name == workflow.name
+            and self.workflow.version == workflow.version
+            and self.workflow.topology == workflow.topology
+        )
+
+
 class DAGBuilder(_base.DecisionsBuilder):
-    """SWF decision builder from DAG-type workflow specification."""
+    """SWF decision builder from DAG-type workflow specification.
+
+    Execution decision state is cached between decision tasks (keyed by run
+    ID), so that only new history events need to be processed. It's dropped
+    once the execution is closed by a decision.
+    """
+
+    streams_events = True
+    state_cache = _cache.execution_states
 
     def __init__(self, workflow: "DAGWorkflow", task):
         super().__init__(workflow, task)
         self.workflow = workflow
-        self._scheduled = {}
-        self._activity_task_events = {at.id: [] for at in workflow.task_specs}
-        self._new_events = None
+        self._state = None
+        self._new_events = []
         self._error_events = []
         self._ready_activities = set()
 
-    def _schedule_task(self, activity_task: Task):
-        workflow_started_event = self.task["events"][0]
-        assert workflow_started_event["eventType"] == "WorkflowExecutionStarted"
-        attrs = workflow_started_event["workflowExecutionStartedEventAttributes"]
-        decision_attributes = {
-            "activityId": activity_task.id,
-            "activityType": activity_task.type,
-        }
+    def _task_complete(self, activity_task_id: str) -> bool:
+        return self._state.task_events[activity_task_id] == "ActivityTaskCompleted"
 
-        # Build input
-        input_spec = activity_task.input
-        workflow_input = json.loads(attrs.get("input", "null"))
-        activity_results = {}
-        for activity_task_id, events in self._activity_task_events.items():
-            if activity_task_id in (activity_task.dependencies or []):
-                assert events[-1]["eventType"] == "ActivityTaskCompleted"
-            elif not events or events[-1]["eventType"] != "ActivityTaskCompleted":
-                continue
-            d_attrs = events[-1].get("activityTaskCompletedEventAttributes", {})
-            if "result" in d_attrs:
-                activity_results[activity_task_id] = json.loads(d_attrs["result"])
-        input_ = _build_activity_input(input_spec, workflow_input, activity_results)
-        if input_ is not _sentinel:
-            decision_attributes["input"] = json.dumps(input_)
-
-        # Set other attributes
-        if activity_task.heartbeat is not None:
-            decision_attributes["heartbeatTimeout"] = str(activity_task.heartbeat)
-        if activity_task.timeout is not None:
-            decision_attributes["startToCloseTimeout"] = str(activity_task.timeout)
-        if activity_task.task_list is not None:
-            decision_attributes["taskList"] = {"name": activity_task.task_list}
-        if activity_task.priority is not None:
-            decision_attributes["taskPriority"] = str(activity_task.priority)
+    def _get_workflow_input(self) -> t.Any:
+        state = self._state
+        if state.decoded_workflow_input is _sentinel:
+            assert state.workflow_input is not None
+            state.decoded_workflow_input = _json.loads(state.workflow_input)
+        return state.decoded_workflow_input
 
+    def _schedule_task(self, activity_task: Task):
+        for dependency_activity_task_id in activity_task.dependencies or []:
+            assert self._task_complete(dependency_activity_task_id)
+        template = self.workflow.schedule_templates[activity_task.id]
+        decision_attributes = template.build(
+            self._get_workflow_input, self._state.task_results
+        )
         decision = {
             "decisionType": "ScheduleActivityTask",
             "scheduleActivityTaskDecisionAttributes": decision_attributes,
         }
         self.decisions.append(decision)
 
-    def _get_scheduled_references(self):
-        for event in self.task["events"]:
-            if event["eventType"] in _activity_events:
-                if event["eventType"] == "ActivityTaskScheduled":
-                    self._scheduled[event["eventId"]] = event
-                else:
-                    attrs = event[_attr_keys[event["eventType"]]]
-                    self._scheduled[event["eventId"]] = _get(
-                        attrs["scheduledEventId"], self.task["events"], "eventId"
-                    )
-
-    def _get_activity_task_events(self):
+    def _take_state(self):
+        run_id = self.task.get("workflowExecution", {}).get("runId")
+        state = run_id and self.state_cache.take(run_id)
+        previous_started_id = self.task["previousStartedEventId"]
+        if state and not state.can_resume(self.workflow, previous_started_id):
+            logger.debug("Discarding stale decision state of run '%s'", run_id)
+            state = None
+        if state:
+            state.workflow = self.workflow
+        else:
+            topology = self.workflow.topology
+            state = _ExecutionState(self.workflow)
+            state.task_events = dict.fromkeys(topology.task_ids)
+            state.pending_dependencies = [len(d) for d in topology.dependencies]
+        self._state = state
+
+    def _put_state(self):
+        run_id = self.task.get("workflowExecution", {}).get("runId")
+        if any(d["decisionType"] in _closing_decisions for d in self.decisions):
+            logger.debug("Dropping decision state of closing run '%s'", run_id)
+        elif run_id:
+            self.state_cache.put(run_id, self._state, self._state.nbytes)
+
+    def _update_dependants(self, activity_task_id: str, complete: bool):
+        topology = self.workflow.topology
+        state = self._state
+        change = -1 if complete else 1
+        state.n_complete -= change
+        for dependant_idx in topology.get_dependants(
+            topology.indices[activity_task_id]
+        ):
+            state.pending_dependencies[dependant_idx] += change
+
+    def _apply_event(self, event: t.Dict[str, t.Any]):
+        state = self._state
+        event_type = event["eventType"]
+        if event_type == "WorkflowExecutionStarted":
+            attrs = event.get("workflowExecutionStartedEventAttributes", {})
+            state.workflow_input = attrs.get("input", "null")
+            state.nbytes += 2 * len(state.workflow_input)
+        elif event_type in _activity_events:
+            attrs = event[_attr_keys[event_type]]
+            if event_type == "ActivityTaskScheduled":
+                activity_task_id = attrs["activityId"]
+                state.activity_ids[event["eventId"]] = activity_task_id
+                state.nbytes += 100
+            else:
+                activity_task_id = state.activity_ids[attrs["scheduledEventId"]]
+            was_complete = (
+                state.task_events[activity_task_id] == "ActivityTaskCompleted"
+            )
+            state.task_events[activity_task_id] = event_type
+            if (event_type == "ActivityTaskCompleted") != was_complete:
+                self._update_dependants(activity_task_id, complete=not was_complete)
+            if event_type == "ActivityTaskScheduled":
+                state.task_results.discard(activity_task_id)
+            elif event_type == "ActivityTaskCompleted" and "result" in attrs:
+                state.task_results.set(activity_task_id, attrs["result"])
+                state.nbytes += 2 * len(attrs["result"])
+        elif event_type == "DecisionTaskStarted":
+            attrs = event.get("decisionTaskStartedEventAttributes", {})
+            state.decider_identities[event["eventId"]] = attrs.get("identity")
+            state.nbytes += 100
+        elif event_type == "DecisionTaskCompleted":
+            attrs = event.get("decisionTaskCompletedEventAttributes", {})
+            state.decision_started_ids[event["eventId"]] = attrs.get("startedEventId")
+            state.nbytes += 100
+
+    def _read_events(self):
+        started_id = self.task["startedEventId"]
+        previous_started_id = self.task["previousStartedEventId"]
+        last_event_id = self._state.last_event_id
+        from_start = not last_event_id
         for event in self.task["events"]:
-            if event["eventType"] in _activity_events:
-                scheduled_event = self._scheduled[event["eventId"]]
-                attrs = scheduled_event["activityTaskScheduledEventAttributes"]
-                self._activity_task_events[attrs["activityId"]].append(event)
+            if from_start and event["eventId"] != 1:
+                run_id = self.task.get("workflowExecution", {}).get("runId")
+                _fmt = "No decision state of run '%s' for history from event %d"
+                raise _base.PartialHistoryError(_fmt % (run_id, event["eventId"]))
+            from_start = False
+            if event["eventId"] > started_id:
+                break
+            if event["eventId"] <= last_event_id:
+                continue
+            self._apply_event(event)
+            if event["eventId"] > previous_started_id:
+                self._new_events.append(event)
+        self._state.last_event_id = started_id
 
     def _process_activity_task_completed_event(self, event: t.Dict[str, t.Any]):
-        scheduled_event = self._scheduled[event["eventId"]]
-        attrs = scheduled_event["activityTaskScheduledEventAttributes"]
-        dependants_task = self.workflow.dependants[attrs["activityId"]]
-
-        for activity_task_id in dependants_task:
-            assert not self._activity_task_events[activity_task_id]
-            task = next(a for a in self.workflow.task_specs if a.id == activity_task_id)
-
-            dependencies_satisfied = True
-            for dependency_activity_task_id in task.dependencies:
-                events = self._activity_task_events[dependency_activity_task_id]
-                if not events or events[-1]["eventType"] != "ActivityTaskCompleted":
-                    dependencies_satisfied = False
-                    break
-            if dependencies_satisfied:
-                self._ready_activities.add(task.id)
+        topology = self.workflow.topology
+        attrs = event["activityTaskCompletedEventAttributes"]
+        activity_task_id = self._state.activity_ids[attrs["scheduledEventId"]]
 
-    def _complete_workflow(self):
-        tasks_complete = True
-        for events in self._activity_task_events.values():
-            if not events or events[-1]["eventType"] != "ActivityTaskCompleted":
-                tasks_complete = False
-                break
+        for dependant_idx in topology.get_dependants(
+            topology.indices[activity_task_id]
+        ):
+            assert not self._state.task_events[topology.task_ids[dependant_idx]]
+            if not self._state.pending_dependencies[dependant_idx]:
+                self._ready_activities.add(dependant_idx)
 
-        if tasks_complete:
+    def _complete_workflow(self):
+        if self._state.n_complete == len(self._state.task_events):
             result = {}
-            for activity_id, events in self._activity_task_events.items():
-                assert events and events[-1]["eventType"] == "ActivityTaskCompleted"
-                attrs = events[-1].get("activityTaskCompletedEventAttributes")
-                if attrs and "result" in attrs:
-                    result[activity_id] = json.loads(attrs["result"])
+            task_results = self._state.task_results
+            for activity_task_id in self._state.task_events:
+                assert self._task_complete(activity_task_id)
+                if activity_task_id in task_results:
+                    result[activity_task_id] = task_results[activity_task_id]
 
             decision = {"decisionType": "CompleteWorkflowExecution"}
             if result:
-                decision_attrs = {"result": json.dumps(result)}
+                decision_attrs = {"result": _json.dumps(result)}
                 decision["completeWorkflowExecutionDecisionAttributes"] = decision_attrs
             self.decisions = [decision]
 
@@ -467,18 +955,14 @@ class DAGBuilder(_base.DecisionsBuilder):
         self.decisions = [decision]
 
     def _process_decision_failed(self, event: t.Dict[str, t.Any]) -> bool:
-        event_ids = [event["eventId"] for event in self.task["events"]]
         attrs = event[_attr_keys[event["eventType"]]]
         if attrs["cause"] == "OPERATION_NOT_PERMITTED":
-            idx = event_ids.index(attrs["DecisionTaskCompletedEventId"])
-            dc_event = self.task["events"][idx]
-            dc_attrs = dc_event["decisionTaskCompletedEventAttributes"]
-            idx = event_ids.index(dc_attrs["startedEventId"])
-            ds_event = self.task["events"][idx]
-            ds_attrs = ds_event["decisionTaskStartedEventAttributes"]
-            this_ds_event = self.task["events"][-1]
-            this_ds_attrs = this_ds_event["decisionTaskStartedEventAttributes"]
-            if ds_attrs["identity"] == this_ds_attrs["identity"]:
+            dc_event_id = attrs["DecisionTaskCompletedEventId"]
+            ds_event_id = self._state.decision_started_ids[dc_event_id]
+            identity = self._state.decider_identities[ds_event_id]
+            this_ds_event_id = self.task["startedEventId"]
+            this_identity = self._state.decider_identities[this_ds_event_id]
+            if identity == this_identity:
                 raise _base.DeciderError("Not permitted")
             else:
                 return False
@@ -495,8 +979,7 @@ class DAGBuilder(_base.DecisionsBuilder):
             return True
 
     def _schedule_initial_activity_tasks(self):
-        for task_id in self.workflow.dependants[None]:
-            self._ready_activities.add(task_id)
+        self._ready_activities.update(self.workflow.topology.roots)
 
     def _process_error_events(self):
         if not self._error_events:
@@ -548,32 +1031,23 @@ class DAGBuilder(_base.DecisionsBuilder):
         elif event["eventType"] == "WorkflowExecutionStarted":
             self._schedule_initial_activity_tasks()
 
-    def _get_new_events(self):
-        event_ids = [event["eventId"] for event in self.task["events"]]
-        current_idx = event_ids.index(self.task["startedEventId"])
-        previous_idx = -1
-        if self.task["previousStartedEventId"] in event_ids:
-            previous_idx = event_ids.index(self.task["previousStartedEventId"])
-        events = self.task["events"][previous_idx + 1 : current_idx + 1]
+    def _log_new_events(self):
         logger.debug(
-            "Processing %d events from index %d (ID: %s) to %d (ID: %s)",
-            len(events),
-            previous_idx + 1,
-            events[0]["eventId"],
-            current_idx,
-            events[-1]["eventId"],
+            "Processing %d events from ID %s to %s",
+            len(self._new_events),
+            self._new_events[0]["eventId"],
+            self._new_events[-1]["eventId"],
         )
-        self._new_events = events
 
     def _schedule_tasks(self):
-        for task_id in self._ready_activities:
-            task = next(ts for ts in self.workflow.task_specs if ts.id == task_id)
-            assert not self._activity_task_events[task.id]
+        for idx in sorted(self._ready_activities):
+            task = self.workflow.task_specs[idx]
+            assert not self._state.task_events[task.id]
             self._schedule_task(task)
 
     def _process_new_events(self):
-        assert self.task["events"][-1]["eventType"] == "DecisionTaskStarted"
-        assert self.task["events"][-2]["eventType"] == "DecisionTaskScheduled"
+        assert self._new_events[-1]["eventType"] == "DecisionTaskStarted"
+        assert self._new_events[-2]["eventType"] == "DecisionTaskScheduled"
 
         for event in self._new_events[:-2]:
             if event["eventType"] in _error_events:
@@ -587,10 +1061,11 @@ class DAGBuilder(_base.DecisionsBuilder):
         self._complete_workflow()
 
     def build_decisions(self):
-        self._get_scheduled_references()
-        self._get_activity_task_events()
-        self._get_new_events()
+        self._take_state()
+        self._read_events()
+        self._log_new_events()
         self._process_new_events()
+        self._put_state()
 
 
 class DAGWorkflow(_base.Workflow):
@@ -606,11 +1081,15 @@ class DAGWorkflow(_base.Workflow):
     decisions_builder = DAGBuilder
     _task_cls = Task
     dependants: t.Dict[t.Union[None, str], t.List[str]]
+    topology: _Topology
+    schedule_templates: t.Dict[str, _ScheduleTemplate]
 
     def __init__(self, name, version, task_specs: t.List[Task], description=None):
         super().__init__(name, version, description)
         self.task_specs = task_specs
         self.dependants = {None: []}
+        self.topology = None
+        self.schedule_templates = {}
 
     @classmethod
     def _args_from_spec(cls, spec):
@@ -620,14 +1099,15 @@ class DAGWorkflow(_base.Workflow):
         return args, kwargs
 
     def _build_dependants(self):
-        for activity_task in self.task_specs:
-            dependants_task = []
-            for other_activity_task in self.task_specs:
-                if activity_task.id in (other_activity_task.dependencies or []):
-                    dependants_task.append(other_activity_task.id)
-            self.dependants[activity_task.id] = dependants_task
-            if not activity_task.dependencies:
-                self.dependants[None].append(activity_task.id)
+        task_ids = self.topology.task_ids
+        self.dependants = {None: [task_ids[idx] for idx in self.topology.roots]}
+        for idx, task_id in enumerate(task_ids):
+            dependants_task = self.topology.get_dependants(idx)
+            self.dependants[task_id] = [task_ids[i] for i in dependants_task]
 
     def setup(self):
+        self.topology = _Topology.compile(self.task_specs)
         self._build_dependants()
+        self.schedule_templates = {
+            task.id: _ScheduleTemplate.compile(task) for task in self.task_specs
+        }
@@ -1,13 +1,24 @@
 """Workflows specs serialisation and desieralisation."""
 
+import os
+import sys
+import glob
 import json
 import typing as t
+import hashlib
 import logging as lg
+import marshal
 import pathlib
+import threading
 
+from .. import _json, _util
 from . import Workflow
 
 logger = lg.getLogger(__package__)
+CACHE_DIR_ENVIRONMENT_VARIABLE = "SEDDY_CACHE_DIR"
+_yaml_suffixes = (".yml", ".yaml")
+_suffixes = (".json",) + _yaml_suffixes
+_cache_write_failed = False
 
 
 class WorkflowNotFound(LookupError):
@@ -24,15 +35,190 @@ def _construct_workflows(workflows_spec: t.Dict[str, t.Any]) -> t.List[Workflow]
         workflow type specifications
     """
 
+    assert (1,) < tuple(map(int, workflows_spec["version"].split("."))) < (2,)
+    return [_construct_workflow(s) for s in workflows_spec["workflows"]]
+
+
+def _construct_workflow(workflow_spec: t.Dict[str, t.Any]) -> Workflow:
+    """Construct workflow from specification.
+
+    Args:
+        workflow_spec: workflow specification
+
+    Returns:
+        workflow type specification
+    """
+
     from . import WORKFLOW
 
-    assert (1,) < tuple(map(int, workflows_spec["version"].split("."))) < (2,)
-    workflows = []
-    for workflow_spec in workflows_spec["workflows"]:
-        workflow_cls = WORKFLOW[workflow_spec["spec_type"]]
-        workflow = workflow_cls.from_spec(workflow_spec)
-        workflows.append(workflow)
-    return workflows
+    workflow_cls = WORKFLOW[workflow_spec["spec_type"]]
+    return workflow_cls.from_spec(workflow_spec)
+
+
+def _get_spec_files(workflows_file: pathlib.Path) -> t.List[pathlib.Path]:
+    """Get workflows specifications files.
+
+    Args:
+        workflows_file: workflows specifications file path, directory of
+            specifications files (JSON or YAML, by suffix), or glob pattern of
+            specifications file paths
+
+    Returns:
+        specifications file paths, sorted if a directory or glob pattern
+
+    Raises:
+        FileNotFoundError: no files match glob pattern
+    """
+
+    workflows_file = pathlib.Path(workflows_file)
+    if workflows_file.is_dir():
+        paths = workflows_file.iterdir()
+        return sorted(p for p in paths if p.suffix in _suffixes and p.is_file())
+    pattern = str(workflows_file)
+    if not workflows_file.exists() and any(c in pattern for c in "*?["):
+        paths = sorted(pathlib.Path(p) for p in glob.glob(pattern))
+        if not paths:
+            _fmt = "No workflows specifications files match: %s"
+            raise FileNotFoundError(_fmt % pattern)
+        return paths
+    return [workflows_file]
+
+
+def load_file(path: pathlib.Path) -> t.Any:
+    """Load a JSON or YAML file.
+
+    Determines load method from the file suffix.
+
+    Args:
+        path: file path
+
+    Returns:
+        file content
+    """
+
+    return _parse(path.read_text(), path.suffix)
+
+
+def _parse(text: str, suffix: str) -> t.Any:
+    """Parse JSON or YAML, using the C YAML parser (libyaml) if available.
+
+    Args:
+        text: file content
+        suffix: file suffix, determining the format
+
+    Returns:
+        parsed content
+    """
+
+    if suffix == ".json":
+        return _json.loads(text)
+    elif suffix in _yaml_suffixes:
+        try:
+            import yaml
+        except ImportError as e:
+            try:
+                from ruamel import yaml
+            except ImportError as er:
+                raise e from er
+        loader = getattr(yaml, "CSafeLoader", None)
+        if loader is None:
+            return yaml.safe_load(text)
+        return yaml.load(text, Loader=loader)
+    raise ValueError("Unknown extension: %s" % suffix)
+
+
+def _get_cache_path(workflows_file: pathlib.Path) -> t.Union[pathlib.Path, None]:
+    """Get parsed workflows specifications cache file path.
+
+    The cache directory is ``$SEDDY_CACHE_DIR`` (set empty to disable
+    caching), default: ``seddy/specs`` in ``$XDG_CACHE_HOME`` (default:
+    ``~/.cache``). There's one cache file per specifications file path.
+
+    Args:
+        workflows_file: workflows specifications file path
+
+    Returns:
+        cache file path, or ``None`` if caching is disabled
+    """
+
+    cache_dir = os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE)
+    if cache_dir is None:
+        xdg_cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(xdg_cache_dir, "seddy", "specs")
+    elif not cache_dir:
+        return None
+    path_key = str(pathlib.Path(workflows_file).resolve()).encode("utf-8", "replace")
+    return pathlib.Path(cache_dir) / (hashlib.sha256(path_key).hexdigest() + ".bin")
+
+
+def _get_cache_key(text: str) -> bytes:
+    """Get parsed workflows specifications cache key.
+
+    The key changes with the specifications file's content, the ``seddy``
+    version, and the Python version (which determines the serialisation
+    format).
+    """
+
+    digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+    version = _util.get_version()
+    python_version = "%d.%d" % sys.version_info[:2]
+    key = "seddy %s, python %s, sha256 %s\n" % (version, python_version, digest)
+    return key.encode("utf-8")
+
+
+def _read_cache(cache_path: pathlib.Path, key: bytes) -> t.Any:
+    """Read parsed workflows specifications from cache.
+
+    Returns:
+        parsed workflows specifications, or ``None`` if not in cache (or
+            the cache is stale or invalid)
+    """
+
+    try:
+        with cache_path.open("rb") as f:
+            if f.readline() != key:
+                logger.debug("Stale workflows specifications cache")
+                return None
+            return marshal.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        logger.debug("Invalid workflows specifications cache: %s", e)
+        return None
+
+
+def _write_cache(cache_path: pathlib.Path, key: bytes, workflows_spec: t.Any):
+    """Write parsed workflows specifications to cache, replacing atomically.
+
+    Failure to write, or specifications which can't be serialised (eg
+    timestamps), are logged and ignored. Only the first failure to write in
+    the process is logged as a warning.
+    """
+
+    global _cache_write_failed
+
+    try:
+        data = key + marshal.dumps(workflows_spec)
+    except ValueError as e:
+        logger.debug("Can't cache workflows specifications: %s", e)
+        return
+
+    suffix = ".%d.%d.tmp" % (os.getpid(), threading.get_ident())
+    tmp_path = cache_path.with_name(cache_path.name + suffix)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        level = lg.DEBUG if _cache_write_failed else lg.WARNING
+        _cache_write_failed = True
+        logger.log(level, "Failed to write workflows specifications cache: %s", e)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
 
 
 def _load_specs(workflows_file: pathlib.Path) -> t.Dict[str, t.Any]:
@@ -43,6 +229,9 @@ def _load_specs(workflows_file: pathlib.Path) -> t.Dict[str, t.Any]:
     * JSON
     * YAML
 
+    Parsed YAML is cached (see ``_get_cache_path``), keyed by file content
+    and ``seddy`` version, so unchanged files aren't parsed again.
+
     Args:
         workflows_file: workflows specifications file path
 
@@ -51,19 +240,21 @@ def _load_specs(workflows_file: pathlib.Path) -> t.Dict[str, t.Any]:
     """
 
     logger.info("Loading workflows specifictions from '%s'", workflows_file)
-    workflows_text = workflows_file.read_text()
-    if workflows_file.suffix == ".json":
-        return json.loads(workflows_text)
-    elif workflows_file.suffix in (".yml", ".yaml"):
-        try:
-            import yaml
-        except ImportError as e:
-            try:
-                from ruamel import yaml
-            except ImportError as er:
-                raise e from er
-        return yaml.safe_load(workflows_text)
-    raise ValueError("Unknown extension: %s" % workflows_file.suffix)
+    if workflows_file.suffix not in _yaml_suffixes:
+        return load_file(workflows_file)
+    text = workflows_file.read_text()
+    cache_path = _get_cache_path(workflows_file)
+    if cache_path is None:
+        return _parse(text, workflows_file.suffix)
+
+    key = _get_cache_key(text)
+    workflows_spec = _read_cache(cache_path, key)
+    if workflows_spec is None:
+        workflows_spec = _parse(text, workflows_file.suffix)
+        _write_cache(cache_path, key, workflows_spec)
+    else:
+        logger.debug("Loaded workflows specifications from cache '%s'", cache_path)
+    return workflows_spec
 
 
 def load_workflows(workflows_file: pathlib.Path) -> t.List[Workflow]:
@@ -75,14 +266,78 @@ def load_workflows(workflows_file: pathlib.Path) -> t.List[Workflow]:
     * YAML
 
     Args:
-        workflows_file: workflows specifications file path
+        workflows_file: workflows specifications file path, directory of
+            specifications files (JSON or YAML, by suffix), or glob pattern of
+            specifications file paths
 
     Returns:
         workflows specifications
     """
 
-    workflows_specs = _load_specs(workflows_file)
-    return _construct_workflows(workflows_specs)
+    workflows = []
+    for path in _get_spec_files(workflows_file):
+        workflows.extend(_construct_workflows(_load_specs(path)))
+    return workflows
+
+
+def _get_spec_digest(workflow_spec: t.Dict[str, t.Any]) -> str:
+    """Hash a workflow's specification, independent of key order."""
+    spec_json = json.dumps(workflow_spec, sort_keys=True, default=str)
+    return hashlib.sha256(spec_json.encode("utf-8")).hexdigest()
+
+
+def _index_workflows(
+    workflows_file: pathlib.Path,
+) -> t.Dict[t.Tuple[str, str], t.Tuple[pathlib.Path, int, str]]:
+    """Index workflows specifications, without constructing workflows.
+
+    Of workflows with the same name and version, only the first is indexed.
+
+    Args:
+        workflows_file: workflows specifications file path, directory or
+            glob pattern
+
+    Returns:
+        workflows' specifications file path, position in the file's
+            workflows and specification digest, by workflow name and
+            version
+    """
+
+    index = {}
+    for path in _get_spec_files(workflows_file):
+        workflows_spec = _load_specs(path)
+        assert (1,) < tuple(map(int, workflows_spec["version"].split("."))) < (2,)
+        for j, workflow_spec in enumerate(workflows_spec["workflows"]):
+            key = (workflow_spec["name"], workflow_spec["version"])
+            if key in index:
+                _fmt = "Ignoring duplicate workflow '%s' (version %s)"
+                logger.warning(_fmt, *key)
+                continue
+            index[key] = (path, j, _get_spec_digest(workflow_spec))
+    return index
+
+
+def _find_workflow_spec(
+    workflow_specs: t.List[t.Dict[str, t.Any]],
+    name: str,
+    version: str,
+    position: int = 0,
+) -> t.Union[t.Dict[str, t.Any], None]:
+    """Find a workflow's specification, checking the expected position first.
+
+    Returns:
+        workflow specification, or ``None`` if not found
+    """
+
+    key = (name, version)
+    if position < len(workflow_specs):
+        workflow_spec = workflow_specs[position]
+        if (workflow_spec["name"], workflow_spec["version"]) == key:
+            return workflow_spec
+    for workflow_spec in workflow_specs:
+        if (workflow_spec["name"], workflow_spec["version"]) == key:
+            return workflow_spec
+    return None
 
 
 def get_workflow(
@@ -92,10 +347,13 @@ def get_workflow(
 ) -> Workflow:
     """Get workflow specification.
 
+    Specifications files are parsed in order until the workflow is found.
+
     Args:
         name: workflow name
         version: workflow version
-        workflows_spec_file: workflows specifications file path
+        workflows_spec_file: workflows specifications file path, directory
+            or glob pattern
 
     Returns:
         workflow specification
@@ -104,8 +362,251 @@ def get_workflow(
         WorkflowNotFound: if workflow with given name and version not found
     """
 
-    workflows = load_workflows(workflows_spec_file)
-    try:
-        return next(w for w in workflows if w.name == name and w.version == version)
-    except StopIteration:
-        raise WorkflowNotFound("name=%s, version=%s" % (name, version)) from None
+    for path in _get_spec_files(workflows_spec_file):
+        workflow_specs = _load_specs(path)["workflows"]
+        workflow_spec = _find_workflow_spec(workflow_specs, name, version)
+        if workflow_spec is not None:
+            return _construct_workflow(workflow_spec)
+    raise WorkflowNotFound("name=%s, version=%s" % (name, version))
+
+
+class WorkflowRegistry:
+    """Loaded and set-up workflows specifications, by name and version.
+
+    Workflows are loaded on the first call to ``load`` (or first lookup), and
+    only reloaded explicitly. Reloading swaps in the new workflows
+    atomically: workflows already retrieved are unaffected.
+
+    When lazy, loading only indexes workflows by name and version (with
+    their specifications' location and digest): each workflow is
+    constructed and set up on its first lookup (from its specifications
+    file), so set-up time and memory scale with the workflows in use.
+    Reloading keeps set-up workflows whose specification is unchanged, and
+    indexes without blocking lookups.
+
+    Args:
+        workflows_file: workflows specifications file path, directory or
+            glob pattern
+        lazy: construct and set up workflows on first lookup
+    """
+
+    def __init__(self, workflows_file: pathlib.Path = None, lazy: bool = False):
+        self.workflows_file = workflows_file
+        self.lazy = lazy
+        self._workflows = None
+        self._locations = None
+        self._digests = {}
+        self._file_signature = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_workflows(
+        cls, workflows: t.Iterable[Workflow], workflows_file: pathlib.Path = None
+    ) -> "WorkflowRegistry":
+        """Construct registry from workflows specifications.
+
+        Args:
+            workflows: workflows specifications, to be set up
+            workflows_file: workflows specifications file path
+        """
+
+        registry = cls(workflows_file)
+        registry._workflows = registry._index(workflows)
+        return registry
+
+    @staticmethod
+    def _index(
+        workflows: t.Iterable[Workflow],
+    ) -> t.Dict[t.Tuple[str, str], Workflow]:
+        """Set up and index workflows by name and version."""
+        index = {}
+        for workflow in workflows:
+            key = (workflow.name, workflow.version)
+            if key in index:
+                _fmt = "Ignoring duplicate workflow '%s' (version %s)"
+                logger.warning(_fmt, workflow.name, workflow.version)
+                continue
+            workflow.setup()
+            index[key] = workflow
+        return index
+
+    @property
+    def loaded(self) -> bool:
+        """Workflows specifications have been loaded."""
+        return self._workflows is not None
+
+    def _get_file_signature(
+        self,
+    ) -> t.Union[t.Tuple[t.Tuple[str, int, int, int], ...], None]:
+        """Get specifications files' paths, inodes, modification times and
+        sizes.
+        """
+
+        if self.workflows_file is None:
+            return None
+        try:
+            paths = _get_spec_files(self.workflows_file)
+            stats = [(str(p), os.stat(p)) for p in paths]
+        except OSError:  # eg file is being replaced
+            return None
+        return tuple((p, s.st_ino, s.st_mtime_ns, s.st_size) for p, s in stats)
+
+    @property
+    def changed(self) -> bool:
+        """Workflows specifications file has changed since last load (or
+        failed load): each change is only loaded once.
+        """
+
+        file_signature = self._get_file_signature()
+        return file_signature is not None and file_signature != self._file_signature
+
+    def load(self):
+        """(Re)load workflows specifications from file."""
+        # Recorded even on failure, so a bad change isn't retried until the
+        # file changes again
+        self._file_signature = self._get_file_signature()
+        if not self.lazy:
+            workflows = self._index(load_workflows(self.workflows_file))
+            with self._lock:
+                self._workflows = workflows
+                self._locations = None
+                self._digests = {}
+            logger.debug("Loaded %d workflows", len(workflows))
+            return
+
+        locations = _index_workflows(self.workflows_file)
+        with self._lock:
+            workflows = {
+                key: workflow
+                for key, workflow in (self._workflows or {}).items()
+                if key in locations and self._digests.get(key) == locations[key][2]
+            }
+            self._workflows = workflows
+            self._locations = locations
+            self._digests = {key: self._digests[key] for key in workflows}
+        _fmt = "Indexed %d workflows, keeping %d unchanged set-up workflows"
+        logger.debug(_fmt, len(locations), len(workflows))
+
+    def reload(self) -> bool:
+        """Reload workflows specifications, keeping current ones on failure.
+
+        Returns:
+            whether reload was successful
+        """
+
+        _fmt = "Reloading workflows specifications from '%s'"
+        logger.log(25, _fmt, self.workflows_file)
+        try:
+            self.load()
+        except Exception:
+            _fmt = "Failed to reload workflows specifications, keeping current"
+            logger.exception(_fmt)
+            return False
+        return True
+
+    def get(self, name: str, version: str) -> Workflow:
+        """Get set-up workflow specification.
+
+        Args:
+            name: workflow name
+            version: workflow version
+
+        Returns:
+            workflow specification
+
+        Raises:
+            WorkflowNotFound: if workflow with given name and version not found
+        """
+
+        if self._workflows is None:
+            self.load()
+        try:
+            return self._workflows[name, version]
+        except KeyError:
+            if self._locations is None:
+                _fmt = "name=%s, version=%s"
+                raise WorkflowNotFound(_fmt % (name, version)) from None
+        return self._load_workflow(name, version)
+
+    def _load_workflow(self, name: str, version: str) -> Workflow:
+        """Construct and set up an indexed workflow, on its first lookup.
+
+        The workflow is set up without holding the registry lock, and is
+        discarded if the registry is reloaded meanwhile.
+        """
+
+        key = (name, version)
+        with self._lock:
+            workflow = self._workflows.get(key)
+            if workflow is not None:  # constructed while waiting on lock
+                return workflow
+            locations = self._locations
+        if key not in locations:
+            raise WorkflowNotFound("name=%s, version=%s" % key)
+        path, position, _ = locations[key]
+        workflow_specs = _load_specs(path)["workflows"]
+        workflow_spec = _find_workflow_spec(workflow_specs, name, version, position)
+        if workflow_spec is None:  # removed since indexing
+            raise WorkflowNotFound("name=%s, version=%s" % key)
+        workflow = _construct_workflow(workflow_spec)
+        workflow.setup()
+        with self._lock:
+            if self._locations is locations:
+                workflow = self._workflows.setdefault(key, workflow)
+                self._digests.setdefault(key, _get_spec_digest(workflow_spec))
+        logger.debug("Set up workflow '%s' (version %s)", name, version)
+        return workflow
+
+    def __iter__(self) -> t.Iterator[Workflow]:
+        if self._locations is None:
+            return iter(list((self._workflows or {}).values()))
+        return iter([self.get(*key) for key in list(self._locations)])
+
+    def __len__(self) -> int:
+        if self._locations is None:
+            return len(self._workflows or {})
+        return len(self._locations)
+
+
+class RegistryWatcher:
+    """Reload a workflows registry in the background.
+
+    Reloads when triggered (eg on SIGHUP) and, if an interval is given, when
+    the workflows specifications file changes.
+
+    Args:
+        registry: workflows registry to reload
+        interval: specifications file change polling interval (seconds),
+            default: only reload when triggered
+    """
+
+    def __init__(self, registry: WorkflowRegistry, interval: float = None):
+        self.registry = registry
+        self.interval = interval
+        self._triggered = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="seddy-reloader", daemon=True
+        )
+
+    def _run(self):
+        while True:
+            triggered = self._triggered.wait(self.interval)
+            if self._stopped.is_set():
+                return
+            self._triggered.clear()
+            if triggered or self.registry.changed:
+                self.registry.reload()
+
+    def start(self):
+        """Start watching."""
+        self._thread.start()
+
+    def trigger(self):
+        """Trigger a reload."""
+        self._triggered.set()
+
+    def stop(self):
+        """Stop watching."""
+        self._stopped.set()
+        self._triggered.set()
@@ -2,8 +2,12 @@
 
 import os
 import sys
+import time
 import typing as t
 import logging as lg
+import functools
+import threading
+import concurrent.futures as cf
 
 logger = lg.getLogger(__package__)
 AWS_SWF_ENDPOINT_URL = os.environ.get("AWS_SWF_ENDPOINT_URL")
@@ -71,6 +75,102 @@ def setup_logging(verbose: int, json_logging: bool = False):
     lg.root.setLevel(level)
 
 
+@functools.lru_cache(maxsize=None)
+def get_version() -> t.Union[str, None]:
+    """Get installed ``seddy`` package version.
+
+    Returns:
+        package version, or ``None`` if not installed
+    """
+
+    try:
+        import importlib.metadata as importlib_metadata
+    except ImportError:
+        # noinspection PyUnresolvedReferences
+        import importlib_metadata
+
+    try:
+        return importlib_metadata.version("seddy")
+    except importlib_metadata.PackageNotFoundError:
+        return None
+
+
+class RateLimiter:
+    """Thread-safe token-bucket rate limiter.
+
+    Acquisitions beyond the burst wait for the bucket to refill, in the
+    order they were made.
+
+    Args:
+        rate: maximum mean rate of acquisitions (per second)
+        burst: maximum number of acquisitions without waiting
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("Rate must be positive: %s" % rate)
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until an acquisition is allowed by the rate limit."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate) - 1
+            self._updated = now
+            wait_time = -self._tokens / self.rate
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class PaginationError(RuntimeError):
+    """Failure to fetch a later page of a streamed listing."""
+
+
+def iter_paginated(
+    fn: t.Callable[..., t.Dict[str, t.Any]],
+    kwargs: t.Dict[str, t.Any] = None,
+    next_key: str = "nextPageToken",
+    next_arg: str = None,
+    prefetch: cf.Executor = None,
+) -> t.Generator[t.Dict[str, t.Any], None, None]:
+    """Iterate over pages of AWS resources.
+
+    Args:
+        fn: resource listing function
+        kwargs: keyword arguments to ``fn``
+        next_key: key of next-page token in response
+        next_arg: argument name of next-page token in ``fn``, default: same
+            as ``next_key``
+        prefetch: executor to request each next page in while the current
+            page is consumed, default: request pages on demand
+
+    Returns:
+        responses of ``fn``, without next-page token
+    """
+
+    next_arg = next_key if next_arg is None else next_arg
+    kwargs = dict(kwargs or {})
+    resp = fn(**kwargs)
+    while True:
+        next_token = resp.pop(next_key, None)
+        if not next_token:
+            yield resp
+            return
+        kwargs[next_arg] = next_token
+        if prefetch:
+            future = prefetch.submit(fn, **kwargs)
+            yield resp
+            resp = future.result()
+        else:
+            yield resp
+            resp = fn(**kwargs)
+
+
 def list_paginated(
     fn: t.Callable[..., t.Dict[str, t.Any]],
     list_key: str,
@@ -92,22 +192,131 @@ def list_paginated(
         collected response of ``fn``
     """
 
+    pages = iter_paginated(fn, kwargs, next_key, next_arg)
+    resp = next(pages)
+    for page in pages:
+        resp[list_key].extend(page[list_key])
+    return resp
+
+
+def stream_paginated(
+    fn: t.Callable[..., t.Dict[str, t.Any]],
+    list_key: str,
+    kwargs: t.Dict[str, t.Any] = None,
+    next_key: str = "nextPageToken",
+    next_arg: str = None,
+    prefetch: cf.Executor = None,
+) -> t.Dict[str, t.Any]:
+    """List AWS resources, streaming pagination.
+
+    Only the first page is requested up-front: later pages are requested as
+    the list is iterated over. Failure to request a later page is raised as
+    ``PaginationError`` from the list iterator.
+
+    Args:
+        fn: resource listing function
+        list_key: key of paginated list in response
+        kwargs: keyword arguments to ``fn``
+        next_key: key of next-page token in response
+        next_arg: argument name of next-page token in ``fn``, default: same
+            as ``next_key``
+        prefetch: executor to request each next page in while the current
+            page is consumed, default: request pages on demand
+
+    Returns:
+        first response of ``fn``, with the paginated list replaced by an
+            iterator over all pages' items
+    """
+
+    pages = iter_paginated(fn, kwargs, next_key, next_arg, prefetch)
+    resp = next(pages)
+    first_items = resp[list_key]
+
+    def iter_items():
+        yield from first_items
+        while True:
+            try:
+                page = next(pages)
+            except StopIteration:
+                return
+            except Exception as e:
+                raise PaginationError("Failed to list '%s'" % list_key) from e
+            yield from page[list_key]
+
+    resp[list_key] = iter_items()
+    return resp
+
+
+async def iter_paginated_async(
+    fn: t.Callable[..., t.Awaitable[t.Dict[str, t.Any]]],
+    kwargs: t.Dict[str, t.Any] = None,
+    next_key: str = "nextPageToken",
+    next_arg: str = None,
+) -> t.AsyncGenerator[t.Dict[str, t.Any], None]:
+    """Iterate over pages of AWS resources with an asynchronous function.
+
+    Args:
+        fn: resource listing coroutine function
+        kwargs: keyword arguments to ``fn``
+        next_key: key of next-page token in response
+        next_arg: argument name of next-page token in ``fn``, default: same
+            as ``next_key``
+
+    Returns:
+        responses of ``fn``, without next-page token
+    """
+
     next_arg = next_key if next_arg is None else next_arg
-    kwargs = kwargs or {}
-    resp = fn(**kwargs)
-    if resp.get(next_key):
-        kwargs = kwargs.copy()
-        kwargs[next_arg] = resp.pop(next_key)
-        new_resp = list_paginated(fn, list_key, kwargs, next_key, next_arg)
-        resp[list_key].extend(new_resp[list_key])
+    kwargs = dict(kwargs or {})
+    while True:
+        resp = await fn(**kwargs)
+        next_token = resp.pop(next_key, None)
+        yield resp
+        if not next_token:
+            return
+        kwargs[next_arg] = next_token
+
+
+async def list_paginated_async(
+    fn: t.Callable[..., t.Awaitable[t.Dict[str, t.Any]]],
+    list_key: str,
+    kwargs: t.Dict[str, t.Any] = None,
+    next_key: str = "nextPageToken",
+    next_arg: str = None,
+) -> t.Dict[str, t.Any]:
+    """List AWS resources with an asynchronous function, consuming pagination.
+
+    Args:
+        fn: resource listing coroutine function
+        list_key: key of paginated list in response
+        kwargs: keyword arguments to ``fn``
+        next_key: key of next-page token in response
+        next_arg: argument name of next-page token in ``fn``, default: same
+            as ``next_key``
+
+    Returns:
+        collected response of ``fn``
+    """
+
+    resp = None
+    async for page in iter_paginated_async(fn, kwargs, next_key, next_arg):
+        if resp is None:
+            resp = page
+        else:
+            resp[list_key].extend(page[list_key])
     return resp
 
 
-def get_swf_client(socket_read_timeout: float = None):
+def get_swf_client(socket_read_timeout: float = None, max_pool_connections: int = None):
     """Create an SWF client.
 
     Uses ``AWS_SWF_ENDPOINT_URL`` from environment for the endpoint URL.
 
+    Args:
+        socket_read_timeout: socket read time-out (seconds)
+        max_pool_connections: maximum number of connections kept in the
+            connection pool, default: botocore's default
+
     Returns:
         botocore.client.BaseClient: SWF client
     """
@@ -119,8 +328,32 @@ def get_swf_client(socket_read_timeout: float = None):
 
     if socket_read_timeout is not None:
         config.read_timeout = socket_read_timeout
+    if max_pool_connections is not None:
+        config.max_pool_connections = max_pool_connections
 
     logger.debug(
         "Creating SWF client with endpoint URL: %s", AWS_SWF_ENDPOINT_URL or "<default>"
     )
     return boto3.client("swf", endpoint_url=AWS_SWF_ENDPOINT_URL, config=config)
+
+
+def preload_swf_client():
+    """Load SWF client's service model and endpoint rules, before forking.
+
+    These are cached by boto3's default session, so SWF clients created
+    later in this process, or in processes forked from it (the
+    multi-process decider supervisor's deciders) are created without
+    loading them. Single-process deciders and registration still load them
+    once, on creating their client. The client is unsigned, so no
+    credentials are resolved, and no requests are made.
+    """
+
+    import boto3
+    import botocore
+    import botocore.config
+
+    logger.debug("Pre-loading SWF service model")
+    config = botocore.config.Config(signature_version=botocore.UNSIGNED)
+    boto3.client(
+        "swf", region_name="us-east-1", endpoint_url=AWS_SWF_ENDPOINT_URL, config=config
+    )
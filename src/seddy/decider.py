@@ -1,13 +1,21 @@
 """SWF decider."""
 
+import gc
+import os
+import time
 import uuid
+import signal
 import socket
 import typing as t
+import asyncio
 import logging as lg
 import pathlib
+import functools
+import threading
 from concurrent import futures as cf
 
 from . import _specs, _util
+from . import recording as _recording
 
 logger = lg.getLogger(__name__)
 
@@ -16,8 +24,8 @@ class UnsupportedWorkflow(LookupError):
     """Decider doesn't support workflow."""
 
 
-class Decider:
-    """SWF decider.
+class _BaseDecider:
+    """SWF decider base.
 
     Args:
         workflows_spec_file: workflows specifications file path
@@ -25,46 +33,107 @@ class Decider:
         task_list: SWF decider task-list
         identity: decider identity, default: automatically generated from
             fully-qualified domain-name and a UUID
+        n_pollers: number of decision task polls to keep outstanding
+        n_workers: number of decision tasks to handle concurrently
+        registry: workflows specifications registry, default: loaded from
+            ``workflows_spec_file`` on start-up
+        reload_interval: workflows specifications file change polling
+            interval (seconds), default: only reload on SIGHUP
+        recorder: decision task recorder, default: don't record
 
     Attributes:
-        client (botocore.client.BaseClient): SWF client
         identity (str): name of decider to poll as
+        state_cache (seddy._specs.ExecutionStateCache): cache of workflow
+            executions' decision state. While it's non-empty, history is
+            polled for in reverse order, stopping at cached state
     """
 
+    state_cache = _specs.execution_states
+
     def __init__(
         self,
         workflows_spec_file: pathlib.Path,
         domain: str,
         task_list: str,
         identity: str = None,
+        n_pollers: int = 1,
+        n_workers: int = 1,
+        registry: _specs.WorkflowRegistry = None,
+        reload_interval: float = None,
+        recorder: _recording.Recorder = None,
     ):
         self.workflows_spec_file = workflows_spec_file
         self.domain = domain
         self.task_list = task_list
-        self.client = _util.get_swf_client(socket_read_timeout=70.0)
+        self.n_pollers = n_pollers
+        self.n_workers = n_workers
         self.identity = identity or (socket.getfqdn() + "-" + str(uuid.uuid4())[:8])
-        self._future = None
+        if registry is None:
+            registry = _specs.WorkflowRegistry(workflows_spec_file)
+        self.registry = registry
+        self.recorder = recorder
+        self._watcher = _specs.RegistryWatcher(registry, reload_interval)
 
-    def _poll_for_decision_task(self) -> t.Dict[str, t.Any]:
-        """Poll for a decision task from SWF.
+    @property
+    def _concurrent(self) -> bool:
+        """Decision tasks are handled concurrently with polling."""
+        return self.n_pollers > 1 or self.n_workers > 1
 
-        See https://docs.aws.amazon.com/amazonswf/latest/apireference/API_PollForDecisionTask.html
-
-        Returns:
-            decision task
-        """
-
-        _kwargs = {
+    @property
+    def _poll_kwargs(self) -> t.Dict[str, t.Any]:
+        """Decision task poll request parameters."""
+        return {
             "domain": self.domain,
             "identity": self.identity,
             "taskList": {"name": self.task_list},
         }
-        return _util.list_paginated(
-            self.client.poll_for_decision_task, "events", _kwargs
-        )
+
+    @property
+    def _reverse_poll_kwargs(self) -> t.Dict[str, t.Any]:
+        """Decision task poll request parameters, for newest events first."""
+        return {**self._poll_kwargs, "reverseOrder": True}
+
+    def _get_cached_event_id(self, task: t.Dict[str, t.Any]) -> int:
+        """Get ID of the last event in task's execution's cached state.
+
+        Args:
+            task: decision task
+
+        Returns:
+            event ID, or 0 if state isn't cached or can't be resumed from
+        """
+
+        state = self.state_cache.get(task["workflowExecution"]["runId"])
+        if state is None:
+            return 0
+        try:
+            workflow = self._get_workflow(task)
+        except UnsupportedWorkflow:
+            return 0
+        if not state.can_resume(workflow, task["previousStartedEventId"]):
+            return 0
+        return state.last_event_id
+
+    def _get_history_kwargs(self, task: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        """Get full workflow execution history request arguments for task."""
+        return {"domain": self.domain, "execution": task["workflowExecution"]}
+
+    @staticmethod
+    def _history_reached(events: t.List[t.Dict[str, t.Any]], event_id: int) -> bool:
+        """Check if reverse-ordered history reaches past an event.
+
+        Args:
+            events: history events, newest first
+            event_id: ID of last event already processed, 0 for none
+
+        Returns:
+            whether no more history is needed
+        """
+
+        return bool(event_id and events and events[-1]["eventId"] <= event_id + 1)
 
     def _get_workflow(self, task: t.Dict[str, t.Any]) -> _specs.Workflow:
-        """Get workflow specification for task.
+        """Get set-up workflow specification for task.
 
         Args:
             task: decision task
@@ -76,10 +145,168 @@ class Decider:
         name = task["workflowType"]["name"]
         version = task["workflowType"]["version"]
         try:
-            return _specs.get_workflow(name, version, self.workflows_spec_file)
+            return self.registry.get(name, version)
         except _specs.WorkflowNotFound as e:
             raise UnsupportedWorkflow(task["workflowType"]) from e
 
+    def _load_workflows(self):
+        """Load workflows specifications, and start watching for changes."""
+        if not self.registry.loaded:
+            self.registry.load()
+        self._watcher.start()
+
+    def _handle_reload_signal(self, *_):
+        """Reload workflows specifications in the background."""
+        self._watcher.trigger()
+
+    def _make_decisions(
+        self, task: t.Dict[str, t.Any]
+    ) -> t.Tuple[t.List[t.Dict[str, t.Any]], t.Union[Exception, None]]:
+        """Make decisions for a decision task.
+
+        Args:
+            task: decision task
+
+        Returns:
+            workflow decisions, and the decision-building error if any
+
+        Raises:
+            UnsupportedWorkflow: if task's workflow is not in specifications
+            seddy._util.PaginationError: if task's history couldn't be fetched
+            seddy._specs.PartialHistoryError: if task's history is partial,
+                and its execution's state is no longer cached
+        """
+
+        logger.info(
+            "Got decision task '%s' for workflow '%s-%s' execution '%s' (run '%s')",
+            task["taskToken"],
+            task["workflowType"]["name"],
+            task["workflowType"]["version"],
+            task["workflowExecution"]["workflowId"],
+            task["workflowExecution"]["runId"],
+        )
+        try:
+            workflow = self._get_workflow(task)
+        except UnsupportedWorkflow:
+            logger.error("Unsupported workflow type: %s" % task["workflowType"])
+            raise
+
+        if self.recorder:
+            task["events"] = list(task["events"])
+        start = time.perf_counter()
+        try:
+            decisions, exc = workflow.make_decisions(task), None
+        except (_util.PaginationError, _specs.PartialHistoryError):
+            raise
+        except Exception as e:
+            decisions, exc = _specs.make_decisions_on_error(e), e
+        if self.recorder:
+            self.recorder.record(task, decisions, time.perf_counter() - start)
+        return decisions, exc
+
+
+class Decider(_BaseDecider):
+    """SWF decider.
+
+    Decision tasks are polled for and handled in threads.
+
+    Args:
+        workflows_spec_file: workflows specifications file path
+        domain: SWF domain to poll in
+        task_list: SWF decider task-list
+        identity: decider identity, default: automatically generated from
+            fully-qualified domain-name and a UUID
+        n_pollers: number of decision task polls to keep outstanding
+        n_workers: number of decision tasks to handle concurrently
+        registry: workflows specifications registry, default: loaded from
+            ``workflows_spec_file`` on start-up
+        reload_interval: workflows specifications file change polling
+            interval (seconds), default: only reload on SIGHUP
+        recorder: decision task recorder, default: don't record
+
+    Attributes:
+        client (botocore.client.BaseClient): SWF client
+        identity (str): name of decider to poll as
+    """
+
+    def __init__(
+        self,
+        workflows_spec_file: pathlib.Path,
+        domain: str,
+        task_list: str,
+        identity: str = None,
+        n_pollers: int = 1,
+        n_workers: int = 1,
+        registry: _specs.WorkflowRegistry = None,
+        reload_interval: float = None,
+        recorder: _recording.Recorder = None,
+    ):
+        super().__init__(
+            workflows_spec_file,
+            domain,
+            task_list,
+            identity,
+            n_pollers,
+            n_workers,
+            registry,
+            reload_interval,
+            recorder,
+        )
+        self.client = _util.get_swf_client(
+            socket_read_timeout=70.0,
+            max_pool_connections=max(10, n_pollers + 2 * n_workers),
+        )
+        self._executor = cf.ThreadPoolExecutor(
+            max_workers=n_workers, thread_name_prefix="seddy-decision"
+        )
+        self._history_executor = cf.ThreadPoolExecutor(
+            max_workers=n_workers, thread_name_prefix="seddy-history"
+        )
+        self._worker_slots = threading.BoundedSemaphore(n_workers)
+        self._futures = set()
+        self._futures_lock = threading.Lock()
+        self._pollers = []
+        self._poller_error = None
+        self._stop = threading.Event()
+
+    def _poll_for_decision_task(self) -> t.Dict[str, t.Any]:
+        """Poll for a decision task from SWF.
+
+        See https://docs.aws.amazon.com/amazonswf/latest/apireference/API_PollForDecisionTask.html
+
+        With no cached execution state, only the first page of history is
+        fetched here: later pages are fetched (one page ahead) as the task's
+        events are consumed. Otherwise, history is polled for newest-first,
+        and only fetched back to the task's execution's cached state.
+
+        Returns:
+            decision task, with an iterable of its history events
+        """
+
+        if not self.state_cache:
+            return _util.stream_paginated(
+                self.client.poll_for_decision_task,
+                "events",
+                self._poll_kwargs,
+                prefetch=self._history_executor,
+            )
+
+        pages = _util.iter_paginated(
+            self.client.poll_for_decision_task, self._reverse_poll_kwargs
+        )
+        task = next(pages)
+        if not task.get("taskToken"):
+            return task
+        event_id = self._get_cached_event_id(task)
+        events = task["events"]
+        while not self._history_reached(events, event_id):
+            page = next(pages, None)
+            if page is None:
+                break
+            events.extend(page["events"])
+        events.reverse()
+        return task
+
     def _respond_decision_task_completed(
         self, decisions: t.List[t.Dict[str, t.Any]], task: t.Dict[str, t.Any]
     ):
@@ -100,48 +327,111 @@ class Decider:
         )
 
     def _poll_and_run(self):
-        """Perform poll, and possibly run decision task."""
-        task = self._poll_for_decision_task()
+        """Perform poll, and possibly run decision task.
+
+        Waits for a decision worker to be free before polling, so that no more
+        tasks are accepted than can be handled. When running concurrently,
+        decision task errors are logged rather than raised.
+        """
+
+        self._worker_slots.acquire()
+        if self._stop.is_set():
+            self._worker_slots.release()
+            return
+        try:
+            task = self._poll_for_decision_task()
+        except BaseException:
+            self._worker_slots.release()
+            raise
         logger.debug("Decision task: %s", task)
         if not task["taskToken"]:
+            self._worker_slots.release()
             return
-        executor = cf.ThreadPoolExecutor(max_workers=1)
-        self._future = executor.submit(self._decide_and_respond, task)
-        self._future.result()
+
+        future = self._executor.submit(self._decide_and_respond, task)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._decision_done)
+        if not self._concurrent:
+            future.result()
+
+    def _decision_done(self, future: cf.Future):
+        """Release decision worker on decision task completion."""
+        with self._futures_lock:
+            self._futures.discard(future)
+        self._worker_slots.release()
+        if self._concurrent and not future.cancelled() and future.exception():
+            logger.error("Decision task failed", exc_info=future.exception())
 
     def _decide_and_respond(self, task):
-        """Make and respond with decisions."""
-        logger.info(
-            "Got decision task '%s' for workflow '%s-%s' execution '%s' (run '%s')",
-            task["taskToken"],
-            task["workflowType"]["name"],
-            task["workflowType"]["version"],
-            task["workflowExecution"]["workflowId"],
-            task["workflowExecution"]["runId"],
-        )
-        try:
-            workflow = self._get_workflow(task)
-        except UnsupportedWorkflow:
-            logger.error("Unsupported workflow type: %s" % task["workflowType"])
-            raise
-        workflow.setup()
+        """Make and respond with decisions.
+
+        If task's history was only partially fetched, but its execution's
+        state was evicted or discarded since polling, the full history is
+        fetched and decisions made from that instead.
+        """
 
-        exc = None
         try:
-            decisions = workflow.make_decisions(task)
-        except Exception as e:
-            decisions = _specs.make_decisions_on_error(e)
-            exc = e
+            decisions, exc = self._make_decisions(task)
+        except _specs.PartialHistoryError as e:
+            logger.warning("%s: fetching full history", e)
+            history = _util.list_paginated(
+                self.client.get_workflow_execution_history,
+                "events",
+                self._get_history_kwargs(task),
+            )
+            task = {**task, "events": history["events"]}
+            decisions, exc = self._make_decisions(task)
         self._respond_decision_task_completed(decisions, task)
         if exc:
             raise exc
 
+    def _poll_continuously(self):
+        """Poll for and run decision tasks until stopped."""
+        try:
+            while not self._stop.is_set():
+                self._poll_and_run()
+        except Exception as e:
+            self._poller_error = e
+            self._stop.set()
+
     def _run_uncaught(self):
         """Run decider."""
+        self._load_workflows()
+        if hasattr(signal, "SIGHUP"):
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGHUP, self._handle_reload_signal)
         _fmt = "Polling for tasks in domain '%s' with task-list '%s' as '%s'"
         logger.log(25, _fmt, self.domain, self.task_list, self.identity)
-        while True:
-            self._poll_and_run()
+        if self.n_pollers == 1:
+            while not self._stop.is_set():
+                self._poll_and_run()
+            return
+
+        for j in range(self.n_pollers):
+            name = "seddy-poller-%d" % j
+            thread = threading.Thread(target=self._poll_continuously, name=name)
+            thread.start()
+            self._pollers.append(thread)
+        self._stop.wait()
+        if self._poller_error:
+            raise self._poller_error
+
+    def _drain(self):
+        """Wait on in-flight polls and decision tasks to be handled."""
+        pollers = [thread for thread in self._pollers if thread.is_alive()]
+        if pollers:
+            logger.log(25, "Waiting on %d in-flight polls", len(pollers))
+            for thread in pollers:
+                thread.join()
+        with self._futures_lock:
+            futures = list(self._futures)
+        if futures:
+            _fmt = "Waiting on %d current decision tasks to be handled"
+            logger.log(25, _fmt, len(futures))
+            cf.wait(futures)
+        self._executor.shutdown(wait=True)
+        self._history_executor.shutdown(wait=True)
 
     def run(self):
         """Run decider."""
@@ -149,13 +439,483 @@ class Decider:
             self._run_uncaught()
         except KeyboardInterrupt:
             logger.info("Quitting due to keyboard-interrupt")
-        if self._future and self._future.running():
-            logger.log(25, "Waiting on current decision task to be handled")
-            self._future.result()
+        finally:
+            self._stop.set()
+            self._watcher.stop()
+            self._drain()
+
+
+class ExecutorTransport:
+    """Asynchronous SWF transport, running blocking client calls in threads.
+
+    Any object providing awaitable ``poll_for_decision_task``,
+    ``respond_decision_task_completed`` and
+    ``get_workflow_execution_history`` methods (for example an
+    ``aiobotocore`` SWF client) can be used as an ``AsyncDecider``
+    transport instead.
+
+    Args:
+        client (botocore.client.BaseClient): SWF client
+        max_workers: maximum number of concurrent client calls
+    """
+
+    def __init__(self, client, max_workers: int = None):
+        self.client = client
+        self._executor = cf.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="seddy-transport"
+        )
+
+    async def _call(self, method_name: str, **kwargs) -> t.Dict[str, t.Any]:
+        fn = functools.partial(getattr(self.client, method_name), **kwargs)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, fn)
+
+    async def poll_for_decision_task(self, **kwargs) -> t.Dict[str, t.Any]:
+        """Poll for a decision task from SWF."""
+        return await self._call("poll_for_decision_task", **kwargs)
+
+    async def respond_decision_task_completed(self, **kwargs) -> t.Dict[str, t.Any]:
+        """Send decisions to SWF."""
+        return await self._call("respond_decision_task_completed", **kwargs)
+
+    async def get_workflow_execution_history(self, **kwargs) -> t.Dict[str, t.Any]:
+        """Get workflow execution history from SWF."""
+        return await self._call("get_workflow_execution_history", **kwargs)
+
+    def close(self):
+        """Release transport resources."""
+        self._executor.shutdown(wait=False)
+
+
+class AsyncDecider(_BaseDecider):
+    """SWF decider, running on an ``asyncio`` event loop.
+
+    Decision task polls and responses are coroutines; decisions are built
+    on the event loop.
+
+    Args:
+        workflows_spec_file: workflows specifications file path
+        domain: SWF domain to poll in
+        task_list: SWF decider task-list
+        identity: decider identity, default: automatically generated from
+            fully-qualified domain-name and a UUID
+        n_pollers: number of decision task polls to keep outstanding
+        n_workers: number of decision tasks to handle concurrently
+        registry: workflows specifications registry, default: loaded from
+            ``workflows_spec_file`` on start-up
+        reload_interval: workflows specifications file change polling
+            interval (seconds), default: only reload on SIGHUP
+        recorder: decision task recorder, default: don't record
+        transport: asynchronous SWF transport, default: an
+            ``ExecutorTransport`` for a new SWF client
+
+    Attributes:
+        identity (str): name of decider to poll as
+    """
+
+    def __init__(
+        self,
+        workflows_spec_file: pathlib.Path,
+        domain: str,
+        task_list: str,
+        identity: str = None,
+        n_pollers: int = 1,
+        n_workers: int = 1,
+        registry: _specs.WorkflowRegistry = None,
+        reload_interval: float = None,
+        recorder: _recording.Recorder = None,
+        transport=None,
+    ):
+        super().__init__(
+            workflows_spec_file,
+            domain,
+            task_list,
+            identity,
+            n_pollers,
+            n_workers,
+            registry,
+            reload_interval,
+            recorder,
+        )
+        if transport is None:
+            client = _util.get_swf_client(
+                socket_read_timeout=70.0,
+                max_pool_connections=max(10, n_pollers + n_workers),
+            )
+            transport = ExecutorTransport(client, max_workers=n_pollers + n_workers)
+        self.transport = transport
+        self._worker_slots = None
+        self._decisions = set()
+        self._stopping = False
+
+    async def _poll_for_decision_task(self) -> t.Dict[str, t.Any]:
+        """Poll for a decision task from SWF.
+
+        See https://docs.aws.amazon.com/amazonswf/latest/apireference/API_PollForDecisionTask.html
+
+        While there is cached execution state, history is polled for
+        newest-first, and only fetched back to the task's execution's cached
+        state.
+
+        Returns:
+            decision task
+        """
+
+        if not self.state_cache:
+            return await _util.list_paginated_async(
+                self.transport.poll_for_decision_task, "events", self._poll_kwargs
+            )
+
+        pages = _util.iter_paginated_async(
+            self.transport.poll_for_decision_task, self._reverse_poll_kwargs
+        )
+        task = await pages.__anext__()
+        if not task.get("taskToken"):
+            return task
+        event_id = self._get_cached_event_id(task)
+        events = task["events"]
+        while not self._history_reached(events, event_id):
+            try:
+                page = await pages.__anext__()
+            except StopAsyncIteration:
+                break
+            events.extend(page["events"])
+        await pages.aclose()
+        events.reverse()
+        return task
+
+    async def _respond_decision_task_completed(
+        self, decisions: t.List[t.Dict[str, t.Any]], task: t.Dict[str, t.Any]
+    ):
+        """Send decisions to SWF.
+
+        See https://docs.aws.amazon.com/amazonswf/latest/apireference/API_RespondDecisionTaskCompleted.html
+
+        Args:
+            decisions: workflow decisions
+            task: decision task
+        """
+
+        logger.debug(
+            "Sending %d decisions for task '%s'", len(decisions), task["taskToken"]
+        )
+        await self.transport.respond_decision_task_completed(
+            taskToken=task["taskToken"], decisions=decisions
+        )
+
+    async def _decide_and_respond(self, task: t.Dict[str, t.Any]):
+        """Make and respond with decisions.
+
+        If task's history was only partially fetched, but its execution's
+        state was evicted or discarded since polling, the full history is
+        fetched and decisions made from that instead.
+        """
+
+        try:
+            decisions, exc = self._make_decisions(task)
+        except _specs.PartialHistoryError as e:
+            logger.warning("%s: fetching full history", e)
+            history = await _util.list_paginated_async(
+                self.transport.get_workflow_execution_history,
+                "events",
+                self._get_history_kwargs(task),
+            )
+            task = {**task, "events": history["events"]}
+            decisions, exc = self._make_decisions(task)
+        await self._respond_decision_task_completed(decisions, task)
+        if exc:
+            raise exc
+
+    def _decision_done(self, future: asyncio.Future):
+        """Release decision worker on decision task completion."""
+        self._decisions.discard(future)
+        self._worker_slots.release()
+        if not future.cancelled() and future.exception():
+            logger.error("Decision task failed", exc_info=future.exception())
+
+    async def _poll_and_run(self):
+        """Perform poll, and possibly start decision task handling.
+
+        Waits for a decision worker to be free before polling, so that no more
+        tasks are accepted than can be handled.
+        """
+
+        await self._worker_slots.acquire()
+        if self._stopping:
+            self._worker_slots.release()
+            return
+        try:
+            task = await self._poll_for_decision_task()
+        except BaseException:
+            self._worker_slots.release()
+            raise
+        logger.debug("Decision task: %s", task)
+        if not task["taskToken"]:
+            self._worker_slots.release()
+            return
+
+        future = asyncio.ensure_future(self._decide_and_respond(task))
+        self._decisions.add(future)
+        future.add_done_callback(self._decision_done)
+
+    async def _poll_continuously(self):
+        """Poll for and run decision tasks until stopped."""
+        while not self._stopping:
+            await self._poll_and_run()
+
+    def stop(self):
+        """Stop polling, finishing in-flight polls and decision tasks."""
+        logger.info("Stopping decider")
+        self._stopping = True
+
+    def _add_signal_handlers(self) -> t.List[int]:
+        loop = asyncio.get_event_loop()
+        handlers = {signal.SIGINT: self.stop, signal.SIGTERM: self.stop}
+        if hasattr(signal, "SIGHUP"):
+            handlers[signal.SIGHUP] = self._handle_reload_signal
+        signals = []
+        for signum, handler in handlers.items():
+            try:
+                loop.add_signal_handler(signum, handler)
+            except (NotImplementedError, RuntimeError):  # pragma: no cover
+                continue
+            signals.append(signum)
+        return signals
+
+    async def run(self):
+        """Run decider.
+
+        Stops on SIGINT or SIGTERM, waiting on in-flight polls and decision
+        tasks to be handled.
+        """
+
+        self._load_workflows()
+        _fmt = "Polling for tasks in domain '%s' with task-list '%s' as '%s'"
+        logger.log(25, _fmt, self.domain, self.task_list, self.identity)
+        self._worker_slots = asyncio.Semaphore(self.n_workers)
+        signals = self._add_signal_handlers()
+        pollers = [
+            asyncio.ensure_future(self._poll_continuously())
+            for _ in range(self.n_pollers)
+        ]
+        try:
+            await asyncio.wait(pollers, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            self._stopping = True
+            self._watcher.stop()
+            for signum in signals:
+                asyncio.get_event_loop().remove_signal_handler(signum)
+            pending = [p for p in pollers if not p.done()]
+            if pending:
+                logger.log(25, "Waiting on %d in-flight polls", len(pending))
+                await asyncio.wait(pending)
+            if self._decisions:
+                _fmt = "Waiting on %d current decision tasks to be handled"
+                logger.log(25, _fmt, len(self._decisions))
+                await asyncio.wait(list(self._decisions))
+        for poller in pollers:
+            if not poller.cancelled() and poller.exception():
+                raise poller.exception()
+
+
+class Supervisor:
+    """Pre-fork multi-process decider supervisor.
+
+    Loads and sets up workflows specifications once, then forks decider
+    processes which share them. Crashed deciders are restarted, and SIGTERM
+    (or SIGINT) is forwarded to deciders to finish their current decision
+    tasks before exiting. SIGHUP reloads workflows specifications, in the
+    supervisor (for restarted deciders) and in each decider.
+
+    With ``lazy_workflows`` in ``decider_kwargs``, workflows are only
+    indexed before forking, and each decider sets up workflows as needed.
+
+    Args:
+        workflows_spec_file: workflows specifications file path
+        domain: SWF domain to poll in
+        task_list: SWF decider task-list
+        identity: deciders' identity prefix, default: automatically generated
+            for each decider
+        n_processes: number of decider processes
+        decider_kwargs: keyword arguments to each decider's ``run_app``
+    """
+
+    restart_interval = 1.0
+
+    def __init__(
+        self,
+        workflows_spec_file: pathlib.Path,
+        domain: str,
+        task_list: str,
+        identity: str = None,
+        n_processes: int = 2,
+        decider_kwargs: t.Dict[str, t.Any] = None,
+    ):
+        self.workflows_spec_file = workflows_spec_file
+        self.domain = domain
+        self.task_list = task_list
+        self.identity = identity
+        self.n_processes = n_processes
+        self.decider_kwargs = decider_kwargs or {}
+        lazy = self.decider_kwargs.get("lazy_workflows", False)
+        self._registry = _specs.WorkflowRegistry(workflows_spec_file, lazy=lazy)
+        self._children = {}
+        self._stopping = False
+
+    def _load_workflows(self):
+        """Load workflows specifications and SWF client model, freezing them."""
+        self._registry.load()
+        _util.preload_swf_client()
+        gc.collect()
+        if hasattr(gc, "freeze"):  # keep shared pages from garbage-collector writes
+            gc.freeze()
+
+    def _run_decider(self, index: int):
+        """Run a decider, in the forked process."""
+        identity = self.identity and "%s-%d" % (self.identity, index)
+        _run(
+            self.workflows_spec_file,
+            self.domain,
+            self.task_list,
+            identity,
+            registry=self._registry,
+            **self.decider_kwargs,
+        )
+
+    def _spawn(self, index: int):
+        """Fork a decider process."""
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            code = 0
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGTERM, signal.default_int_handler)
+                if hasattr(signal, "SIGHUP"):
+                    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+                self._run_decider(index)
+            except BaseException:
+                logger.exception("Decider %d failed", index)
+                code = 1
+            finally:
+                lg.shutdown()
+                os._exit(code)
+        logger.info("Started decider %d with PID %d", index, pid)
+        self._children[pid] = (index, time.monotonic())
+
+    def _handle_stop_signal(self, signum: int, _):
+        """Forward stop signal to deciders."""
+        logger.info("Stopping deciders on signal %d", signum)
+        self._stopping = True
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:  # pragma: no cover
+                pass
+
+    def _handle_reload_signal(self, signum: int, _):
+        """Reload workflows specifications, and forward signal to deciders."""
+        self._registry.reload()
+        for pid in self._children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:  # pragma: no cover
+                pass
+
+    def run(self):
+        """Run deciders until stopped."""
+        if not hasattr(os, "fork"):  # pragma: no cover
+            raise RuntimeError("Multi-process decider requires 'os.fork'")
+        self._load_workflows()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_stop_signal)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._handle_reload_signal)
+
+        _fmt = "Starting %d deciders in domain '%s' with task-list '%s'"
+        logger.log(25, _fmt, self.n_processes, self.domain, self.task_list)
+        for index in range(self.n_processes):
+            self._spawn(index)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:  # pragma: no cover
+                break
+            if pid not in self._children:  # pragma: no cover
+                continue
+            index, started = self._children.pop(pid)
+            if self._stopping:
+                logger.info("Decider %d (PID %d) exited", index, pid)
+                continue
+            _fmt = "Decider %d (PID %d) exited unexpectedly with status %d"
+            logger.warning(_fmt, index, pid, status)
+            elapsed = time.monotonic() - started
+            if elapsed < self.restart_interval:
+                time.sleep(self.restart_interval - elapsed)
+            if not self._stopping:
+                self._spawn(index)
+        logger.log(25, "All deciders stopped")
+
+
+def _run(
+    workflows_spec_file: pathlib.Path,
+    domain: str,
+    task_list: str,
+    identity: str = None,
+    n_pollers: int = 1,
+    n_workers: int = 1,
+    engine: str = "thread",
+    reload_interval: float = None,
+    record_dir: pathlib.Path = None,
+    record_max_bytes: int = None,
+    record_compression: str = "gzip",
+    lazy_workflows: bool = False,
+    registry: _specs.WorkflowRegistry = None,
+):
+    """Run a decider."""
+    if registry is None and lazy_workflows:
+        registry = _specs.WorkflowRegistry(workflows_spec_file, lazy=True)
+    recorder = None
+    if record_dir:
+        recorder = _recording.Recorder(
+            record_dir, record_max_bytes or 64 * 1024**2, record_compression
+        )
+    decider_cls = AsyncDecider if engine == "asyncio" else Decider
+    decider = decider_cls(
+        workflows_spec_file,
+        domain,
+        task_list,
+        identity,
+        n_pollers,
+        n_workers,
+        registry,
+        reload_interval,
+        recorder,
+    )
+    try:
+        if engine == "asyncio":
+            asyncio.run(decider.run())
+        else:
+            decider.run()
+    finally:
+        if recorder:
+            recorder.close()
 
 
 def run_app(
-    workflows_spec_file: pathlib.Path, domain: str, task_list: str, identity: str = None
+    workflows_spec_file: pathlib.Path,
+    domain: str,
+    task_list: str,
+    identity: str = None,
+    n_pollers: int = 1,
+    n_workers: int = 1,
+    engine: str = "thread",
+    n_processes: int = 1,
+    reload_interval: float = None,
+    record_dir: pathlib.Path = None,
+    record_max_bytes: int = None,
+    record_compression: str = "gzip",
+    lazy_workflows: bool = False,
 ):
     """Run decider application.
 
@@ -164,7 +924,45 @@ def run_app(
         domain: SWF domain
         task_list: SWF decider task-list
         identity: decider identity, default: automatically generated
+        n_pollers: number of decision task polls to keep outstanding
+        n_workers: number of decision tasks to handle concurrently
+        engine: decider concurrency engine, "thread" or "asyncio"
+        n_processes: number of decider processes, run under a pre-fork
+            supervisor if more than one
+        reload_interval: workflows specifications file change polling
+            interval (seconds), default: only reload on SIGHUP
+        record_dir: directory to record decision tasks to, default: don't
+            record
+        record_max_bytes: recording file size to start a new file at,
+            default: 64 MiB
+        record_compression: recording compression, "gzip" or "zstd"
+        lazy_workflows: construct and set up each workflow on its first
+            decision task, instead of all on start-up
     """
 
-    decider = Decider(workflows_spec_file, domain, task_list, identity)
-    decider.run()
+    decider_kwargs = dict(
+        n_pollers=n_pollers,
+        n_workers=n_workers,
+        engine=engine,
+        reload_interval=reload_interval,
+    )
+    if record_dir:
+        decider_kwargs.update(
+            record_dir=record_dir,
+            record_max_bytes=record_max_bytes,
+            record_compression=record_compression,
+        )
+    if lazy_workflows:
+        decider_kwargs.update(lazy_workflows=lazy_workflows)
+    if n_processes > 1:
+        supervisor = Supervisor(
+            workflows_spec_file,
+            domain,
+            task_list,
+            identity,
+            n_processes,
+            decider_kwargs,
+        )
+        supervisor.run()
+        return
+    _run(workflows_spec_file, domain, task_list, identity, **decider_kwargs)
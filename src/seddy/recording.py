@@ -0,0 +1,470 @@
+"""Decision task recording and replay."""
+
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import queue
+import typing as t
+import logging as lg
+import pathlib
+import datetime
+import threading
+import dataclasses
+import multiprocessing
+
+from . import _json, _specs
+
+logger = lg.getLogger(__name__)
+_suffixes = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _encode_default(value: t.Any) -> t.Any:
+    """Encode values not supported by JSON: timestamps as epoch seconds."""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    raise TypeError("Object of type %s is not JSON serializable" % type(value))
+
+
+def _open_write(raw: t.BinaryIO, compression: str) -> t.BinaryIO:
+    """Open compressed stream for writing."""
+    if compression == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=raw, mode="wb")
+    elif compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError("Unknown compression: %s" % compression)
+
+
+def _open_read(path: pathlib.Path) -> t.TextIO:
+    """Open recording file for reading, determining compression from suffix."""
+    if path.suffix == ".gz":
+        import gzip
+
+        return gzip.open(path, "rt", encoding="utf-8")
+    elif path.suffix == ".zst":
+        import zstandard
+
+        raw = path.open("rb")
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    elif path.suffix == ".jsonl":
+        return path.open(encoding="utf-8")
+    raise ValueError("Unknown recording file type: %s" % path.name)
+
+
+class Recorder:
+    """Decision task recorder.
+
+    Writes each decision task (with its history events) and the decisions
+    made to compressed JSON-lines files, starting a new file when the
+    current one reaches a maximum size. File names include the creation
+    time and process ID, so many deciders can record to one directory.
+
+    Args:
+        directory: directory to write recordings to
+        max_bytes: (compressed) size of file to start a new file at
+        compression: recording compression: "gzip", or "zstd" (requires
+            ``zstandard``)
+    """
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        max_bytes: int = 64 * 1024**2,
+        compression: str = "gzip",
+    ):
+        if compression not in _suffixes:
+            raise ValueError("Unknown compression: %s" % compression)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.path = None
+        self._n_files = 0
+        self._raw = None
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _open(self):
+        """Start a new recording file."""
+        name = "decisions-%s-%d-%04d%s" % (
+            time.strftime("%Y%m%dT%H%M%S"),
+            os.getpid(),
+            self._n_files,
+            _suffixes[self.compression],
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / name
+        logger.info("Recording decision tasks to '%s'", self.path)
+        self._raw = self.path.open("xb")
+        self._stream = _open_write(self._raw, self.compression)
+        self._n_files += 1
+
+    def _close_file(self):
+        """Finish the current recording file."""
+        if self._stream is None:
+            return
+        self._stream.close()
+        self._raw.close()
+        self._stream = self._raw = None
+
+    def record(
+        self,
+        task: t.Dict[str, t.Any],
+        decisions: t.List[t.Dict[str, t.Any]],
+        duration: float,
+    ):
+        """Record a decision task.
+
+        Failure to record is logged, not raised. Timestamps (eg of history
+        events) are recorded as epoch seconds, as sent by SWF.
+
+        Args:
+            task: decision task, with a list of its history events
+            decisions: decisions made for the task
+            duration: time taken to make decisions (seconds)
+        """
+
+        record = {
+            "time": time.time(),
+            "duration": duration,
+            "task": task,
+            "decisions": decisions,
+        }
+        try:
+            data = json.dumps(record, separators=(",", ":"), default=_encode_default)
+            data = (data + "\n").encode("utf-8")
+            with self._lock:
+                if self._stream is None:
+                    self._open()
+                self._stream.write(data)
+                if self._raw.tell() >= self.max_bytes:
+                    self._close_file()
+        except Exception:
+            logger.exception("Failed to record decision task")
+
+    def close(self):
+        """Finish recording."""
+        with self._lock:
+            self._close_file()
+
+
+def _find_recording_files(paths: t.Iterable[pathlib.Path]) -> t.List[pathlib.Path]:
+    """Expand recording directories into their recording files."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if ".jsonl" in p.name))
+        else:
+            files.append(path)
+    return files
+
+
+def iter_records(paths: t.Iterable[pathlib.Path]) -> t.Iterator[t.Dict[str, t.Any]]:
+    """Read decision task recordings.
+
+    A file's truncated final record (eg from a decider which didn't close
+    its recorder) is skipped.
+
+    Args:
+        paths: recording files, or directories of recording files (read in
+            file-name order)
+
+    Returns:
+        recorded decision tasks and decisions
+    """
+
+    for path in _find_recording_files(paths):
+        logger.debug("Reading decision task recordings from '%s'", path)
+        with _open_read(path) as f:
+            try:
+                for line in f:
+                    if not line.endswith("\n"):
+                        logger.warning("Skipping truncated record in '%s'", path)
+                        break
+                    yield _json.loads(line)
+            except EOFError:
+                logger.warning("Recording file '%s' is truncated", path)
+
+
+@dataclasses.dataclass
+class WorkflowTiming:
+    """Replayed decision-building timing of a workflow.
+
+    Args:
+        n_tasks: number of decision tasks replayed
+        total: total decision-building time (seconds)
+        max: longest decision-building time (seconds)
+        recorded_total: total recorded decision-building time (seconds)
+    """
+
+    n_tasks: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    recorded_total: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Mean decision-building time (seconds)."""
+        return self.total / self.n_tasks if self.n_tasks else 0.0
+
+    @property
+    def recorded_mean(self) -> float:
+        """Mean recorded decision-building time (seconds)."""
+        return self.recorded_total / self.n_tasks if self.n_tasks else 0.0
+
+    def add(self, duration: float, recorded_duration: float):
+        """Add a decision task's timing.
+
+        Args:
+            duration: decision-building time (seconds)
+            recorded_duration: recorded decision-building time (seconds)
+        """
+
+        self.n_tasks += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.recorded_total += recorded_duration
+
+    def merge(self, other: "WorkflowTiming"):
+        """Add another timing's decision tasks."""
+        self.n_tasks += other.n_tasks
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.recorded_total += other.recorded_total
+
+
+@dataclasses.dataclass
+class ReplaySummary:
+    """Decision task replay summary.
+
+    Args:
+        timings: decision-building timing by workflow name and version
+        differences: decision tasks whose replayed decisions differ from
+            those recorded
+        n_skipped: number of decision tasks skipped: their history starts
+            after (missing) cached execution state
+        n_unsupported: number of decision tasks of workflows not in
+            specifications
+    """
+
+    timings: t.Dict[t.Tuple[str, str], WorkflowTiming] = dataclasses.field(
+        default_factory=dict
+    )
+    differences: t.List[t.Dict[str, t.Any]] = dataclasses.field(default_factory=list)
+    n_skipped: int = 0
+    n_unsupported: int = 0
+
+    def merge(self, other: "ReplaySummary"):
+        """Add another summary's decision tasks."""
+        for key, timing in other.timings.items():
+            self.timings.setdefault(key, WorkflowTiming()).merge(timing)
+        self.differences.extend(other.differences)
+        self.n_skipped += other.n_skipped
+        self.n_unsupported += other.n_unsupported
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """Convert summary to a JSON-serialisable object."""
+        timings = []
+        for (name, version), timing in sorted(self.timings.items()):
+            timing_dict = dataclasses.asdict(timing)
+            timing_dict.update(mean=timing.mean, recorded_mean=timing.recorded_mean)
+            timings.append({"name": name, "version": version, **timing_dict})
+        return {
+            "timings": timings,
+            "differences": self.differences,
+            "skipped": self.n_skipped,
+            "unsupported": self.n_unsupported,
+        }
+
+
+def _replay_record(
+    record: t.Dict[str, t.Any],
+    registry: _specs.WorkflowRegistry,
+    summary: ReplaySummary,
+):
+    """Replay a recorded decision task, adding the result to the summary."""
+    task = record["task"]
+    workflow_type = task["workflowType"]
+    key = (workflow_type["name"], workflow_type["version"])
+    try:
+        workflow = registry.get(*key)
+    except _specs.WorkflowNotFound:
+        summary.n_unsupported += 1
+        return
+
+    start = time.perf_counter()
+    try:
+        decisions = workflow.make_decisions(task)
+    except _specs.PartialHistoryError:
+        # Partial history can only be replayed on top of cached execution state
+        summary.n_skipped += 1
+        return
+    except Exception as e:
+        decisions = _specs.make_decisions_on_error(e)
+    duration = time.perf_counter() - start
+    summary.timings.setdefault(key, WorkflowTiming()).add(
+        duration, record.get("duration", 0.0)
+    )
+
+    decisions = json.loads(json.dumps(decisions))
+    if decisions != record["decisions"]:
+        logger.warning(
+            "Decisions differ for workflow '%s' run '%s' at event %s",
+            task["workflowExecution"]["workflowId"],
+            task["workflowExecution"]["runId"],
+            task["startedEventId"],
+        )
+        summary.differences.append(
+            {
+                "workflowType": workflow_type,
+                "workflowExecution": task["workflowExecution"],
+                "startedEventId": task["startedEventId"],
+                "recorded": record["decisions"],
+                "replayed": decisions,
+            }
+        )
+
+
+def _replay_worker(
+    workflows_file: pathlib.Path,
+    records: multiprocessing.Queue,
+    summaries: multiprocessing.Queue,
+    json_codec: str = "auto",
+):
+    """Replay decision tasks from a queue, in a worker process."""
+    _json.set_codec(json_codec)
+    registry = _specs.WorkflowRegistry(workflows_file)
+    registry.load()
+    _specs.execution_states.clear()
+    summary = ReplaySummary()
+    for record in iter(records.get, None):
+        _replay_record(record, registry, summary)
+    summaries.put(summary)
+
+
+def replay(
+    workflows_file: pathlib.Path,
+    paths: t.Iterable[pathlib.Path],
+    n_processes: int = 1,
+) -> ReplaySummary:
+    """Replay recorded decision tasks, timing and checking decisions.
+
+    Decision tasks of each workflow execution are replayed in order in
+    the same process, so execution state is cached as it was when
+    recorded.
+
+    Args:
+        workflows_file: workflows specifications file path
+        paths: recording files, or directories of recording files
+        n_processes: number of worker processes, replaying in this process
+            if 1
+
+    Returns:
+        replay timing and differences
+    """
+
+    registry = _specs.WorkflowRegistry(workflows_file)
+    registry.load()
+    records = iter_records(paths)
+    if n_processes == 1:
+        _specs.execution_states.clear()
+        summary = ReplaySummary()
+        for record in records:
+            _replay_record(record, registry, summary)
+        return summary
+
+    summaries = multiprocessing.Queue()
+    queues = [multiprocessing.Queue(maxsize=1000) for _ in range(n_processes)]
+    workers = [
+        multiprocessing.Process(
+            target=_replay_worker,
+            args=(workflows_file, q, summaries, _json.codec),
+            name="seddy-replay-%d" % j,
+        )
+        for j, q in enumerate(queues)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for record in records:
+            run_id = record["task"]["workflowExecution"]["runId"]
+            queues[zlib.crc32(run_id.encode("utf-8")) % n_processes].put(record)
+    finally:
+        for q in queues:
+            q.put(None)
+
+    summary = ReplaySummary()
+    n_summaries = 0
+    while n_summaries < n_processes:
+        try:
+            summary.merge(summaries.get(timeout=1.0))
+        except queue.Empty:
+            if any(w.exitcode for w in workers):
+                raise RuntimeError("Replay worker failed") from None
+            continue
+        n_summaries += 1
+    for worker in workers:
+        worker.join()
+    return summary
+
+
+def _format_summary(summary: ReplaySummary) -> str:
+    """Format replay summary as a table."""
+    lines = [
+        "%-40s %8s %10s %10s %10s %14s"
+        % ("workflow", "tasks", "total (s)", "mean (ms)", "max (ms)", "recorded (ms)")
+    ]
+    for (name, version), timing in sorted(summary.timings.items()):
+        lines.append(
+            "%-40s %8d %10.3f %10.3f %10.3f %14.3f"
+            % (
+                "%s-%s" % (name, version),
+                timing.n_tasks,
+                timing.total,
+                timing.mean * 1e3,
+                timing.max * 1e3,
+                timing.recorded_mean * 1e3,
+            )
+        )
+    lines.append("differences: %d" % len(summary.differences))
+    lines.append("skipped (partial history): %d" % summary.n_skipped)
+    lines.append("unsupported workflows: %d" % summary.n_unsupported)
+    return "\n".join(lines)
+
+
+def run_app(
+    workflows_file: pathlib.Path,
+    paths: t.List[pathlib.Path],
+    n_processes: int = 1,
+    json_output: bool = False,
+):
+    """Run decision task replay application.
+
+    Exits with status 1 if any decisions differ.
+
+    Arguments:
+        workflows_file: workflows specifications file path
+        paths: recording files, or directories of recording files
+        n_processes: number of worker processes
+        json_output: output JSON summary, default: table
+    """
+
+    summary = replay(workflows_file, paths, n_processes)
+    if json_output:
+        print(json.dumps(summary.to_dict(), indent=2))
+    else:
+        print(_format_summary(summary))
+    if summary.differences:
+        sys.exit(1)
@@ -1,44 +1,220 @@
 """SWF workflow registration."""
 
+import os
+import sys
+import enum
+import json
+import time
 import typing as t
+import hashlib
 import logging as lg
 import pathlib
+import textwrap
+import threading
+import collections
+import dataclasses
+import concurrent.futures as cf
 
 from . import _specs, _util
 
 logger = lg.getLogger(__name__)
+_registration_statuses = {"REGISTERED": True, "DEPRECATED": False}
+_max_name_listings = 1  # by-name listing costs a request per name and status
+_state_lock = threading.Lock()
 
 
-def list_workflows(domain: str, client) -> t.Dict[t.Tuple[str, str], bool]:
-    """List all workflows in SWF, including registered and deprecated.
+class Action(enum.Enum):
+    """Workflow registration action."""
+
+    REGISTER = "register"
+    DEPRECATE = "deprecate"
+    UNDEPRECATE = "undeprecate"
+
+
+@dataclasses.dataclass
+class Change:
+    """Workflow registration change.
+
+    Args:
+        action: registration action to take
+        workflow: specification of workflow to take action on
+    """
+
+    action: Action
+    workflow: _specs.Workflow
+
+
+def _get_registration_fields(workflow: _specs.Workflow) -> t.Dict[str, t.Any]:
+    """Get a workflow's registration-relevant fields, JSON-serialisable."""
+    registration = workflow.registration or _specs.Registration()
+    fields = dataclasses.asdict(registration)
+    if registration.child_policy is not None:
+        fields["child_policy"] = registration.child_policy.value
+    fields.update(
+        name=workflow.name, version=workflow.version, description=workflow.description
+    )
+    return fields
+
+
+def get_registration_digest(workflows: t.List[_specs.Workflow]) -> str:
+    """Hash workflows' registration-relevant content.
+
+    The digest is independent of workflow order, and changes with any
+    workflow's name, version, description or registration configuration.
+
+    Args:
+        workflows: specifications of workflows to register
+
+    Returns:
+        hexadecimal SHA-256 digest
+    """
+
+    workflow_digests = []
+    for workflow in workflows:
+        fields_json = json.dumps(_get_registration_fields(workflow), sort_keys=True)
+        workflow_digests.append(hashlib.sha256(fields_json.encode("utf-8")).hexdigest())
+    workflow_digests.sort()
+    return hashlib.sha256("\n".join(workflow_digests).encode("utf-8")).hexdigest()
+
+
+def _get_state_key(domain: str, client) -> str:
+    """Get a domain's registration state key.
+
+    The key is unique per SWF endpoint, and per domain ARN (so per AWS
+    account and region), so a state file can be shared across accounts.
+
+    Args:
+        domain: domain to register workflows in
+        client (botocore.client.BaseClient): SWF client
+
+    Returns:
+        state key
+    """
+
+    domain_info = client.describe_domain(name=domain)["domainInfo"]
+    return "%s %s" % (client.meta.endpoint_url, domain_info["arn"])
+
+
+def _read_state(state_file: pathlib.Path) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """Read registration state file, ignoring a missing or invalid file."""
+    try:
+        state = json.loads(state_file.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring invalid registration state file: %s", e)
+        return {}
+    return state.get("domains", {}) if isinstance(state, dict) else {}
+
+
+def _write_state(state_file: pathlib.Path, key: str, digest: str):
+    """Record a domain's last-synchronised registration digest.
+
+    Other domains' states in the file are kept, and the file is replaced
+    atomically.
+    """
+
+    with _state_lock:
+        domains = _read_state(state_file)
+        domains[key] = {"digest": digest, "synced": time.time()}
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_file.with_name(state_file.name + ".%d.tmp" % os.getpid())
+        state = {"version": "1.0", "domains": domains}
+        tmp_path.write_text(json.dumps(state, indent=2))
+        os.replace(tmp_path, state_file)
+
+
+def _list_workflow_types(
+    domain: str,
+    client,
+    status: str,
+    name: str = None,
+    prefetch: cf.Executor = None,
+    rate_limiter: _util.RateLimiter = None,
+) -> t.List[t.Tuple[str, str]]:
+    """List workflows of a registration status in SWF.
 
     Args:
         domain: domain to list workflows of
         client (botocore.client.BaseClient): SWF client
+        status: registration status: 'REGISTERED' or 'DEPRECATED'
+        name: name of workflows to list, default: all workflows
+        prefetch: executor to request each next page in
+        rate_limiter: SWF request rate limiter, acquired for each page
 
     Returns:
-        names, versions and registration status of workflows in SWF
+        names and versions of workflows
     """
 
-    logger.info("Listing workflows in '%s'", domain)
+    def list_workflow_types(**list_kwargs):
+        if rate_limiter:
+            rate_limiter.acquire()
+        return client.list_workflow_types(**list_kwargs)
 
-    # List registered workflows
-    _kwargs = {"domain": domain, "registrationStatus": "REGISTERED"}
-    resp_registered = _util.list_paginated(
-        client.list_workflow_types, "typeInfos", _kwargs
-    )
+    kwargs = {"domain": domain, "registrationStatus": status}
+    if name is not None:
+        kwargs["name"] = name
+    pages = _util.iter_paginated(list_workflow_types, kwargs, prefetch=prefetch)
+    keys = []
+    for page in pages:
+        for type_info in page["typeInfos"]:
+            workflow_type = type_info["workflowType"]
+            keys.append((workflow_type["name"], workflow_type["version"]))
+    return keys
 
-    # List deprecated workflows
-    _kwargs = {"domain": domain, "registrationStatus": "DEPRECATED"}
-    resp_deprecated = _util.list_paginated(
-        client.list_workflow_types, "typeInfos", _kwargs
-    )
 
-    # Combine
-    registered = [w["workflowType"] for w in resp_registered["typeInfos"]]
-    deprecated = [w["workflowType"] for w in resp_deprecated["typeInfos"]]
-    existing = {(w["name"], w["version"]): True for w in registered}
-    existing.update({(w["name"], w["version"]): False for w in deprecated})
+def list_workflows(
+    domain: str,
+    client,
+    names: t.Collection[str] = None,
+    n_workers: int = 4,
+    rate_limiter: _util.RateLimiter = None,
+) -> t.Dict[t.Tuple[str, str], bool]:
+    """List all workflows in SWF, including registered and deprecated.
+
+    Registered and deprecated workflows are listed concurrently, with each
+    next page requested while the current one is processed. With a single
+    workflow name, only workflows of that name are listed.
+
+    Args:
+        domain: domain to list workflows of
+        client (botocore.client.BaseClient): SWF client
+        names: names of workflows to list, default: all workflows
+        n_workers: maximum number of concurrent listings
+        rate_limiter: SWF request rate limiter, shared with other listings
+            and registrations, default: unlimited
+
+    Returns:
+        names, versions and registration status of workflows in SWF
+    """
+
+    logger.info("Listing workflows in '%s'", domain)
+    names = None if names is None else set(names)
+    scan_names = [None]
+    if names is not None and len(names) <= _max_name_listings:
+        scan_names = sorted(names)
+
+    existing = {}
+    with cf.ThreadPoolExecutor(n_workers, "seddy-list") as executor:
+        with cf.ThreadPoolExecutor(n_workers, "seddy-list-prefetch") as prefetch:
+            futures = {
+                executor.submit(
+                    _list_workflow_types,
+                    domain,
+                    client,
+                    status,
+                    name,
+                    prefetch,
+                    rate_limiter,
+                ): is_active
+                for status, is_active in _registration_statuses.items()
+                for name in scan_names
+            }
+            for future in cf.as_completed(futures):
+                is_active = futures[future]
+                for key in future.result():
+                    if names is None or key[0] in names:
+                        existing[key] = is_active
     return existing
 
 
@@ -113,19 +289,18 @@ def undeprecate_workflow(workflow: _specs.Workflow, domain: str, client):
     client.undeprecate_workflow_type(domain=domain, workflowType=workflow_type)
 
 
-def _sync_workflow(
-    workflow: _specs.Workflow,
-    domain: str,
-    existing: t.Dict[t.Tuple[str, str], bool],
-    client,
-):
-    """Synchronise a workflow's registration with SWF.
+def _plan_workflow(
+    workflow: _specs.Workflow, existing: t.Dict[t.Tuple[str, str], bool]
+) -> t.Union[Action, None]:
+    """Plan synchronising a workflow's registration with SWF.
 
     Args:
         workflow: specification of workflow to register
-        domain: domain to register workflow in
-        existing:
-        client (botocore.client.BaseClient): SWF client
+        existing: registration status (active or deprecated) of workflows
+            in SWF
+
+    Returns:
+        registration action, or ``None`` if up-to-date
     """
 
     is_active = workflow.registration.active if workflow.registration else True
@@ -134,41 +309,455 @@ def _sync_workflow(
         if existing[key] is is_active:
             _fmt = "Skipping up-to-date workflow '%s' (version %s, active: %s)"
             logger.debug(_fmt, workflow.name, workflow.version, is_active)
-        elif is_active:
-            undeprecate_workflow(workflow, domain, client)
-        elif not is_active:
-            deprecate_workflow(workflow, domain, client)
+            return None
+        return Action.UNDEPRECATE if is_active else Action.DEPRECATE
     elif is_active:  # don't register inactive workflows
-        register_workflow(workflow, domain, client)
+        return Action.REGISTER
+    return None
+
 
+def plan_workflows(
+    workflows: t.List[_specs.Workflow], existing: t.Dict[t.Tuple[str, str], bool]
+) -> t.List[Change]:
+    """Plan the minimal changes to synchronise workflow registration.
 
-def register_workflows(workflows: t.List[_specs.Workflow], domain: str):
+    Args:
+        workflows: specifications of workflows to register
+        existing: registration status (active or deprecated) of workflows
+            in SWF
+
+    Returns:
+        registration changes, in specification order
+    """
+
+    changes = []
+    for workflow in workflows:
+        action = _plan_workflow(workflow, existing)
+        if action:
+            changes.append(Change(action, workflow))
+    return changes
+
+
+def _apply_change(
+    change: Change, domain: str, client, rate_limiter: _util.RateLimiter = None
+):
+    """Apply a workflow registration change.
+
+    Args:
+        change: registration change to apply
+        domain: domain to register workflow in
+        client (botocore.client.BaseClient): SWF client
+        rate_limiter: SWF request rate limiter
+    """
+
+    fns = {
+        Action.REGISTER: register_workflow,
+        Action.DEPRECATE: deprecate_workflow,
+        Action.UNDEPRECATE: undeprecate_workflow,
+    }
+    if rate_limiter:
+        rate_limiter.acquire()
+    fns[change.action](change.workflow, domain, client)
+
+
+def apply_changes(
+    changes: t.List[Change],
+    domain: str,
+    client,
+    n_workers: int = 8,
+    max_rate: float = None,
+    rate_limiter: _util.RateLimiter = None,
+):
+    """Apply workflow registration changes concurrently.
+
+    On the first failure, changes not yet started are cancelled, then the
+    failure is raised.
+
+    Args:
+        changes: registration changes to apply
+        domain: domain to register workflows in
+        client (botocore.client.BaseClient): SWF client
+        n_workers: maximum number of changes to apply concurrently
+        max_rate: maximum rate of SWF requests (per second), shared across
+            workers, default: unlimited
+        rate_limiter: SWF request rate limiter, shared with other
+            registrations, overriding ``max_rate``
+    """
+
+    if not changes:
+        return
+    if not rate_limiter and max_rate:
+        rate_limiter = _util.RateLimiter(max_rate)
+    with cf.ThreadPoolExecutor(n_workers, "seddy-register") as executor:
+        futures = [
+            executor.submit(_apply_change, change, domain, client, rate_limiter)
+            for change in changes
+        ]
+        try:
+            for future in cf.as_completed(futures):
+                future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def register_workflows(
+    workflows: t.List[_specs.Workflow],
+    domain: str,
+    n_workers: int = 8,
+    max_rate: float = 10.0,
+    dry_run: bool = False,
+    state_file: pathlib.Path = None,
+    force: bool = False,
+    client=None,
+    rate_limiter: _util.RateLimiter = None,
+) -> t.List[Change]:
     """Synchronise workflow registration with SWF.
 
+    With a state file, the digest of the workflows' registration content
+    (see ``get_registration_digest``) is recorded per domain (by endpoint
+    and domain ARN, so per AWS account) after each successful
+    synchronisation, and synchronisation (including listing workflows in
+    SWF) is skipped when the digest is unchanged.
+
     Args:
         workflows: specifications of workflows to register
         domain: domain to register workflows in
+        n_workers: maximum number of registration changes to apply
+            concurrently
+        max_rate: maximum rate of SWF requests (per second), including
+            listing workflows, ``None`` for unlimited
+        dry_run: only plan registration changes, don't apply them
+        state_file: registration state file path, default: always
+            synchronise
+        force: synchronise even if unchanged since the last recorded
+            synchronisation
+        client (botocore.client.BaseClient): SWF client, default: create
+            a new client
+        rate_limiter: SWF request rate limiter, shared with other
+            registrations, overriding ``max_rate``
+
+    Returns:
+        planned registration changes
     """
 
-    client = _util.get_swf_client()
+    if client is None:
+        client = _util.get_swf_client(max_pool_connections=max(n_workers, 10))
+    if not rate_limiter and max_rate:
+        rate_limiter = _util.RateLimiter(max_rate)
+
+    if state_file:
+        digest = get_registration_digest(workflows)
+        state_key = _get_state_key(domain, client)
+        state = _read_state(state_file).get(state_key, {})
+        if not force and state.get("digest") == digest:
+            _fmt = "Workflows registration in '%s' unchanged since last sync, skipping"
+            logger.log(25, _fmt, domain)
+            return []
+
     logger.log(25, "Registering workflows in '%s'", domain)
 
     # Get existing workflows
-    existing = list_workflows(domain, client)
+    names = {workflow.name for workflow in workflows}
+    existing = list_workflows(
+        domain, client, names=names, n_workers=n_workers, rate_limiter=rate_limiter
+    )
     logger.debug("Exising workflows: %s", existing)
 
     # Register workflows
-    for workflow in workflows:
-        _sync_workflow(workflow, domain, existing, client)
+    changes = plan_workflows(workflows, existing)
+    logger.info("Planned %d registration changes in '%s'", len(changes), domain)
+    if not dry_run:
+        apply_changes(changes, domain, client, n_workers, rate_limiter=rate_limiter)
+        if state_file:
+            _write_state(state_file, state_key, digest)
+    return changes
+
+
+def filter_workflows(
+    workflows: t.List[_specs.Workflow],
+    names: t.Collection[str] = None,
+    name_prefix: str = None,
+) -> t.List[_specs.Workflow]:
+    """Filter workflows by name.
+
+    Args:
+        workflows: specifications of workflows
+        names: names of workflows to keep, default: all names
+        name_prefix: prefix of names of workflows to keep
+
+    Returns:
+        specifications of matching workflows
+    """
 
+    names = None if names is None else set(names)
+    return [
+        workflow
+        for workflow in workflows
+        if (names is None or workflow.name in names)
+        and (not name_prefix or workflow.name.startswith(name_prefix))
+    ]
 
-def run_app(workflows_spec_file: pathlib.Path, domain: str):
+
+@dataclasses.dataclass
+class DomainSummary:
+    """Workflow registration synchronisation summary of a domain.
+
+    Args:
+        domain: SWF domain
+        changes: registration changes planned (and applied, unless a
+            dry-run)
+        duration: synchronisation time (seconds)
+        error: synchronisation failure
+    """
+
+    domain: str
+    changes: t.List[Change] = dataclasses.field(default_factory=list)
+    duration: float = 0.0
+    error: Exception = None
+
+
+def load_manifest(manifest_file: pathlib.Path) -> t.Dict[str, t.List[_specs.Workflow]]:
+    """Load a registration manifest, mapping workflows files to domains.
+
+    The manifest (JSON or YAML) has structure:
+
+    * **version** (*string*): manifest version, "1.0"
+    * **registrations** (*array*): registrations, each with:
+
+      * **workflows_file** (*string*): workflows specifications file path,
+        relative to the manifest
+      * **domains** (*array[string]*): SWF domains to register workflows in
+
+    Each workflows file is loaded once. Workflows of many files registered
+    in the same domain are combined, the first specification of each
+    workflow name and version taking precedence.
+
+    Args:
+        manifest_file: registration manifest file path
+
+    Returns:
+        workflows to register, by domain
+    """
+
+    logger.info("Loading registration manifest from '%s'", manifest_file)
+    manifest = _specs.load_file(manifest_file)
+    assert (1,) <= tuple(map(int, manifest["version"].split("."))) < (2,)
+    workflows_by_file = {}
+    domain_workflows = {}
+    for registration in manifest["registrations"]:
+        workflows_file = manifest_file.parent / registration["workflows_file"]
+        if workflows_file not in workflows_by_file:
+            workflows = _specs.load_workflows(workflows_file)
+            workflows_by_file[workflows_file] = workflows
+        for domain in registration["domains"]:
+            workflows = domain_workflows.setdefault(domain, {})
+            for workflow in workflows_by_file[workflows_file]:
+                key = (workflow.name, workflow.version)
+                if key in workflows:
+                    _fmt = "Duplicate workflow '%s' (version %s) for domain '%s'"
+                    logger.warning(_fmt, workflow.name, workflow.version, domain)
+                    continue
+                workflows[key] = workflow
+    return {d: list(ws.values()) for d, ws in domain_workflows.items()}
+
+
+def _register_domain(
+    workflows: t.List[_specs.Workflow], domain: str, **kwargs
+) -> DomainSummary:
+    """Synchronise a domain's workflow registration, summarising."""
+    summary = DomainSummary(domain)
+    start = time.monotonic()
+    try:
+        summary.changes = register_workflows(workflows, domain, **kwargs)
+    except Exception as e:
+        logger.exception("Failed to register workflows in '%s'", domain)
+        summary.error = e
+    summary.duration = time.monotonic() - start
+    return summary
+
+
+def register_manifest(
+    domain_workflows: t.Dict[str, t.List[_specs.Workflow]],
+    n_workers: int = 8,
+    max_rate: float = 10.0,
+    n_domain_workers: int = 4,
+    **kwargs,
+) -> t.List[DomainSummary]:
+    """Synchronise workflow registration in many domains concurrently.
+
+    One SWF client and one request rate limit are shared by all domains. A
+    domain's failure doesn't stop the other domains' synchronisation.
+
+    Args:
+        domain_workflows: workflows to register, by domain
+        n_workers: maximum number of registration changes to apply
+            concurrently, per domain
+        max_rate: maximum rate of registration requests (per second),
+            across all domains, ``None`` for unlimited
+        n_domain_workers: maximum number of domains to synchronise
+            concurrently
+        kwargs: keyword arguments to ``register_workflows``
+
+    Returns:
+        synchronisation summaries, in domain order
+    """
+
+    max_pool_connections = max(2 * n_workers * n_domain_workers, 10)
+    client = _util.get_swf_client(max_pool_connections=max_pool_connections)
+    rate_limiter = _util.RateLimiter(max_rate) if max_rate else None
+    kwargs.update(
+        n_workers=n_workers,
+        max_rate=max_rate,
+        client=client,
+        rate_limiter=rate_limiter,
+    )
+    with cf.ThreadPoolExecutor(n_domain_workers, "seddy-domain") as executor:
+        futures = [
+            executor.submit(_register_domain, workflows, domain, **kwargs)
+            for domain, workflows in domain_workflows.items()
+        ]
+    return [future.result() for future in futures]
+
+
+def _format_change_counts(changes: t.List[Change]) -> str:
+    """Format registration changes' count per action."""
+    if not changes:
+        return "no changes"
+    counts = collections.Counter(change.action for change in changes)
+    counts_str = ", ".join(
+        "%s: %d" % (action.value, counts[action]) for action in Action if counts[action]
+    )
+    return "%d changes (%s)" % (len(changes), counts_str)
+
+
+def _format_changes(changes: t.List[Change]) -> str:
+    """Format registration changes, with a summary."""
+    if not changes:
+        return "No changes"
+    lines = [
+        "%s: '%s' (version %s)"
+        % (change.action.value, change.workflow.name, change.workflow.version)
+        for change in changes
+    ]
+    lines.append(_format_change_counts(changes))
+    return "\n".join(lines)
+
+
+def _format_summaries(summaries: t.List[DomainSummary]) -> str:
+    """Format domains' registration synchronisation summaries."""
+    lines = []
+    for summary in summaries:
+        if summary.error:
+            result = "failed: %s" % summary.error
+        else:
+            result = _format_change_counts(summary.changes)
+        lines.append("%s: %s in %.2f s" % (summary.domain, result, summary.duration))
+    return "\n".join(lines)
+
+
+def run_app(
+    workflows_spec_file: pathlib.Path,
+    domain: str,
+    n_workers: int = 8,
+    max_rate: float = 10.0,
+    plan: bool = False,
+    state_file: pathlib.Path = None,
+    force: bool = False,
+    names: t.List[str] = None,
+    name_prefix: str = None,
+):
     """Run registration synchronisation application.
 
     Arguments:
         workflows_spec_file: workflows specifications file path
         domain: SWF domain
+        n_workers: maximum number of registration changes to apply
+            concurrently
+        max_rate: maximum rate of registration requests (per second),
+            ``None`` for unlimited
+        plan: only print planned registration changes, don't apply them
+        state_file: registration state file path, to skip synchronisation
+            when workflows are unchanged since the last, default: always
+            synchronise
+        force: synchronise even if unchanged since the last
+        names: names of workflows to synchronise, default: all workflows
+        name_prefix: only synchronise workflows with names with this prefix
     """
 
     workflows = _specs.load_workflows(workflows_spec_file)
-    register_workflows(workflows, domain)
+    if names or name_prefix:
+        workflows = filter_workflows(workflows, names, name_prefix)
+    changes = register_workflows(
+        workflows,
+        domain,
+        n_workers=n_workers,
+        max_rate=max_rate,
+        dry_run=plan,
+        state_file=state_file,
+        force=force,
+    )
+    if plan:
+        print(_format_changes(changes))
+
+
+def run_manifest_app(
+    manifest_file: pathlib.Path,
+    n_workers: int = 8,
+    max_rate: float = 10.0,
+    plan: bool = False,
+    state_file: pathlib.Path = None,
+    force: bool = False,
+    names: t.List[str] = None,
+    name_prefix: str = None,
+    n_domain_workers: int = 4,
+):
+    """Run registration synchronisation application on a manifest.
+
+    Prints a summary of each domain's synchronisation, and exits with
+    failure if any domain's synchronisation failed.
+
+    Arguments:
+        manifest_file: registration manifest file path, see
+            ``load_manifest``
+        n_workers: maximum number of registration changes to apply
+            concurrently, per domain
+        max_rate: maximum rate of registration requests (per second),
+            across all domains, ``None`` for unlimited
+        plan: only print planned registration changes, don't apply them
+        state_file: registration state file path, to skip synchronisation
+            of domains whose workflows are unchanged since the last,
+            default: always synchronise
+        force: synchronise even if unchanged since the last
+        names: names of workflows to synchronise, default: all workflows
+        name_prefix: only synchronise workflows with names with this prefix
+        n_domain_workers: maximum number of domains to synchronise
+            concurrently
+    """
+
+    domain_workflows = load_manifest(manifest_file)
+    if names or name_prefix:
+        domain_workflows = {
+            domain: filter_workflows(workflows, names, name_prefix)
+            for domain, workflows in domain_workflows.items()
+        }
+    summaries = register_manifest(
+        domain_workflows,
+        n_workers=n_workers,
+        max_rate=max_rate,
+        n_domain_workers=n_domain_workers,
+        dry_run=plan,
+        state_file=state_file,
+        force=force,
+    )
+    if plan:
+        for summary in summaries:
+            if not summary.error:
+                changes_str = _format_changes(summary.changes)
+                print(
+                    "%s:\n%s\n" % (summary.domain, textwrap.indent(changes_str, "  "))
+                )
+    print(_format_summaries(summaries))
+    if any(summary.error for summary in summaries):
+        sys.exit(1)
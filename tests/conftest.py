@@ -0,0 +1,11 @@
+"""Common test fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def specs_cache_dir(tmp_path_factory, monkeypatch):
+    """Workflows specifications cache directory, isolated per test."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("SEDDY_CACHE_DIR", str(cache_dir))
+    return cache_dir
@@ -3,13 +3,16 @@
 import sys
 import json
 import logging as lg
+import pathlib
 from unittest import mock
 
 import pytest
 import coloredlogs
 
 from seddy import __main__ as seddy_main
+from seddy import _json as seddy_json
 from seddy import decider as seddy_decider
+from seddy import recording as seddy_recording
 from seddy import registration as seddy_registration
 
 try:
@@ -133,6 +136,14 @@ def test_json_logging(decider_mock, tmp_path, coloredlogs_module, capsys):
             "Synchronise workflow registration status with SWF.",
             id='"register -h"',
         ),
+        pytest.param(
+            ["replay", "-h"],
+            (
+                "Replay recorded decision tasks, reporting decision-building time "
+                "and decisions\nwhich differ from those recorded."
+            ),
+            id='"replay -h"',
+        ),
     ],
 )
 def test_usage(decider_mock, command_line_args, capsys, description):
@@ -146,7 +157,7 @@ def test_usage(decider_mock, command_line_args, capsys, description):
     # Check output
     res_out = capsys.readouterr().out
     assert res_out[:6] == "usage:"
-    assert res_out.splitlines()[2] == description
+    assert res_out.split("\n\n")[1] == description
 
 
 @pytest.mark.parametrize(
@@ -174,13 +185,55 @@ def test_version(decider_mock, command_line_args, capsys):
 
 
 @pytest.mark.parametrize(
-    ("args_extra", "decider_args"),
+    ("args_extra", "decider_args", "decider_kwargs"),
     [
-        pytest.param([], [None], id='""'),
-        pytest.param(["-i", "abcd1234"], ["abcd1234"], id='"-i abcd1234"'),
+        pytest.param([], [None], {}, id='""'),
+        pytest.param(["-i", "abcd1234"], ["abcd1234"], {}, id='"-i abcd1234"'),
+        pytest.param(
+            ["--pollers", "4", "--workers", "8"],
+            [None],
+            {"n_pollers": 4, "n_workers": 8},
+            id='"--pollers 4 --workers 8"',
+        ),
+        pytest.param(
+            ["--engine", "asyncio"],
+            [None],
+            {"engine": "asyncio"},
+            id='"--engine asyncio"',
+        ),
+        pytest.param(
+            ["--processes", "4"],
+            [None],
+            {"n_processes": 4},
+            id='"--processes 4"',
+        ),
+        pytest.param(
+            ["--reload-interval", "2.5"],
+            [None],
+            {"reload_interval": 2.5},
+            id='"--reload-interval 2.5"',
+        ),
+        pytest.param(
+            ["--record", "rec", "--record-max-bytes", "1024"],
+            [None],
+            {"record_dir": pathlib.Path("rec"), "record_max_bytes": 1024},
+            id='"--record rec --record-max-bytes 1024"',
+        ),
+        pytest.param(
+            ["--record", "rec", "--record-compression", "zstd"],
+            [None],
+            {"record_dir": pathlib.Path("rec"), "record_compression": "zstd"},
+            id='"--record rec --record-compression zstd"',
+        ),
+        pytest.param(
+            ["--lazy-workflows"],
+            [None],
+            {"lazy_workflows": True},
+            id='"--lazy-workflows"',
+        ),
     ],
 )
-def test_decider(decider_mock, tmp_path, args_extra, decider_args):
+def test_decider(decider_mock, tmp_path, args_extra, decider_args, decider_kwargs):
     """Ensure decider application is run with the correct input."""
     # Run function
     parser = seddy_main.build_parser()
@@ -190,12 +243,81 @@ def test_decider(decider_mock, tmp_path, args_extra, decider_args):
     seddy_main.run_app(args)
 
     # Check application input
+    decider_kwargs = {
+        "n_pollers": 1,
+        "n_workers": 1,
+        "engine": "thread",
+        "n_processes": 1,
+        "reload_interval": None,
+        "record_dir": None,
+        "record_max_bytes": None,
+        "record_compression": "gzip",
+        "lazy_workflows": False,
+        **decider_kwargs,
+    }
     decider_mock.assert_called_once_with(
-        tmp_path / "workflows.json", "spam", "eggs", *decider_args
+        tmp_path / "workflows.json", "spam", "eggs", *decider_args, **decider_kwargs
     )
 
 
-def test_register(tmp_path):
+@pytest.mark.parametrize(
+    ("args_extra", "exp_kwargs"),
+    [
+        pytest.param(
+            [],
+            {
+                "n_workers": 8,
+                "max_rate": 10.0,
+                "plan": False,
+                "state_file": None,
+                "force": False,
+                "names": None,
+                "name_prefix": None,
+            },
+            id='""',
+        ),
+        pytest.param(
+            ["--workers", "2", "--rate", "0", "--plan"],
+            {
+                "n_workers": 2,
+                "max_rate": None,
+                "plan": True,
+                "state_file": None,
+                "force": False,
+                "names": None,
+                "name_prefix": None,
+            },
+            id='"--workers 2 --rate 0 --plan"',
+        ),
+        pytest.param(
+            ["--state-file", "state.json", "--force"],
+            {
+                "n_workers": 8,
+                "max_rate": 10.0,
+                "plan": False,
+                "state_file": pathlib.Path("state.json"),
+                "force": True,
+                "names": None,
+                "name_prefix": None,
+            },
+            id='"--state-file state.json --force"',
+        ),
+        pytest.param(
+            ["--name", "foo", "--name", "bar", "--name-prefix", "ba"],
+            {
+                "n_workers": 8,
+                "max_rate": 10.0,
+                "plan": False,
+                "state_file": None,
+                "force": False,
+                "names": ["foo", "bar"],
+                "name_prefix": "ba",
+            },
+            id='"--name foo --name bar --name-prefix ba"',
+        ),
+    ],
+)
+def test_register(tmp_path, args_extra, exp_kwargs):
     """Ensure workflow registration application is run correctly."""
     # Setup environment
     run_app_mock = mock.Mock()
@@ -203,9 +325,143 @@ def test_register(tmp_path):
 
     # Run function
     parser = seddy_main.build_parser()
-    args = parser.parse_args(["register", str(tmp_path / "workflows.json"), "spam"])
+    args = parser.parse_args(
+        ["register", str(tmp_path / "workflows.json"), "spam"] + args_extra
+    )
+    with run_app_patch:
+        seddy_main.run_app(args)
+
+    # Check application input
+    run_app_mock.assert_called_once_with(
+        tmp_path / "workflows.json", "spam", **exp_kwargs
+    )
+
+
+def test_register_manifest():
+    """Ensure manifest workflow registration application is run correctly."""
+    # Setup environment
+    run_app_mock = mock.Mock()
+    run_app_patch = mock.patch.object(
+        seddy_registration, "run_manifest_app", run_app_mock
+    )
+
+    # Run function
+    parser = seddy_main.build_parser()
+    args = parser.parse_args(
+        ["register", "--manifest", "manifest.yml", "--domain-workers", "2", "--plan"]
+    )
+    with run_app_patch:
+        seddy_main.run_app(args)
+
+    # Check application input
+    run_app_mock.assert_called_once_with(
+        pathlib.Path("manifest.yml"),
+        n_domain_workers=2,
+        n_workers=8,
+        max_rate=10.0,
+        plan=True,
+        state_file=None,
+        force=False,
+        names=None,
+        name_prefix=None,
+    )
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        pytest.param(["decider", "a.json", "spam", "eggs", "--pollers", "0"]),
+        pytest.param(["decider", "a.json", "spam", "eggs", "--workers", "-1"]),
+        pytest.param(["decider", "a.json", "spam", "eggs", "--processes", "0"]),
+        pytest.param(["register", "a.json", "spam", "--workers", "0"]),
+        pytest.param(["register", "--manifest", "m.yml", "--domain-workers", "0"]),
+        pytest.param(["replay", "a.json", "rec", "--processes", "0"]),
+        pytest.param(["replay", "a.json", "rec", "--processes", "spam"]),
+        pytest.param(["decider", "a.json", "spam", "eggs", "--reload-interval", "0"]),
+        pytest.param(["decider", "a.json", "spam", "eggs", "--reload-interval=-1"]),
+        pytest.param(["decider", "a.json", "spam", "eggs", "--reload-interval", "nan"]),
+        pytest.param(["decider", "a.json", "spam", "eggs", "--record-max-bytes", "0"]),
+    ],
+)
+def test_positive_invalid(args, capsys):
+    """Ensure concurrency, interval and size arguments must be positive."""
+    parser = seddy_main.build_parser()
+    with pytest.raises(SystemExit) as e:
+        parser.parse_args(args)
+    assert e.value.code == 2
+    assert "argument --" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        pytest.param(["register"], id='""'),
+        pytest.param(["register", "workflows.json"], id='"workflows.json"'),
+        pytest.param(
+            ["register", "workflows.json", "--manifest", "manifest.yml"],
+            id='"workflows.json --manifest manifest.yml"',
+        ),
+        pytest.param(
+            ["register", "workflows.json", "spam", "--rate", "-1"],
+            id='"workflows.json spam --rate -1"',
+        ),
+    ],
+)
+def test_register_invalid(args, capsys):
+    """Ensure workflow registration requires a workflows file, or a manifest."""
+    with pytest.raises(SystemExit) as e:
+        seddy_main.parse_args(args)
+    assert e.value.code == 2
+    assert "error: register: " in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    ("args_extra", "exp_kwargs"),
+    [
+        pytest.param([], {"n_processes": 1, "json_output": False}, id='""'),
+        pytest.param(
+            ["--processes", "4", "--json"],
+            {"n_processes": 4, "json_output": True},
+            id='"--processes 4 --json"',
+        ),
+    ],
+)
+def test_replay(tmp_path, args_extra, exp_kwargs):
+    """Ensure decision task replay application is run correctly."""
+    # Setup environment
+    run_app_mock = mock.Mock()
+    run_app_patch = mock.patch.object(seddy_recording, "run_app", run_app_mock)
+
+    # Run function
+    parser = seddy_main.build_parser()
+    args = parser.parse_args(
+        ["replay", str(tmp_path / "workflows.json"), "a.jsonl.gz", "rec"] + args_extra
+    )
     with run_app_patch:
         seddy_main.run_app(args)
 
     # Check application input
-    run_app_mock.assert_called_once_with(tmp_path / "workflows.json", "spam")
+    run_app_mock.assert_called_once_with(
+        tmp_path / "workflows.json",
+        [pathlib.Path("a.jsonl.gz"), pathlib.Path("rec")],
+        **exp_kwargs,
+    )
+
+
+@pytest.mark.parametrize("codec", ["auto", "json", "orjson"])
+def test_json_codec(decider_mock, tmp_path, codec):
+    """Ensure JSON codec is selected."""
+    # Setup environment
+    set_codec_mock = mock.Mock()
+    set_codec_patch = mock.patch.object(seddy_json, "set_codec", set_codec_mock)
+
+    # Run function
+    parser = seddy_main.build_parser()
+    args = parser.parse_args(
+        ["--codec", codec, "decider", str(tmp_path / "w.json"), "spam", "eggs"]
+    )
+    with set_codec_patch:
+        seddy_main.run_app(args)
+
+    # Check codec selection
+    set_codec_mock.assert_called_once_with(codec)
@@ -1,7 +1,10 @@
 """Test ``seddy.decider``."""
 
 import os
-from concurrent import futures as cf
+import json
+import signal
+import asyncio
+import threading
 from unittest import mock
 
 import moto
@@ -9,7 +12,9 @@ import pytest
 from botocore import client as botocore_client
 
 from seddy import _specs as seddy_specs
+from seddy import _util as seddy_util
 from seddy import decider as seddy_decider
+from seddy import recording as seddy_recording
 from seddy._specs import _io as seddy_specs_io
 
 mock_swf = getattr(moto, "mock_aws", None)
@@ -18,6 +23,33 @@ if mock_swf is None:
     mock_swf = moto.mock_swf
 
 
+def _history_pages(previous_started_event_id):
+    """Decision task response pages, newest events first."""
+    return [
+        {
+            "taskToken": "spam",
+            "workflowType": {"name": "bar", "version": "0.42"},
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+            "previousStartedEventId": previous_started_event_id,
+            "startedEventId": 8,
+            "events": [{"eventId": 8}, {"eventId": 7}, {"eventId": 6}],
+            "nextPageToken": "a",
+        },
+        {
+            "events": [{"eventId": 5}, {"eventId": 4}, {"eventId": 3}],
+            "nextPageToken": "b",
+        },
+        {"events": [{"eventId": 2}, {"eventId": 1}]},
+    ]
+
+
+def _state_mock(last_event_id):
+    """Cached execution state, resumable from its last event."""
+    state = mock.Mock(last_event_id=last_event_id)
+    state.can_resume.side_effect = lambda _, previous_id: previous_id == last_event_id
+    return state
+
+
 class TestDecider:
     @pytest.fixture
     def workflow_mocks(self):
@@ -44,6 +76,10 @@ class TestDecider:
         with mock.patch.dict(os.environ, env_update):
             yield env_update
 
+    @pytest.fixture
+    def registry(self, workflow_mocks):
+        return seddy_specs.WorkflowRegistry.from_workflows(workflow_mocks)
+
     @pytest.fixture
     def workflows_spec_file(self, tmp_path):
         return tmp_path / "workflows.json"
@@ -80,6 +116,7 @@ class TestDecider:
 
         # Run function
         res = instance._poll_for_decision_task()
+        res["events"] = list(res["events"])
 
         # Check result
         assert res == {
@@ -122,6 +159,161 @@ class TestDecider:
             "workflowType": {"name": "bar", "version": "0.42"},
         }
 
+    @pytest.mark.parametrize(
+        ("previous_started_event_id", "exp_n_pages", "exp_first_event_id"),
+        [pytest.param(3, 2, 3, id="cached"), pytest.param(5, 3, 1, id="stale")],
+    )
+    def test_poll_for_decision_task_reverse(
+        self, instance, previous_started_event_id, exp_n_pages, exp_first_event_id
+    ):
+        """History is polled for newest-first, back to cached state."""
+        # Setup environment
+        state_cache = seddy_specs.ExecutionStateCache()
+        state_cache.put("9abc", _state_mock(3))
+        state_cache_patch = mock.patch.object(instance, "state_cache", state_cache)
+        get_workflow_patch = mock.patch.object(instance, "_get_workflow")
+        instance.client = mock.Mock()
+        pages = _history_pages(previous_started_event_id)
+        instance.client.poll_for_decision_task.side_effect = pages
+
+        # Run function
+        with state_cache_patch, get_workflow_patch:
+            res = instance._poll_for_decision_task()
+
+        # Check result
+        exp_event_ids = list(range(exp_first_event_id, 9))
+        assert [e["eventId"] for e in res["events"]] == exp_event_ids
+        assert res["startedEventId"] == 8
+
+        # Check calls
+        poll_kwargs = {
+            "domain": "spam",
+            "identity": "abcd1234",
+            "taskList": {"name": "eggs"},
+            "reverseOrder": True,
+        }
+        exp_calls = [mock.call(**poll_kwargs)]
+        exp_calls += [mock.call(**poll_kwargs, nextPageToken=t) for t in "ab"]
+        assert instance.client.poll_for_decision_task.call_args_list == (
+            exp_calls[:exp_n_pages]
+        )
+
+    @pytest.mark.parametrize(
+        ("change", "exp_refetch"),
+        [
+            pytest.param("evicted", True, id="evicted"),
+            pytest.param("reloaded", False, id="reloaded"),
+            pytest.param("reloaded-changed", True, id="reloaded-changed"),
+        ],
+    )
+    def test_decide_and_respond_partial_history(
+        self, aws_environment, change, exp_refetch
+    ):
+        """Full history is fetched when cached state is lost after polling."""
+        # Setup environment
+        spec = {
+            "name": "bar",
+            "version": "0.42",
+            "type": "dag",
+            "tasks": [
+                {"id": "foo", "type": {"name": "spam-foo", "version": "0.3"}},
+                {
+                    "id": "yay",
+                    "type": {"name": "spam-yay", "version": "0.3"},
+                    "dependencies": ["foo"],
+                },
+            ],
+        }
+        workflow = seddy_specs.DAGWorkflow.from_spec(spec)
+        registry = seddy_specs.WorkflowRegistry.from_workflows([workflow])
+        instance = seddy_decider.Decider(
+            "workflows.json", "spam", "eggs", "abcd1234", registry=registry
+        )
+        instance.client = mock.Mock()
+        state_cache = seddy_specs.ExecutionStateCache()
+        state_cache_patch = mock.patch.object(instance, "state_cache", state_cache)
+        builder_cache_patch = mock.patch.object(
+            seddy_specs.DAGBuilder, "state_cache", state_cache
+        )
+
+        execution = {"workflowId": "1234", "runId": "9abc"}
+        events = [
+            {"eventId": 1, "eventType": "WorkflowExecutionStarted"},
+            {"eventId": 2, "eventType": "DecisionTaskScheduled"},
+            {"eventId": 3, "eventType": "DecisionTaskStarted"},
+            {"eventId": 4, "eventType": "DecisionTaskCompleted"},
+            {
+                "eventId": 5,
+                "eventType": "ActivityTaskScheduled",
+                "activityTaskScheduledEventAttributes": {
+                    "activityId": "foo",
+                    "activityType": {"name": "spam-foo", "version": "0.3"},
+                    "decisionTaskCompletedEventId": 4,
+                },
+            },
+            {
+                "eventId": 6,
+                "eventType": "ActivityTaskCompleted",
+                "activityTaskCompletedEventAttributes": {"scheduledEventId": 5},
+            },
+            {"eventId": 7, "eventType": "DecisionTaskScheduled"},
+            {"eventId": 8, "eventType": "DecisionTaskStarted"},
+        ]
+        task_base = {
+            "workflowType": {"name": "bar", "version": "0.42"},
+            "workflowExecution": execution,
+        }
+        start_task = {
+            **task_base,
+            "taskToken": "spam",
+            "previousStartedEventId": 0,
+            "startedEventId": 3,
+            "events": events[:3],
+        }
+        instance.client.poll_for_decision_task.return_value = {
+            **task_base,
+            "taskToken": "eggs",
+            "previousStartedEventId": 3,
+            "startedEventId": 8,
+            "events": events[:2:-1],
+            "nextPageToken": "a",
+        }
+        instance.client.get_workflow_execution_history.return_value = {"events": events}
+
+        # Run function
+        with state_cache_patch, builder_cache_patch:
+            instance._decide_and_respond(start_task)
+            task = instance._poll_for_decision_task()
+            assert [e["eventId"] for e in task["events"]] == [4, 5, 6, 7, 8]
+
+            if change == "evicted":
+                state_cache.clear()
+            else:
+                if change == "reloaded-changed":
+                    tin_type = {"name": "spam-tin", "version": "0.3"}
+                    tin_spec = {"id": "tin", "type": tin_type, "dependencies": ["yay"]}
+                    spec["tasks"].append(tin_spec)
+                reloaded = seddy_specs.DAGWorkflow.from_spec(spec)
+                instance.registry = seddy_specs.WorkflowRegistry.from_workflows(
+                    [reloaded]
+                )
+
+            instance._decide_and_respond(task)
+
+        # Check calls
+        if exp_refetch:
+            instance.client.get_workflow_execution_history.assert_called_once_with(
+                domain="spam", execution=execution
+            )
+        else:
+            instance.client.get_workflow_execution_history.assert_not_called()
+        call = instance.client.respond_decision_task_completed.call_args_list[-1]
+        assert call[1]["taskToken"] == "eggs"
+        (decision,) = call[1]["decisions"]
+        assert decision["decisionType"] == "ScheduleActivityTask"
+        decision_attrs = decision["scheduleActivityTaskDecisionAttributes"]
+        assert decision_attrs["activityId"] == "yay"
+
     def test_get_workflow(self, instance, workflow_mocks):
         # Setup environment
         load_mock = mock.Mock(return_value=workflow_mocks)
@@ -176,6 +368,33 @@ class TestDecider:
         # Check result
         assert res is workflow_mocks[1]
 
+    def test_get_workflow_registry(
+        self, workflows_spec_file, workflow_mocks, aws_environment
+    ):
+        # Setup environment
+        load_mock = mock.Mock()
+        load_patch = mock.patch.object(seddy_specs_io, "load_workflows", load_mock)
+        registry = seddy_specs.WorkflowRegistry.from_workflows(workflow_mocks)
+        instance = seddy_decider.Decider(
+            workflows_spec_file, "spam", "eggs", registry=registry
+        )
+
+        # Build input
+        task = {"workflowType": {"name": "bar", "version": "0.42"}}
+
+        # Run function
+        with load_patch:
+            res = instance._get_workflow(task)
+            with pytest.raises(seddy_decider.UnsupportedWorkflow):
+                instance._get_workflow(
+                    {"workflowType": {"name": "bar", "version": "0"}}
+                )
+
+        # Check result
+        assert res is workflow_mocks[1]
+        load_mock.assert_not_called()
+        res.setup.assert_called_once_with()
+
     def test_get_workflow_unsupported(self, instance, workflow_mocks):
         """Check workflow-get raises for unsupported workflows."""
         # Setup environment
@@ -307,6 +526,36 @@ class TestDecider:
         instance._get_workflow.assert_called_once_with(task)
         instance._respond_decision_task_completed.assert_not_called()
 
+    def test_poll_and_run_record(self, workflow_mocks, aws_environment):
+        """Decision tasks are recorded."""
+        # Setup environment
+        task = {
+            "taskToken": "spam",
+            "workflowType": {"name": "bar", "version": "0.42"},
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+            "events": iter([{"eventId": 1}, {"eventId": 2}]),
+        }
+
+        class Decider(seddy_decider.Decider):
+            _poll_for_decision_task = mock.Mock(return_value=task)
+            _get_workflow = mock.Mock(return_value=workflow_mocks[1])
+            _respond_decision_task_completed = mock.Mock()
+
+        decisions = [{"decisionType": "CompleteWorkflowExecution"}]
+        workflow_mocks[1].make_decisions.return_value = decisions
+        recorder = mock.Mock(spec=seddy_recording.Recorder)
+        instance = Decider(workflow_mocks, "spam", "eggs", recorder=recorder)
+
+        # Run function
+        instance._poll_and_run()
+
+        # Check calls
+        assert task["events"] == [{"eventId": 1}, {"eventId": 2}]
+        recorder.record.assert_called_once_with(task, decisions, mock.ANY)
+        instance._respond_decision_task_completed.assert_called_once_with(
+            decisions, task
+        )
+
     def test_poll_and_run_decider_error(self, workflow_mocks, aws_environment):
         """Decision-building raises."""
         # Setup environment
@@ -346,13 +595,39 @@ class TestDecider:
             [exp_decision], task
         )
 
-    def test_run_uncaught(self, workflow_mocks, aws_environment):
+    def test_poll_and_run_history_error(self, workflow_mocks, aws_environment):
+        """Fetching later history pages fails: workflow isn't failed."""
         # Setup environment
+        task = {
+            "taskToken": "spam",
+            "workflowType": {"name": "bar", "version": "0.42"},
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+        }
+
         class Decider(seddy_decider.Decider):
-            _poll_and_run = mock.Mock(side_effect=[None, None, None, KeyboardInterrupt])
+            _poll_for_decision_task = mock.Mock(return_value=task)
+            _get_workflow = mock.Mock(return_value=workflow_mocks[1])
+            _respond_decision_task_completed = mock.Mock()
+
+        exc = seddy_util.PaginationError("Failed to list 'events'")
+        workflow_mocks[1].make_decisions.side_effect = exc
 
         instance = Decider(workflow_mocks, "spam", "eggs")
 
+        # Run function
+        with pytest.raises(seddy_util.PaginationError):
+            instance._poll_and_run()
+
+        # Check calls
+        instance._respond_decision_task_completed.assert_not_called()
+
+    def test_run_uncaught(self, workflow_mocks, registry, aws_environment):
+        # Setup environment
+        class Decider(seddy_decider.Decider):
+            _poll_and_run = mock.Mock(side_effect=[None, None, None, KeyboardInterrupt])
+
+        instance = Decider(workflow_mocks, "spam", "eggs", registry=registry)
+
         # Run function
         with pytest.raises(KeyboardInterrupt):
             instance._run_uncaught()
@@ -360,37 +635,264 @@ class TestDecider:
         # Check calls
         assert instance._poll_and_run.call_args_list == [mock.call()] * 4
 
+    def test_poll_and_run_concurrent_error(self, workflow_mocks, aws_environment):
+        """Decision-building raises when handling tasks concurrently."""
+        # Setup environment
+        task = {
+            "taskToken": "spam",
+            "workflowType": {"name": "bar", "version": "0.42"},
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+        }
+
+        class Decider(seddy_decider.Decider):
+            _poll_for_decision_task = mock.Mock(return_value=task)
+            _get_workflow = mock.Mock(return_value=workflow_mocks[1])
+            _respond_decision_task_completed = mock.Mock()
+
+        workflow_mocks[1].make_decisions.side_effect = RuntimeError("malformed specs")
+
+        instance = Decider(workflow_mocks, "spam", "eggs", n_workers=2)
+
+        # Run function
+        instance._poll_and_run()
+        instance._executor.shutdown(wait=True)
+
+        # Check calls
+        instance._get_workflow.assert_called_once_with(task)
+        instance._respond_decision_task_completed.assert_called_once_with(
+            [mock.ANY], task
+        )
+        assert not instance._futures
+
+    def test_run_uncaught_concurrent(self, workflow_mocks, registry, aws_environment):
+        """Poll with many pollers, stopping on error."""
+        # Setup environment
+        class Decider(seddy_decider.Decider):
+            _poll_and_run = mock.Mock(side_effect=[None] * 5 + [ValueError("spam")])
+
+        instance = Decider(
+            workflow_mocks, "spam", "eggs", n_pollers=3, n_workers=3, registry=registry
+        )
+
+        # Run function
+        with pytest.raises(ValueError):
+            instance._run_uncaught()
+
+        # Check calls
+        for thread in instance._pollers:
+            thread.join()
+        assert len(instance._pollers) == 3
+        assert instance._stop.is_set()
+
     def test_run(self, workflow_mocks, aws_environment):
         # Setup environment
         class Decider(seddy_decider.Decider):
             _run_uncaught = mock.Mock(side_effect=KeyboardInterrupt)
 
         instance = Decider(workflow_mocks, "spam", "eggs")
-        instance._future = mock.Mock(spec=cf.Future)
-        instance._future.running.return_value = False
 
         # Run function
         instance.run()
 
         # Check calls
         instance._run_uncaught.assert_called_once_with()
-        instance._future.result.assert_not_called()
+        assert instance._stop.is_set()
 
-    def test_run_handling_decision(self, workflow_mocks, aws_environment):
+    def test_run_handling_decisions(self, workflow_mocks, aws_environment):
         # Setup environment
         class Decider(seddy_decider.Decider):
             _run_uncaught = mock.Mock(side_effect=KeyboardInterrupt)
 
-        instance = Decider(workflow_mocks, "spam", "eggs")
-        instance._future = mock.Mock(spec=cf.Future)
-        instance._future.running.return_value = True
+        instance = Decider(workflow_mocks, "spam", "eggs", n_workers=2)
+        events = [threading.Event(), threading.Event()]
+        futures = [instance._executor.submit(e.wait, 5.0) for e in events]
+        instance._futures.update(futures)
+        timers = [threading.Timer(0.05, e.set) for e in events]
+        for timer in timers:
+            timer.start()
 
         # Run function
         instance.run()
 
         # Check calls
         instance._run_uncaught.assert_called_once_with()
-        instance._future.result.assert_called_once_with()
+        assert all(f.done() and f.result() is True for f in futures)
+
+
+class TestAsyncDecider:
+    @pytest.fixture
+    def task(self):
+        return {
+            "taskToken": "spam",
+            "workflowType": {"name": "bar", "version": "0.42"},
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+        }
+
+    @pytest.fixture
+    def transport(self):
+        class Transport:
+            poll_for_decision_task = mock.AsyncMock()
+            respond_decision_task_completed = mock.AsyncMock()
+
+        return Transport()
+
+    @pytest.fixture
+    def workflow_mock(self):
+        workflow = mock.Mock(spec=seddy_specs.Workflow)
+        workflow.name = "bar"
+        workflow.version = "0.42"
+        workflow.make_decisions.return_value = [
+            {"decisionType": "CompleteWorkflowExecution"}
+        ]
+        return workflow
+
+    @pytest.fixture
+    def instance(self, tmp_path, transport, workflow_mock):
+        class AsyncDecider(seddy_decider.AsyncDecider):
+            _get_workflow = mock.Mock(return_value=workflow_mock)
+
+        return AsyncDecider(
+            tmp_path / "workflows.json",
+            "spam",
+            "eggs",
+            "abcd1234",
+            registry=seddy_specs.WorkflowRegistry.from_workflows([workflow_mock]),
+            transport=transport,
+        )
+
+    @pytest.fixture
+    def aws_environment(self):
+        env_update = {
+            "AWS_DEFAULT_REGION": "us-east-1",
+            "AWS_ACCESS_KEY_ID": "id",
+            "AWS_SECRET_ACCESS_KEY": "key",
+        }
+        with mock.patch.dict(os.environ, env_update):
+            yield env_update
+
+    def test_init(self, tmp_path, aws_environment):
+        instance = seddy_decider.AsyncDecider(
+            tmp_path / "workflows.json", "spam", "eggs"
+        )
+        assert instance.domain == "spam"
+        assert instance.task_list == "eggs"
+        assert isinstance(instance.transport, seddy_decider.ExecutorTransport)
+        assert isinstance(instance.transport.client, botocore_client.BaseClient)
+        assert instance.identity
+
+    def test_poll_for_decision_task_reverse(self, instance, transport):
+        """History is polled for newest-first, back to cached state."""
+        # Setup environment
+        state_cache = seddy_specs.ExecutionStateCache()
+        state_cache.put("9abc", _state_mock(3))
+        state_cache_patch = mock.patch.object(instance, "state_cache", state_cache)
+        transport.poll_for_decision_task.side_effect = _history_pages(3)
+
+        # Run function
+        with state_cache_patch:
+            res = asyncio.run(instance._poll_for_decision_task())
+
+        # Check result
+        assert [e["eventId"] for e in res["events"]] == [3, 4, 5, 6, 7, 8]
+        assert transport.poll_for_decision_task.await_count == 2
+
+    @mock_swf
+    def test_executor_transport(self, aws_environment):
+        # Setup environment
+        instance = seddy_decider.AsyncDecider("workflows.json", "spam", "eggs")
+        client = instance.transport.client
+        client.register_domain(name="spam", workflowExecutionRetentionPeriodInDays="2")
+        client.register_workflow_type(domain="spam", name="bar", version="0.42")
+        resp = client.start_workflow_execution(
+            domain="spam",
+            workflowId="1234",
+            workflowType={"name": "bar", "version": "0.42"},
+            executionStartToCloseTimeout="60",
+            taskList={"name": "eggs"},
+            taskStartToCloseTimeout="10",
+            childPolicy="REQUEST_CANCEL",
+        )
+
+        # Run function
+        task = asyncio.run(instance._poll_for_decision_task())
+        decisions = [{"decisionType": "CompleteWorkflowExecution"}]
+        asyncio.run(instance._respond_decision_task_completed(decisions, task))
+        instance.transport.close()
+
+        # Check result
+        assert [e["eventId"] for e in task["events"]] == [1, 2, 3]
+        assert task["workflowExecution"]["runId"] == resp["runId"]
+        execution_info = client.describe_workflow_execution(
+            domain="spam", execution={"workflowId": "1234", "runId": resp["runId"]}
+        )
+        assert execution_info["executionInfo"]["closeStatus"] == "COMPLETED"
+
+    def test_run(self, instance, transport, task, workflow_mock):
+        # Setup environment
+        def poll(**_):
+            if transport.poll_for_decision_task.await_count > 1:
+                instance.stop()
+                return {"taskToken": ""}
+            return task
+
+        transport.poll_for_decision_task.side_effect = poll
+
+        # Run function
+        asyncio.run(instance.run())
+
+        # Check calls
+        transport.poll_for_decision_task.assert_awaited_with(
+            domain="spam", identity="abcd1234", taskList={"name": "eggs"}
+        )
+        instance._get_workflow.assert_called_once_with(task)
+        workflow_mock.make_decisions.assert_called_once_with(task)
+        transport.respond_decision_task_completed.assert_awaited_once_with(
+            taskToken="spam", decisions=[{"decisionType": "CompleteWorkflowExecution"}]
+        )
+
+    def test_run_concurrent(self, tmp_path, transport, task, workflow_mock):
+        """Many polls are outstanding at once."""
+        # Setup environment
+        class AsyncDecider(seddy_decider.AsyncDecider):
+            _get_workflow = mock.Mock(return_value=workflow_mock)
+
+        instance = AsyncDecider(
+            tmp_path / "workflows.json",
+            "spam",
+            "eggs",
+            n_pollers=3,
+            n_workers=3,
+            registry=seddy_specs.WorkflowRegistry.from_workflows([]),
+            transport=transport,
+        )
+        outstanding = []
+
+        async def poll(**_):
+            outstanding.append(None)
+            await asyncio.sleep(0.01)
+            if len(outstanding) >= 6:
+                instance.stop()
+            return task
+
+        transport.poll_for_decision_task.side_effect = poll
+
+        # Run function
+        asyncio.run(instance.run())
+
+        # Check calls
+        assert transport.poll_for_decision_task.await_count == len(outstanding)
+        assert transport.respond_decision_task_completed.await_count == len(outstanding)
+
+    def test_run_poll_error(self, instance, transport):
+        # Setup environment
+        transport.poll_for_decision_task.side_effect = ValueError("spam")
+
+        # Run function
+        with pytest.raises(ValueError):
+            asyncio.run(instance.run())
+
+        # Check calls
+        transport.respond_decision_task_completed.assert_not_awaited()
 
 
 def test_run_app(tmp_path):
@@ -407,10 +909,228 @@ def test_run_app(tmp_path):
 
     # Run function
     with decider_class_patch:
-        seddy_decider.run_app(workflows_spec_json, "spam", "eggs", "abcd1234")
+        seddy_decider.run_app(workflows_spec_json, "spam", "eggs", "abcd1234", 4, 8)
 
     # Check decider configuration
     decider_class_mock.assert_called_once_with(
-        workflows_spec_json, "spam", "eggs", "abcd1234"
+        workflows_spec_json, "spam", "eggs", "abcd1234", 4, 8, None, None, None
     )
     decider_class_mock.return_value.run.assert_called_once_with()
+
+
+def test_run_app_record(tmp_path):
+    """Ensure decider records decision tasks, closing the recorder after."""
+    # Setup environment
+    decider_class_mock = mock.Mock()
+    decider_class_patch = mock.patch.object(
+        seddy_decider, "Decider", decider_class_mock
+    )
+    recorder_class_mock = mock.Mock()
+    recorder_class_patch = mock.patch.object(
+        seddy_recording, "Recorder", recorder_class_mock
+    )
+
+    # Build input
+    workflows_spec_json = tmp_path / "workflows.json"
+
+    # Run function
+    with decider_class_patch, recorder_class_patch:
+        seddy_decider.run_app(
+            workflows_spec_json,
+            "spam",
+            "eggs",
+            record_dir=tmp_path / "rec",
+            record_compression="zstd",
+        )
+
+    # Check recorder configuration
+    recorder_class_mock.assert_called_once_with(
+        tmp_path / "rec", 64 * 1024**2, "zstd"
+    )
+    decider_class_mock.assert_called_once_with(
+        workflows_spec_json,
+        "spam",
+        "eggs",
+        None,
+        1,
+        1,
+        None,
+        None,
+        recorder_class_mock.return_value,
+    )
+    decider_class_mock.return_value.run.assert_called_once_with()
+    recorder_class_mock.return_value.close.assert_called_once_with()
+
+
+def test_run_app_asyncio(tmp_path):
+    """Ensure asyncio decider is run with the correct configuration."""
+    # Setup environment
+    decider_mock = mock.Mock(spec=seddy_decider.AsyncDecider)
+    decider_class_mock = mock.Mock(return_value=decider_mock)
+    decider_class_patch = mock.patch.object(
+        seddy_decider, "AsyncDecider", decider_class_mock
+    )
+
+    # Build input
+    workflows_spec_json = tmp_path / "workflows.json"
+
+    # Run function
+    with decider_class_patch:
+        seddy_decider.run_app(
+            workflows_spec_json, "spam", "eggs", "abcd1234", 4, 8, engine="asyncio"
+        )
+
+    # Check decider configuration
+    decider_class_mock.assert_called_once_with(
+        workflows_spec_json, "spam", "eggs", "abcd1234", 4, 8, None, None, None
+    )
+    decider_class_mock.return_value.run.assert_awaited_once_with()
+
+
+class TestSupervisor:
+    @pytest.fixture
+    def workflows_spec_file(self, tmp_path):
+        workflows_spec = {
+            "version": "1.0",
+            "workflows": [
+                {"spec_type": "dag", "name": "spam", "version": "1.0", "tasks": []}
+            ],
+        }
+        workflows_spec_file = tmp_path / "workflows.json"
+        workflows_spec_file.write_text(json.dumps(workflows_spec))
+        return workflows_spec_file
+
+    @pytest.fixture
+    def instance(self, workflows_spec_file):
+        decider_kwargs = {"n_pollers": 2, "n_workers": 4, "engine": "thread"}
+        instance = seddy_decider.Supervisor(
+            workflows_spec_file, "spam", "eggs", "abcd", 2, decider_kwargs
+        )
+        instance.restart_interval = 0.0
+        return instance
+
+    def test_run_decider(self, instance):
+        # Setup environment
+        run_mock = mock.Mock()
+        run_patch = mock.patch.object(seddy_decider, "_run", run_mock)
+        instance._load_workflows()
+
+        # Run function
+        with run_patch:
+            instance._run_decider(1)
+
+        # Check calls
+        run_mock.assert_called_once_with(
+            instance.workflows_spec_file,
+            "spam",
+            "eggs",
+            "abcd-1",
+            registry=instance._registry,
+            n_pollers=2,
+            n_workers=4,
+            engine="thread",
+        )
+        workflow = instance._registry.get("spam", "1.0")
+        assert workflow.dependants == {None: []}
+
+    def test_run(self, instance):
+        """Deciders are started, restarted on crash, and stopped on signal."""
+        # Setup environment
+        def wait():
+            pid = next(exits)
+            if pid == 102:
+                instance._handle_stop_signal(signal.SIGTERM, None)
+            return pid, 256
+
+        exits = iter([101, 102, 103])
+        fork_mock = mock.Mock(side_effect=[101, 102, 103])
+        kill_mock = mock.Mock()
+        signal_mock = mock.Mock()
+        patches = [
+            mock.patch.object(os, "fork", fork_mock),
+            mock.patch.object(os, "wait", wait),
+            mock.patch.object(os, "kill", kill_mock),
+            mock.patch.object(signal, "signal", signal_mock),
+        ]
+
+        # Run function
+        with patches[0], patches[1], patches[2], patches[3]:
+            instance.run()
+
+        # Check calls
+        assert fork_mock.call_count == 3
+        assert kill_mock.call_args_list == [
+            mock.call(102, signal.SIGTERM),
+            mock.call(103, signal.SIGTERM),
+        ]
+        assert not instance._children
+        signal_mock.assert_any_call(signal.SIGTERM, instance._handle_stop_signal)
+
+
+def test_run_app_processes(tmp_path):
+    """Ensure decider supervisor is run with the correct configuration."""
+    # Setup environment
+    supervisor_class_mock = mock.Mock()
+    supervisor_class_patch = mock.patch.object(
+        seddy_decider, "Supervisor", supervisor_class_mock
+    )
+
+    # Build input
+    workflows_spec_json = tmp_path / "workflows.json"
+
+    # Run function
+    with supervisor_class_patch:
+        seddy_decider.run_app(
+            workflows_spec_json, "spam", "eggs", "abcd1234", 4, 8, n_processes=3
+        )
+
+    # Check supervisor configuration
+    supervisor_class_mock.assert_called_once_with(
+        workflows_spec_json,
+        "spam",
+        "eggs",
+        "abcd1234",
+        3,
+        {
+            "n_pollers": 4,
+            "n_workers": 8,
+            "engine": "thread",
+            "reload_interval": None,
+        },
+    )
+    supervisor_class_mock.return_value.run.assert_called_once_with()
+
+
+def test_run_app_lazy_workflows(tmp_path):
+    """Ensure decider is run with a lazy workflows registry."""
+    # Setup environment
+    decider_class_mock = mock.Mock()
+    decider_class_patch = mock.patch.object(
+        seddy_decider, "Decider", decider_class_mock
+    )
+
+    # Build input
+    workflows_spec_json = tmp_path / "workflows.json"
+
+    # Run function
+    with decider_class_patch:
+        seddy_decider.run_app(
+            workflows_spec_json, "spam", "eggs", "abcd1234", lazy_workflows=True
+        )
+
+    # Check decider configuration
+    (registry,) = [
+        a
+        for a in decider_class_mock.call_args[0]
+        if isinstance(a, seddy_specs.WorkflowRegistry)
+    ]
+    assert registry.lazy
+    assert registry.workflows_file == workflows_spec_json
+
+
+def test_supervisor_lazy_workflows(tmp_path):
+    """Ensure decider supervisor indexes lazy workflows."""
+    instance = seddy_decider.Supervisor(
+        tmp_path, "spam", "eggs", decider_kwargs={"lazy_workflows": True}
+    )
+    assert instance._registry.lazy
@@ -0,0 +1,202 @@
+"""Test ``seddy._json``."""
+
+import sys
+import json
+import importlib.util
+from unittest import mock
+
+import pytest
+
+from seddy import _json as seddy_json
+from seddy import _specs as seddy_specs
+
+AUTO_CODEC = "orjson" if importlib.util.find_spec("orjson") else "json"
+RESULTS = [
+    '{"spam": [42, 1.5e-07, null, true], "eggs": "\\u00e9\\u2603"}',
+    '{"spam":"é☃","eggs":{"ham":0.1}}',
+    "[NaN, Infinity, -Infinity]",
+    "123456789012345678901234567890",
+    "[0.0011428193144282783, -18446744073709551616, 1e-0000000000000000000001]",
+    '{"spam": "1234567890123456789012", "eggs": 18446744073709551615}',
+    '"\\ud800"',
+    '  {"spam": 1, "spam": 2}  ',
+]
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    """Restore JSON codec selection after test."""
+    codec = seddy_json.codec
+    yield
+    seddy_json.set_codec(codec)
+
+
+def test_set_codec_json():
+    """Test standard library codec selection."""
+    seddy_json.set_codec("json")
+    assert seddy_json.codec == "json"
+    assert seddy_json._loads is json.loads
+
+
+def test_set_codec_orjson():
+    """Test orjson codec selection."""
+    pytest.importorskip("orjson")
+    seddy_json.set_codec("orjson")
+    assert seddy_json.codec == "orjson"
+    assert seddy_json.loads('{"spam": [42]}') == {"spam": [42]}
+
+
+def test_set_codec_auto():
+    """Test automatic codec selection."""
+    seddy_json.set_codec("auto")
+    assert seddy_json.codec == AUTO_CODEC
+
+    with mock.patch.dict(sys.modules, {"orjson": None}):
+        seddy_json.set_codec("auto")
+    assert seddy_json.codec == "json"
+
+
+def test_set_codec_auto_lazy():
+    """Test automatic codec selection imports orjson on first decode."""
+    pytest.importorskip("orjson")
+    seddy_json.set_codec("auto")
+    assert seddy_json._loads is seddy_json._loads_orjson_lazily
+    assert seddy_json.loads('{"spam": [42]}') == {"spam": [42]}
+    assert seddy_json._loads is not seddy_json._loads_orjson_lazily
+    assert seddy_json.codec == "orjson"
+
+
+def test_set_codec_unavailable():
+    """Test unavailable codec selection is rejected."""
+    with mock.patch.dict(sys.modules, {"orjson": None}):
+        with pytest.raises(ImportError):
+            seddy_json.set_codec("orjson")
+
+
+def test_set_codec_unknown():
+    """Test unknown codec selection is rejected."""
+    with pytest.raises(ValueError):
+        seddy_json.set_codec("pickle")
+
+
+@pytest.mark.parametrize(
+    ("environ", "exp"),
+    [
+        pytest.param({}, AUTO_CODEC, id="unset"),
+        pytest.param({"SEDDY_JSON_CODEC": "json"}, "json", id="json"),
+        pytest.param({"SEDDY_JSON_CODEC": "pickle"}, AUTO_CODEC, id="unknown"),
+    ],
+)
+def test_set_codec_from_environment(environ, exp, caplog):
+    """Test codec selection from the environment."""
+    with mock.patch.dict(seddy_json.os.environ, environ, clear=True):
+        seddy_json._set_codec_from_environment()
+    assert seddy_json.codec == exp
+    assert ("Invalid" in caplog.text) is (environ.get("SEDDY_JSON_CODEC") == "pickle")
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+@pytest.mark.parametrize("s", RESULTS)
+def test_loads(codec, s):
+    """Test decoding is identical to the standard library's."""
+    if codec == "orjson":
+        pytest.importorskip("orjson")
+    seddy_json.set_codec(codec)
+    assert json.dumps(seddy_json.loads(s)) == json.dumps(json.loads(s))
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_loads_invalid(codec):
+    """Test decoding errors are the standard library's."""
+    if codec == "orjson":
+        pytest.importorskip("orjson")
+    seddy_json.set_codec(codec)
+    with pytest.raises(json.JSONDecodeError) as e:
+        seddy_json.loads('{"spam": [42}')
+    with pytest.raises(json.JSONDecodeError) as exp_e:
+        json.loads('{"spam": [42}')
+    assert str(e.value) == str(exp_e.value)
+
+
+@pytest.mark.parametrize("value", [None, "é☃", {"spam": [42, 0.1, None]}, [1e300]])
+def test_dumps(value):
+    """Test encoding is canonical."""
+    assert seddy_json.dumps(value) == json.dumps(value)
+
+
+@pytest.mark.parametrize("result", RESULTS)
+def test_decisions_identical(result):
+    """Test decisions are identical across codecs."""
+    pytest.importorskip("orjson")
+    workflow = seddy_specs.DAGWorkflow.from_spec(
+        {
+            "name": "spam",
+            "version": "1.0",
+            "tasks": [
+                {"id": "foo", "type": {"name": "spam-foo", "version": "0.3"}},
+                {
+                    "id": "bar",
+                    "type": {"name": "spam-bar", "version": "0.1"},
+                    "dependencies": ["foo"],
+                    "input": {"type": "dependency-result", "id": "foo"},
+                },
+            ],
+        }
+    )
+    workflow.setup()
+    task = {
+        "taskToken": "spam",
+        "previousStartedEventId": 3,
+        "startedEventId": 9,
+        "workflowType": {"name": "spam", "version": "1.0"},
+        "events": [
+            {
+                "eventId": 1,
+                "eventType": "WorkflowExecutionStarted",
+                "workflowExecutionStartedEventAttributes": {"input": result},
+            },
+            {"eventId": 2, "eventType": "DecisionTaskScheduled"},
+            {"eventId": 3, "eventType": "DecisionTaskStarted"},
+            {
+                "eventId": 4,
+                "eventType": "DecisionTaskCompleted",
+                "decisionTaskCompletedEventAttributes": {"startedEventId": 3},
+            },
+            {
+                "eventId": 5,
+                "eventType": "ActivityTaskScheduled",
+                "activityTaskScheduledEventAttributes": {
+                    "activityId": "foo",
+                    "activityType": {"name": "spam-foo", "version": "0.3"},
+                    "decisionTaskCompletedEventId": 4,
+                },
+            },
+            {
+                "eventId": 6,
+                "eventType": "ActivityTaskStarted",
+                "activityTaskStartedEventAttributes": {"scheduledEventId": 5},
+            },
+            {
+                "eventId": 7,
+                "eventType": "ActivityTaskCompleted",
+                "activityTaskCompletedEventAttributes": {
+                    "scheduledEventId": 5,
+                    "result": result,
+                },
+            },
+            {"eventId": 8, "eventType": "DecisionTaskScheduled"},
+            {"eventId": 9, "eventType": "DecisionTaskStarted"},
+        ],
+    }
+
+    decisions = {}
+    for codec in ("json", "orjson"):
+        seddy_json.set_codec(codec)
+        execution = {"workflowId": "spam-1234", "runId": "run-" + codec}
+        decisions[codec] = workflow.make_decisions(
+            {**task, "workflowExecution": execution}
+        )
+    assert decisions["orjson"] == decisions["json"]
+    (decision,) = decisions["json"]
+    exp_input = json.dumps(json.loads(result))
+    assert decision["scheduleActivityTaskDecisionAttributes"]["input"] == exp_input
@@ -0,0 +1,290 @@
+"""Test ``seddy.recording``."""
+
+import gzip
+import json
+import time
+import pathlib
+import datetime
+import multiprocessing
+from unittest import mock
+
+import pytest
+
+from seddy import _specs as seddy_specs
+from seddy import recording as seddy_recording
+
+WORKFLOWS_SPEC = {
+    "version": "1.0",
+    "workflows": [
+        {
+            "spec_type": "dag",
+            "name": "spam",
+            "version": "1.0",
+            "tasks": [
+                {"id": "foo", "type": {"name": "spam-foo", "version": "0.3"}},
+                {
+                    "id": "bar",
+                    "type": {"name": "spam-bar", "version": "0.1"},
+                    "dependencies": ["foo"],
+                },
+            ],
+        }
+    ],
+}
+
+
+def _make_tasks(run_id):
+    """Decision tasks of a workflow execution: started, and foo completed."""
+    events = [
+        {
+            "eventId": 1,
+            "eventType": "WorkflowExecutionStarted",
+            "workflowExecutionStartedEventAttributes": {"input": "null"},
+        },
+        {"eventId": 2, "eventType": "DecisionTaskScheduled"},
+        {"eventId": 3, "eventType": "DecisionTaskStarted"},
+        {
+            "eventId": 4,
+            "eventType": "DecisionTaskCompleted",
+            "decisionTaskCompletedEventAttributes": {"startedEventId": 3},
+        },
+        {
+            "eventId": 5,
+            "eventType": "ActivityTaskScheduled",
+            "activityTaskScheduledEventAttributes": {
+                "activityId": "foo",
+                "activityType": {"name": "spam-foo", "version": "0.3"},
+                "decisionTaskCompletedEventId": 4,
+            },
+        },
+        {
+            "eventId": 6,
+            "eventType": "ActivityTaskStarted",
+            "activityTaskStartedEventAttributes": {"scheduledEventId": 5},
+        },
+        {
+            "eventId": 7,
+            "eventType": "ActivityTaskCompleted",
+            "activityTaskCompletedEventAttributes": {
+                "scheduledEventId": 5,
+                "result": "42",
+            },
+        },
+        {"eventId": 8, "eventType": "DecisionTaskScheduled"},
+        {"eventId": 9, "eventType": "DecisionTaskStarted"},
+    ]
+    common = {
+        "taskToken": "token",
+        "workflowType": {"name": "spam", "version": "1.0"},
+        "workflowExecution": {"workflowId": "wf-" + run_id, "runId": run_id},
+    }
+    return [
+        {
+            **common,
+            "previousStartedEventId": 0,
+            "startedEventId": 3,
+            "events": events[:3],
+        },
+        {
+            **common,
+            "previousStartedEventId": 3,
+            "startedEventId": 9,
+            "events": events[3:],
+        },
+    ]
+
+
+@pytest.fixture
+def workflows_file(tmp_path):
+    """Workflows specifications file."""
+    workflows_file = tmp_path / "workflows.json"
+    workflows_file.write_text(json.dumps(WORKFLOWS_SPEC))
+    return workflows_file
+
+
+@pytest.fixture
+def recordings_dir(tmp_path, workflows_file):
+    """Directory of recorded decision tasks of two workflow executions."""
+    registry = seddy_specs.WorkflowRegistry(workflows_file)
+    registry.load()
+    workflow = registry.get("spam", "1.0")
+    seddy_specs.execution_states.clear()
+    recordings_dir = tmp_path / "rec"
+    with seddy_recording.Recorder(recordings_dir) as recorder:
+        for task_pair in zip(_make_tasks("run1"), _make_tasks("run2")):
+            for task in task_pair:
+                decisions = workflow.make_decisions(task)
+                recorder.record(task, decisions, 0.01)
+    seddy_specs.execution_states.clear()
+    return recordings_dir
+
+
+class TestRecorder:
+    """Test ``seddy.recording.Recorder``."""
+
+    def test_record(self, tmp_path):
+        """Test decision task recording."""
+        task = {"taskToken": "spam", "events": [{"eventId": 1}]}
+        decisions = [{"decisionType": "CompleteWorkflowExecution"}]
+        with seddy_recording.Recorder(tmp_path / "rec") as recorder:
+            recorder.record(task, decisions, 0.5)
+            recorder.record(task, [], 0.25)
+        (path,) = (tmp_path / "rec").iterdir()
+        assert path == recorder.path
+        assert path.name.endswith(".jsonl.gz")
+        records = [json.loads(line) for line in gzip.open(path, "rt")]
+        assert records == [
+            {
+                "time": mock.ANY,
+                "duration": 0.5,
+                "task": task,
+                "decisions": decisions,
+            },
+            {"time": mock.ANY, "duration": 0.25, "task": task, "decisions": []},
+        ]
+
+    def test_record_timestamps(self, tmp_path):
+        """Test history event timestamps are recorded as epoch seconds."""
+        timestamp = datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        task = {"taskToken": "spam", "events": [{"eventTimestamp": timestamp}]}
+        with seddy_recording.Recorder(tmp_path) as recorder:
+            recorder.record(task, [], 0.5)
+        (record,) = seddy_recording.iter_records([recorder.path])
+        assert record["task"]["events"] == [{"eventTimestamp": 1577934245.0}]
+
+    def test_record_error(self, tmp_path, caplog):
+        """Test failure to record is logged, not raised."""
+        with seddy_recording.Recorder(tmp_path) as recorder:
+            recorder.record({"taskToken": "spam", "events": [object()]}, [], 0.5)
+            recorder.record({"taskToken": "eggs"}, [], 0.5)
+        (record,) = seddy_recording.iter_records([recorder.path])
+        assert record["task"] == {"taskToken": "eggs"}
+        assert "Failed to record decision task" in caplog.text
+
+    def test_rotate(self, tmp_path):
+        """Test recording file rotation."""
+        with seddy_recording.Recorder(tmp_path, max_bytes=1) as recorder:
+            for j in range(3):
+                recorder.record({"taskToken": str(j)}, [], 0.0)
+        paths = sorted(tmp_path.iterdir())
+        assert [p.name[-14:] for p in paths] == [
+            "-0000.jsonl.gz",
+            "-0001.jsonl.gz",
+            "-0002.jsonl.gz",
+        ]
+        records = list(seddy_recording.iter_records([tmp_path]))
+        assert [r["task"]["taskToken"] for r in records] == ["0", "1", "2"]
+
+    def test_no_records(self, tmp_path):
+        """Test no file is created without records."""
+        seddy_recording.Recorder(tmp_path / "rec").close()
+        assert not (tmp_path / "rec").exists()
+
+    def test_zstd(self, tmp_path):
+        """Test zstandard-compressed recording."""
+        pytest.importorskip("zstandard")
+        with seddy_recording.Recorder(tmp_path, compression="zstd") as recorder:
+            recorder.record({"taskToken": "spam"}, [], 0.0)
+        assert recorder.path.name.endswith(".jsonl.zst")
+        (record,) = seddy_recording.iter_records([recorder.path])
+        assert record["task"] == {"taskToken": "spam"}
+
+    def test_unknown_compression(self, tmp_path):
+        """Test unknown compression is rejected."""
+        with pytest.raises(ValueError):
+            seddy_recording.Recorder(tmp_path, compression="lzma")
+
+
+def test_iter_records_truncated(tmp_path, caplog):
+    """Test truncated record is skipped."""
+    path = tmp_path / "decisions.jsonl"
+    path.write_text('{"task": {"taskToken": "spam"}}\n{"task": {"taskTo')
+    records = list(seddy_recording.iter_records([path]))
+    assert records == [{"task": {"taskToken": "spam"}}]
+    assert "truncated" in caplog.text
+
+
+@pytest.mark.parametrize("n_processes", [1, 2])
+def test_replay(workflows_file, recordings_dir, n_processes):
+    """Test recorded decision tasks are replayed with the same decisions."""
+    res = seddy_recording.replay(workflows_file, [recordings_dir], n_processes)
+    assert res.differences == []
+    assert res.n_skipped == 0
+    assert res.n_unsupported == 0
+    timing = res.timings[("spam", "1.0")]
+    assert timing.n_tasks == 4
+    assert timing.recorded_total == pytest.approx(0.04)
+    assert timing.max <= timing.total
+
+
+def test_replay_slow_worker(workflows_file, recordings_dir):
+    """Test replay waits on worker processes slower than the summary poll."""
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("Worker processes don't inherit patches")
+    replay_record = seddy_recording._replay_record
+
+    def slow_replay_record(*args):
+        time.sleep(0.6)
+        return replay_record(*args)
+
+    patch = mock.patch.object(seddy_recording, "_replay_record", slow_replay_record)
+    with patch:
+        res = seddy_recording.replay(workflows_file, [recordings_dir], 2)
+    assert res.differences == []
+    assert res.timings[("spam", "1.0")].n_tasks == 4
+
+
+def test_replay_differences(tmp_path, workflows_file):
+    """Test replay reports differences, and skips unreplayable tasks."""
+    first_task, second_task = _make_tasks("run1")
+    unsupported_task = {**first_task, "workflowType": {"name": "eggs", "version": "1"}}
+    with seddy_recording.Recorder(tmp_path) as recorder:
+        recorder.record(first_task, [], 0.0)
+        recorder.record(_make_tasks("run2")[1], [], 0.0)
+        recorder.record(unsupported_task, [], 0.0)
+
+    res = seddy_recording.replay(workflows_file, [recorder.path])
+    assert res.n_skipped == 1
+    assert res.n_unsupported == 1
+    assert res.differences == [
+        {
+            "workflowType": {"name": "spam", "version": "1.0"},
+            "workflowExecution": {"workflowId": "wf-run1", "runId": "run1"},
+            "startedEventId": 3,
+            "recorded": [],
+            "replayed": [
+                {
+                    "decisionType": "ScheduleActivityTask",
+                    "scheduleActivityTaskDecisionAttributes": {
+                        "activityId": "foo",
+                        "activityType": {"name": "spam-foo", "version": "0.3"},
+                    },
+                }
+            ],
+        }
+    ]
+
+
+@pytest.mark.parametrize("json_output", [False, True])
+def test_run_app(workflows_file, recordings_dir, capsys, json_output):
+    """Test replay application output."""
+    seddy_recording.run_app(workflows_file, [recordings_dir], json_output=json_output)
+    res_out = capsys.readouterr().out
+    if json_output:
+        summary = json.loads(res_out)
+        assert summary["timings"][0]["name"] == "spam"
+        assert summary["timings"][0]["n_tasks"] == 4
+        assert summary["differences"] == []
+    else:
+        assert "spam-1.0" in res_out
+        assert "differences: 0" in res_out
+
+
+def test_run_app_differences(tmp_path, workflows_file):
+    """Test replay application fails on differences."""
+    path = tmp_path / "decisions.jsonl"
+    record = {"task": _make_tasks("run1")[0], "decisions": []}
+    path.write_text(json.dumps(record) + "\n")
+    with pytest.raises(SystemExit) as e:
+        seddy_recording.run_app(workflows_file, [pathlib.Path(path)])
+    assert e.value.code == 1
@@ -5,6 +5,7 @@ from unittest import mock
 
 import moto
 import boto3
+import pytest
 
 from seddy import _specs as seddy_decisions
 from seddy import registration as seddy_registration
@@ -43,6 +44,42 @@ def test_list_workflows():
     assert res == {("foo", "1.0"): False, ("foo", "1.1"): True, ("bar", "0.42"): True}
 
 
+@pytest.mark.parametrize(
+    ("max_name_listings", "exp_n_listings"),
+    [pytest.param(2, 4, id="by-name"), pytest.param(1, 2, id="all")],
+)
+@mock_swf
+def test_list_workflows_names(max_name_listings, exp_n_listings):
+    """Test registered workflow listing, filtered by name and rate-limited."""
+    # Setup environment
+    client = boto3.client("swf", region_name="us-east-1")
+    client.register_domain(name="spam", workflowExecutionRetentionPeriodInDays="2")
+    client.register_workflow_type(domain="spam", name="foo", version="1.0")
+    client.register_workflow_type(domain="spam", name="foo", version="1.1")
+    client.register_workflow_type(domain="spam", name="bar", version="0.42")
+    client.register_workflow_type(domain="spam", name="yay", version="0.17")
+    client.deprecate_workflow_type(
+        domain="spam", workflowType={"name": "foo", "version": "1.0"}
+    )
+    list_mock = mock.Mock(wraps=client.list_workflow_types)
+    list_patch = mock.patch.object(client, "list_workflow_types", list_mock)
+    max_patch = mock.patch.object(
+        seddy_registration, "_max_name_listings", max_name_listings
+    )
+    rate_limiter = mock.Mock(spec=seddy_registration._util.RateLimiter)
+
+    # Run function
+    with list_patch, max_patch:
+        res = seddy_registration.list_workflows(
+            "spam", client, names=["foo", "bar"], rate_limiter=rate_limiter
+        )
+
+    # Check result
+    assert res == {("foo", "1.0"): False, ("foo", "1.1"): True, ("bar", "0.42"): True}
+    assert list_mock.call_count == exp_n_listings
+    assert rate_limiter.acquire.call_count == exp_n_listings
+
+
 @mock_swf
 def test_register_workflow():
     """Test workflow registration."""
@@ -187,6 +224,451 @@ def test_register_workflows():
     assert workflow_types == exp_deprecated_workflow_types
 
 
+def test_plan_workflows():
+    """Test minimal workflow registration changes planning."""
+    # Build input
+    existing = {("foo", "1.0"): False, ("foo", "1.1"): True, ("bar", "0.42"): False}
+    workflows = [
+        Workflow("foo", "1.0", registration=seddy_decisions.Registration(active=False)),
+        Workflow("foo", "1.1", registration=seddy_decisions.Registration(active=False)),
+        Workflow("foo", "1.2"),
+        Workflow("bar", "0.42"),
+        Workflow(
+            "bar", "0.43", registration=seddy_decisions.Registration(active=False)
+        ),
+    ]
+
+    # Run function
+    res = seddy_registration.plan_workflows(workflows, existing)
+    assert res == [
+        seddy_registration.Change(seddy_registration.Action.DEPRECATE, workflows[1]),
+        seddy_registration.Change(seddy_registration.Action.REGISTER, workflows[2]),
+        seddy_registration.Change(seddy_registration.Action.UNDEPRECATE, workflows[3]),
+    ]
+
+
+def test_apply_changes():
+    """Test workflow registration changes are applied, rate-limited."""
+    # Setup environment
+    client = mock.Mock()
+    rate_limiter_mock = mock.Mock(spec=seddy_registration._util.RateLimiter)
+    rate_limiter_cls_mock = mock.Mock(return_value=rate_limiter_mock)
+    rate_limiter_patch = mock.patch.object(
+        seddy_registration._util, "RateLimiter", rate_limiter_cls_mock
+    )
+
+    # Build input
+    changes = [
+        seddy_registration.Change(seddy_registration.Action.REGISTER, w)
+        for w in [Workflow("foo", "1.0"), Workflow("foo", "1.1")]
+    ]
+    changes.append(
+        seddy_registration.Change(
+            seddy_registration.Action.DEPRECATE, Workflow("bar", "0.42")
+        )
+    )
+
+    # Run function
+    with rate_limiter_patch:
+        seddy_registration.apply_changes(changes, "spam", client, 2, 5.0)
+
+    # Check result
+    rate_limiter_cls_mock.assert_called_once_with(5.0)
+    assert rate_limiter_mock.acquire.call_count == 3
+    assert sorted(
+        c[1]["version"] for c in client.register_workflow_type.call_args_list
+    ) == ["1.0", "1.1"]
+    client.deprecate_workflow_type.assert_called_once_with(
+        domain="spam", workflowType={"name": "bar", "version": "0.42"}
+    )
+
+
+def test_apply_changes_error():
+    """Test workflow registration change failure is raised."""
+    # Setup environment
+    client = mock.Mock()
+    client.register_workflow_type.side_effect = RuntimeError("throttled")
+
+    # Build input
+    changes = [
+        seddy_registration.Change(seddy_registration.Action.REGISTER, w)
+        for w in [Workflow("foo", "1.0"), Workflow("foo", "1.1")]
+    ]
+
+    # Run function
+    with pytest.raises(RuntimeError, match="throttled"):
+        seddy_registration.apply_changes(changes, "spam", client, n_workers=1)
+
+
+@mock_swf
+def test_register_workflows_dry_run():
+    """Test workflows registration syncing dry-run."""
+    # Setup environment
+    client = boto3.client("swf", region_name="us-east-1")
+    client.register_domain(name="spam", workflowExecutionRetentionPeriodInDays="2")
+    client.register_workflow_type(domain="spam", name="foo", version="1.0")
+    client_patch = mock.patch.object(boto3, "client", lambda x, **_: {"swf": client}[x])
+
+    # Build input
+    workflows = [
+        Workflow("foo", "1.0", registration=seddy_decisions.Registration(active=False)),
+        Workflow("foo", "1.1"),
+    ]
+
+    # Run function
+    with client_patch:
+        res = seddy_registration.register_workflows(workflows, "spam", dry_run=True)
+
+    # Check result
+    assert [(c.action, c.workflow) for c in res] == [
+        (seddy_registration.Action.DEPRECATE, workflows[0]),
+        (seddy_registration.Action.REGISTER, workflows[1]),
+    ]
+    resp = client.list_workflow_types(domain="spam", registrationStatus="REGISTERED")
+    assert [w["workflowType"] for w in resp["typeInfos"]] == [
+        {"name": "foo", "version": "1.0"}
+    ]
+
+
+def test_get_registration_digest():
+    """Test workflows registration content hashing."""
+    # Build input
+    workflows = [
+        Workflow("foo", "1.0", registration=seddy_decisions.Registration(active=False)),
+        Workflow("foo", "1.1", "A workflow."),
+        Workflow(
+            "bar",
+            "0.42",
+            registration=seddy_decisions.Registration(
+                task_list="eggs", child_policy=seddy_decisions.ChildPolicy.ABANDON
+            ),
+        ),
+    ]
+
+    # Run function
+    res = seddy_registration.get_registration_digest(workflows)
+    assert len(res) == 64
+    assert seddy_registration.get_registration_digest(workflows[::-1]) == res
+    workflows[0].registration.active = True
+    assert seddy_registration.get_registration_digest(workflows) != res
+    workflows[0].registration.active = False
+    workflows[1].description = "The best workflow."
+    assert seddy_registration.get_registration_digest(workflows) != res
+    workflows[1].description = "A workflow."
+    workflows[1].registration = seddy_decisions.Registration()
+    assert seddy_registration.get_registration_digest(workflows) == res
+
+
+@mock_swf
+def test_register_workflows_state_file(tmp_path, caplog):
+    """Test workflows registration is skipped when unchanged."""
+    # Setup environment
+    caplog.set_level(25)
+    client = boto3.client("swf", region_name="us-east-1")
+    client.register_domain(name="spam", workflowExecutionRetentionPeriodInDays="2")
+    client.register_domain(name="eggs", workflowExecutionRetentionPeriodInDays="2")
+    client_patch = mock.patch.object(boto3, "client", lambda x, **_: {"swf": client}[x])
+    list_mock = mock.Mock(wraps=seddy_registration.list_workflows)
+    list_patch = mock.patch.object(seddy_registration, "list_workflows", list_mock)
+
+    # Build input
+    workflows = [Workflow("foo", "1.0"), Workflow("foo", "1.1")]
+    state_file = tmp_path / "state" / "registration.json"
+
+    # Run function
+    with client_patch, list_patch:
+        res = seddy_registration.register_workflows(
+            workflows, "spam", state_file=state_file
+        )
+        assert len(res) == 2
+        assert list_mock.call_count == 1
+
+        res = seddy_registration.register_workflows(
+            workflows, "spam", state_file=state_file
+        )
+        assert res == []
+        assert list_mock.call_count == 1
+        assert "unchanged since last sync" in caplog.text
+
+        res = seddy_registration.register_workflows(
+            workflows, "spam", state_file=state_file, force=True
+        )
+        assert res == []
+        assert list_mock.call_count == 2
+
+        res = seddy_registration.register_workflows(
+            workflows, "eggs", state_file=state_file, dry_run=True
+        )
+        assert len(res) == 2
+        assert list_mock.call_count == 3
+
+        workflows.append(Workflow("foo", "1.2"))
+        res = seddy_registration.register_workflows(
+            workflows, "spam", state_file=state_file
+        )
+        assert [c.workflow.version for c in res] == ["1.2"]
+        assert list_mock.call_count == 4
+
+    # Check state
+    state = json.loads(state_file.read_text())
+    state_key = "%s arn:aws:swf:us-east-1:123456789012:/domain/spam"
+    state_key %= client.meta.endpoint_url
+    assert list(state["domains"]) == [state_key]
+    assert state["domains"][state_key] == {
+        "digest": seddy_registration.get_registration_digest(workflows),
+        "synced": mock.ANY,
+    }
+
+
+def test_get_state_key_accounts():
+    """Test registration state keys differ by AWS account."""
+    client = mock.Mock()
+    client.meta.endpoint_url = "https://swf.us-east-1.amazonaws.com"
+    arns = [
+        "arn:aws:swf:us-east-1:123456789012:/domain/spam",
+        "arn:aws:swf:us-east-1:210987654321:/domain/spam",
+    ]
+    keys = []
+    for arn in arns:
+        client.describe_domain.return_value = {"domainInfo": {"arn": arn}}
+        keys.append(seddy_registration._get_state_key("spam", client))
+    client.describe_domain.assert_called_with(name="spam")
+    assert keys == ["https://swf.us-east-1.amazonaws.com " + arn for arn in arns]
+
+
+def test_read_state_invalid(tmp_path, caplog):
+    """Test invalid registration state file is ignored."""
+    state_file = tmp_path / "registration.json"
+    state_file.write_text("{")
+    assert seddy_registration._read_state(state_file) == {}
+    assert "invalid registration state file" in caplog.text
+
+
+def test_filter_workflows():
+    """Test workflows filtering by name."""
+    workflows = [Workflow("foo", "1.0"), Workflow("bar", "1.0"), Workflow("baz", "1.0")]
+    res = seddy_registration.filter_workflows(workflows, names=["foo", "bar"])
+    assert res == workflows[:2]
+    res = seddy_registration.filter_workflows(workflows, name_prefix="ba")
+    assert res == workflows[1:]
+    res = seddy_registration.filter_workflows(workflows, ["foo", "bar"], "ba")
+    assert res == workflows[1:2]
+
+
+def test_run_app_name_prefix(tmp_path):
+    """Ensure workflows are filtered by name prefix."""
+    # Setup environment
+    register_mock = mock.Mock(return_value=[])
+    register_patch = mock.patch.object(
+        seddy_registration, "register_workflows", register_mock
+    )
+
+    # Build input
+    workflows_spec = {
+        "version": "1.0",
+        "workflows": [
+            {"spec_type": "test", "name": "spam", "version": "1.0"},
+            {"spec_type": "test", "name": "eggs", "version": "1.0"},
+        ],
+    }
+    workflows_spec_json = tmp_path / "workflows.json"
+    workflows_spec_json.write_text(json.dumps(workflows_spec))
+
+    # Run function
+    with register_patch:
+        seddy_registration.run_app(workflows_spec_json, "spam", name_prefix="sp")
+
+    # Check registered workflows
+    (res_workflows, _), _ = register_mock.call_args
+    assert [w.name for w in res_workflows] == ["spam"]
+
+
+def test_run_app_plan(tmp_path, capsys):
+    """Ensure workflow registration plan is printed."""
+    # Setup environment
+    changes = [
+        seddy_registration.Change(
+            seddy_registration.Action.REGISTER, Workflow("foo", "1.1")
+        ),
+        seddy_registration.Change(
+            seddy_registration.Action.DEPRECATE, Workflow("foo", "1.0")
+        ),
+        seddy_registration.Change(
+            seddy_registration.Action.REGISTER, Workflow("bar", "0.42")
+        ),
+    ]
+    register_mock = mock.Mock(return_value=changes)
+    register_patch = mock.patch.object(
+        seddy_registration, "register_workflows", register_mock
+    )
+
+    # Build input
+    workflows_spec_json = tmp_path / "workflows.json"
+    workflows_spec_json.write_text(json.dumps({"version": "1.0", "workflows": []}))
+
+    # Run function
+    with register_patch:
+        seddy_registration.run_app(workflows_spec_json, "spam", plan=True)
+
+    # Check output
+    register_mock.assert_called_once_with(
+        [],
+        "spam",
+        n_workers=8,
+        max_rate=10.0,
+        dry_run=True,
+        state_file=None,
+        force=False,
+    )
+    assert capsys.readouterr().out == (
+        "register: 'foo' (version 1.1)\n"
+        "deprecate: 'foo' (version 1.0)\n"
+        "register: 'bar' (version 0.42)\n"
+        "3 changes (register: 2, deprecate: 1)\n"
+    )
+
+
+@pytest.fixture
+def manifest_file(tmp_path):
+    """Registration manifest, of two workflows files and three domains."""
+    workflows_specs = {
+        "a.json": [
+            {"spec_type": "test", "name": "foo", "version": "1.0"},
+            {"spec_type": "test", "name": "foo", "version": "1.1"},
+        ],
+        "b/b.json": [
+            {"spec_type": "test", "name": "foo", "version": "1.1"},
+            {"spec_type": "test", "name": "bar", "version": "0.42"},
+        ],
+    }
+    for name, workflows in workflows_specs.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        workflows_spec = {"version": "1.0", "workflows": workflows}
+        (tmp_path / name).write_text(json.dumps(workflows_spec))
+    manifest = {
+        "version": "1.0",
+        "registrations": [
+            {"workflows_file": "a.json", "domains": ["spam", "eggs"]},
+            {"workflows_file": "b/b.json", "domains": ["spam"]},
+            {"workflows_file": "a.json", "domains": ["ham"]},
+        ],
+    }
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps(manifest))
+    return manifest_file
+
+
+def test_load_manifest(manifest_file, caplog):
+    """Test registration manifest loading."""
+    # Setup environment
+    load_mock = mock.Mock(wraps=seddy_decisions.load_workflows)
+    load_patch = mock.patch.object(seddy_decisions, "load_workflows", load_mock)
+
+    # Run function
+    with load_patch:
+        res = seddy_registration.load_manifest(manifest_file)
+
+    # Check result
+    assert {d: [(w.name, w.version) for w in ws] for d, ws in res.items()} == {
+        "spam": [("foo", "1.0"), ("foo", "1.1"), ("bar", "0.42")],
+        "eggs": [("foo", "1.0"), ("foo", "1.1")],
+        "ham": [("foo", "1.0"), ("foo", "1.1")],
+    }
+    assert res["eggs"][0] is res["ham"][0]
+    assert load_mock.call_count == 2
+    assert "Duplicate workflow 'foo' (version 1.1) for domain 'spam'" in caplog.text
+
+
+@mock_swf
+def test_run_manifest_app(manifest_file, capsys):
+    """Test manifest workflow registration, in many domains."""
+    # Setup environment
+    client = boto3.client("swf", region_name="us-east-1")
+    client.register_domain(name="spam", workflowExecutionRetentionPeriodInDays="2")
+    client.register_domain(name="eggs", workflowExecutionRetentionPeriodInDays="2")
+    client.register_workflow_type(domain="eggs", name="foo", version="1.0")
+    client_mock = mock.Mock(return_value=client)
+    client_patch = mock.patch.object(boto3, "client", client_mock)
+
+    # Run function
+    with client_patch, pytest.raises(SystemExit) as e:
+        seddy_registration.run_manifest_app(manifest_file, max_rate=None)
+    assert e.value.code == 1
+
+    # Check result
+    client_mock.assert_called_once()
+    res_lines = capsys.readouterr().out.splitlines()
+    assert len(res_lines) == 3
+    assert res_lines[0].startswith("spam: 3 changes (register: 3) in ")
+    assert res_lines[1].startswith("eggs: 1 changes (register: 1) in ")
+    assert res_lines[2].startswith("ham: failed: ")
+    resp = client.list_workflow_types(domain="spam", registrationStatus="REGISTERED")
+    assert len(resp["typeInfos"]) == 3
+
+
+@pytest.mark.parametrize(
+    ("max_rate", "exp_rate_limiters"),
+    [pytest.param(5.0, [mock.call(5.0)], id="5"), pytest.param(0, [], id="0")],
+)
+@mock_swf
+def test_register_manifest_rate(max_rate, exp_rate_limiters):
+    """Test manifest registration rate limit is shared, or unlimited."""
+    # Setup environment
+    client = boto3.client("swf", region_name="us-east-1")
+    for domain in ("spam", "eggs"):
+        client.register_domain(name=domain, workflowExecutionRetentionPeriodInDays="2")
+    client_patch = mock.patch.object(boto3, "client", lambda x, **_: {"swf": client}[x])
+    rate_limiter_cls_mock = mock.Mock(wraps=seddy_registration._util.RateLimiter)
+    rate_limiter_patch = mock.patch.object(
+        seddy_registration._util, "RateLimiter", rate_limiter_cls_mock
+    )
+
+    # Build input
+    workflows = [Workflow("foo", "1.0")]
+    domain_workflows = {"spam": workflows, "eggs": workflows}
+
+    # Run function
+    with client_patch, rate_limiter_patch:
+        res = seddy_registration.register_manifest(domain_workflows, max_rate=max_rate)
+
+    # Check result
+    assert [len(summary.changes) for summary in res] == [1, 1]
+    assert rate_limiter_cls_mock.call_args_list == exp_rate_limiters
+
+
+@mock_swf
+def test_run_manifest_app_plan(manifest_file, capsys):
+    """Test manifest workflow registration plan."""
+    # Setup environment
+    client = boto3.client("swf", region_name="us-east-1")
+    for domain in ("spam", "eggs", "ham"):
+        client.register_domain(name=domain, workflowExecutionRetentionPeriodInDays="2")
+    client.register_workflow_type(domain="eggs", name="foo", version="1.0")
+    client_patch = mock.patch.object(boto3, "client", lambda x, **_: {"swf": client}[x])
+
+    # Run function
+    with client_patch:
+        seddy_registration.run_manifest_app(
+            manifest_file, plan=True, names=["foo"], name_prefix="f"
+        )
+
+    # Check result
+    res_out = capsys.readouterr().out
+    assert res_out.startswith(
+        "spam:\n"
+        "  register: 'foo' (version 1.0)\n"
+        "  register: 'foo' (version 1.1)\n"
+        "  2 changes (register: 2)\n"
+        "\n"
+        "eggs:\n"
+        "  register: 'foo' (version 1.1)\n"
+        "  1 changes (register: 1)\n"
+    )
+    assert "ham: 2 changes (register: 2) in " in res_out
+    resp = client.list_workflow_types(domain="spam", registrationStatus="REGISTERED")
+    assert resp["typeInfos"] == []
+
+
 def test_run_app(tmp_path):
     """Ensure workflow registration app is run correctly."""
     # Setup environment
@@ -238,7 +720,15 @@ def test_run_app(tmp_path):
         seddy_registration.run_app(workflows_spec_json, "spam")
 
     # Check workflow registration configuration
-    register_mock.assert_called_once_with(mock.ANY, "spam")
+    register_mock.assert_called_once_with(
+        mock.ANY,
+        "spam",
+        n_workers=8,
+        max_rate=10.0,
+        dry_run=False,
+        state_file=None,
+        force=False,
+    )
 
     res_workflows = register_mock.call_args_list[0][0][0]
     assert len(res_workflows) == len(workflows)
@@ -5,6 +5,7 @@ from unittest import mock
 import pytest
 
 from seddy import _specs as seddy_decisions
+from seddy._specs import _cache as seddy_specs_cache
 
 
 def test_workflow_map():
@@ -108,3 +109,65 @@ class TestWorkflow:
         task = {"taskToken": ""}
         res = instance.make_decisions(task)
         assert res == [{"decisionType": "spam"}]
+
+    def test_make_decisions_events_stream(self, instance):
+        """Test history events stream is collected for non-streaming builder."""
+        # Setup environment
+        builder_tasks = []
+        builder_class = self.Workflow.DecisionsBuilder
+
+        def build_decisions(builder):
+            builder_tasks.append(builder.task)
+
+        # Build input
+        task = {"taskToken": "", "events": iter([{"eventId": 1}])}
+
+        # Run function
+        with mock.patch.object(builder_class, "build_decisions", build_decisions):
+            instance.make_decisions(task)
+
+        # Check result
+        (builder_task,) = builder_tasks
+        assert builder_task["events"] == [{"eventId": 1}]
+
+
+class TestExecutionStateCache:
+    """Test ``seddy._specs._cache.ExecutionStateCache``."""
+
+    def test_take(self):
+        """Test state is taken out of the cache."""
+        instance = seddy_specs_cache.ExecutionStateCache()
+        state = object()
+        instance.put("spam", state, 42)
+        assert len(instance) == 1
+        assert instance.nbytes == 42
+        assert instance.take("spam") is state
+        assert instance.take("spam") is None
+        assert instance.nbytes == 0
+
+    def test_get(self):
+        """Test state is looked-up, leaving it in the cache."""
+        instance = seddy_specs_cache.ExecutionStateCache()
+        state = object()
+        instance.put("spam", state, 42)
+        assert instance.get("spam") is state
+        assert instance.get("eggs") is None
+        assert len(instance) == 1
+        assert instance.take("spam") is state
+
+    def test_put_evicts(self):
+        """Test least-recently used states are evicted when over bounds."""
+        instance = seddy_specs_cache.ExecutionStateCache(max_size=3, max_nbytes=100)
+        for run_id in ["a", "b", "c"]:
+            instance.put(run_id, run_id, 10)
+        instance.put("a", "a", 10)
+        instance.put("d", "d", 10)
+        assert instance.take("b") is None
+        instance.put("e", "e", 85)
+        assert instance.take("c") is None
+        assert instance.take("a") is None
+        assert instance.nbytes == 95
+        instance.put("f", "f", 101)
+        assert instance.take("f") is None
+        assert instance.take("d") == "d"
+        assert instance.take("e") == "e"
@@ -1,11 +1,13 @@
 """Test ``seddy._specs._dag``."""
 
+import json
 import logging as lg
+from unittest import mock
 
 import pytest
 
 from seddy import _specs as seddy_specs
-from seddy._specs import _dag
+from seddy._specs import _cache, _dag
 
 lg.root.setLevel(lg.DEBUG)
 
@@ -80,98 +82,168 @@ def test_get_item_jsonpath_bad_path(path):
         _dag._get_item_jsonpath(path, obj)
 
 
-@pytest.mark.parametrize(
-    ("spec", "workflow_input", "activity_results", "exp"),
-    [
-        pytest.param(None, None, {}, _dag._sentinel, id="none"),
-        pytest.param(
-            None, {"foo": {"spam": 42}, "bar": False}, {}, _dag._sentinel, id="none"
-        ),
-        pytest.param(_dag.NoInput(), None, {}, _dag._sentinel, id="none"),
-        pytest.param(
-            _dag.Constant(None), None, {}, None, id="constant"
-        ),
-        pytest.param(
-            _dag.Constant({"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]}),
-            None,
-            {},
-            {"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]},
-            id="constant",
-        ),
-        pytest.param(
-            _dag.Constant({"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]}),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {},
-            {"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]},
-            id="constant",
-        ),
-        pytest.param(
-            _dag.WorkflowInput(),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {},
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            id="workflow-input",
-        ),
-        pytest.param(
-            _dag.WorkflowInput("$.foo"),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {},
-            {"spam": 42, "eggs": None, "ham": [1, 2]},
-            id="workflow-input",
-        ),
-        pytest.param(
-            _dag.WorkflowInput("$.foo.ham[1]"),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {},
-            2,
-            id="workflow-input",
-        ),
-        pytest.param(
-            _dag.DependencyResult("foo"),
-            None,
-            {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
-            [{"spam": "eggs", "ham": 42}, False],
-            id="dependency-result",
-        ),
-        pytest.param(
-            _dag.DependencyResult("foo"),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
-            [{"spam": "eggs", "ham": 42}, False],
-            id="dependency-result",
-        ),
-        pytest.param(
-            _dag.DependencyResult("foo", "$[0].spam"),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
-            "eggs",
-            id="dependency-result",
-        ),
-        pytest.param(
-            _dag.Object(
-                {
-                    "pie": _dag.DependencyResult("foo", "$[0].spam"),
-                    "cheese": _dag.Object(
-                        {
-                            "a": _dag.Constant(["b"]),
-                            "c": _dag.NoInput(),
-                            "d": _dag.DependencyResult("bar"),
-                        },
-                    ),
-                    "gravy": _dag.WorkflowInput("$.bar"),
-                },
-            ),
-            {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
-            {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
-            {"pie": "eggs", "cheese": {"a": ["b"], "d": None}, "gravy": False},
-            id="object",
+@pytest.mark.parametrize("input_type", ["workflow-input", "dependency-result"])
+def test_task_input_bad_path(input_type):
+    """Test invalid input paths are rejected on specification load."""
+    spec = {"type": input_type, "id": "foo", "path": "$.spam[0.eggs"}
+    with pytest.raises(ValueError):
+        _dag.TaskInput.from_spec(spec)
+
+
+def test_task_input_compiled_path():
+    """Test input paths are compiled on construction."""
+    res = _dag.DependencyResult("foo", "$.spam[0].eggs")
+    assert res.path_indices == ("spam", 0, "eggs")
+    assert res == _dag.DependencyResult("foo", "$.spam[0].eggs")
+
+
+_activity_input_params = [
+    pytest.param(None, None, {}, _dag._sentinel, id="none"),
+    pytest.param(
+        None, {"foo": {"spam": 42}, "bar": False}, {}, _dag._sentinel, id="none"
+    ),
+    pytest.param(_dag.NoInput(), None, {}, _dag._sentinel, id="none"),
+    pytest.param(_dag.Constant(None), None, {}, None, id="constant"),
+    pytest.param(
+        _dag.Constant({"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]}),
+        None,
+        {},
+        {"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]},
+        id="constant",
+    ),
+    pytest.param(
+        _dag.Constant({"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]}),
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {},
+        {"spam": [{"eggs": {"swallow": [None, None, 42]}}, False]},
+        id="constant",
+    ),
+    pytest.param(
+        _dag.WorkflowInput(),
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {},
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        id="workflow-input",
+    ),
+    pytest.param(
+        _dag.WorkflowInput("$.foo"),
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {},
+        {"spam": 42, "eggs": None, "ham": [1, 2]},
+        id="workflow-input",
+    ),
+    pytest.param(
+        _dag.WorkflowInput("$.foo.ham[1]"),
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {},
+        2,
+        id="workflow-input",
+    ),
+    pytest.param(
+        _dag.DependencyResult("foo"),
+        None,
+        {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
+        [{"spam": "eggs", "ham": 42}, False],
+        id="dependency-result",
+    ),
+    pytest.param(
+        _dag.DependencyResult("foo"),
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
+        [{"spam": "eggs", "ham": 42}, False],
+        id="dependency-result",
+    ),
+    pytest.param(
+        _dag.DependencyResult("foo", "$[0].spam"),
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
+        "eggs",
+        id="dependency-result",
+    ),
+    pytest.param(
+        _dag.Object(
+            {
+                "pie": _dag.DependencyResult("foo", "$[0].spam"),
+                "cheese": _dag.Object(
+                    {
+                        "a": _dag.Constant(["b"]),
+                        "c": _dag.NoInput(),
+                        "d": _dag.DependencyResult("bar"),
+                    },
+                ),
+                "gravy": _dag.WorkflowInput("$.bar"),
+            },
         ),
-    ],
+        {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False},
+        {"foo": [{"spam": "eggs", "ham": 42}, False], "bar": None},
+        {"pie": "eggs", "cheese": {"a": ["b"], "d": None}, "gravy": False},
+        id="object",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    ("spec", "workflow_input", "activity_results", "exp"), _activity_input_params
 )
 def test_build_activity_input(spec, workflow_input, activity_results, exp):
     assert _dag._build_activity_input(spec, workflow_input, activity_results) == exp
 
 
+@pytest.mark.parametrize(
+    ("spec", "workflow_input", "activity_results", "exp"), _activity_input_params
+)
+def test_compile_input(spec, workflow_input, activity_results, exp):
+    """Test compiled input builder matches JSON-encoded built input."""
+    res = _dag._compile_input(spec)
+    if exp is _dag._sentinel:
+        assert res is None
+    else:
+        assert res(workflow_input, activity_results) == json.dumps(exp)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "spam",
+        'é"\n\u2603',
+        None,
+        True,
+        False,
+        0,
+        -(2**70),
+        1.5,
+        [1, "a"],
+        {"b": None},
+    ],
+)
+def test_encode_json(value):
+    """Test fast JSON-encoding matches JSON-encoding."""
+    assert _dag._encode_json(value) == json.dumps(value)
+
+
+def test_compile_input_keys():
+    """Test compiled input builder encodes object keys as JSON does."""
+    items = {'ké"y': _dag.Constant(1), 2: _dag.WorkflowInput(), None: _dag.Constant(3)}
+    spec = _dag.Object(items)
+    res = _dag._compile_input(spec)
+    assert res(1.5, {}) == json.dumps({'ké"y': 1, 2: 1.5, None: 3})
+
+
+def test_task_input_nested_object():
+    """Test nested object input specification loading."""
+    spec = {
+        "type": "object",
+        "items": {
+            "spam": {"type": "constant", "value": 42},
+            "eggs": {"type": "object", "items": {"ham": {"type": "none"}}},
+        },
+    }
+    res = _dag.TaskInput.from_spec(spec)
+    assert res == _dag.Object(
+        {"spam": _dag.Constant(42), "eggs": _dag.Object({"ham": _dag.NoInput()})}
+    )
+
+
 def test_build_activity_input_unknown_type():
     input_spec = _dag.TaskInput()
     workflow_input = {"foo": {"spam": 42, "eggs": None, "ham": [1, 2]}, "bar": False}
@@ -180,54 +252,84 @@ def test_build_activity_input_unknown_type():
         _dag._build_activity_input(input_spec, workflow_input, activity_results)
 
 
+def test_json_values():
+    """Test JSON-encoded values are decoded once, on first access."""
+    # Setup environment
+    loads_mock = mock.Mock(wraps=_dag._json.loads)
+    loads_patch = mock.patch.object(_dag._json, "loads", loads_mock)
+
+    # Build input
+    instance = _dag._JSONValues()
+    instance.set("foo", '{"spam": [42]}')
+    instance.set("bar", "{")
+    instance.set("yay", "17")
+
+    # Run function
+    with loads_patch:
+        assert instance["foo"] == {"spam": [42]}
+        assert instance["foo"] is instance["foo"]
+        instance.set("yay", "18")
+        assert instance["yay"] == 18
+        instance.discard("bar")
+        with pytest.raises(KeyError):
+            instance["bar"]
+
+    # Check result
+    assert dict(instance) == {"foo": {"spam": [42]}, "yay": 18}
+    assert loads_mock.call_args_list == [mock.call('{"spam": [42]}'), mock.call("18")]
+
+
 class TestDAGDecisionsBuilding:
     """Test ``seddy._specs.DAGBuilder``."""
 
     @pytest.fixture
-    def workflow(self):
+    def spec(self):
         """Example DAG workflow specification."""
-        workflow = seddy_specs.DAGWorkflow.from_spec(
-            {
-                "name": "foo",
-                "version": "0.42",
-                "tasks": [
-                    {
-                        "id": "foo",
-                        "type": {"name": "spam-foo", "version": "0.3"},
-                        "input": {"type": "workflow-input", "path": "$.foo"},
-                        "heartbeat": 60,
-                        "timeout": 86400,
-                        "task_list": "eggs",
-                        "priority": 1,
-                    },
-                    {
-                        "id": "bar",
-                        "type": {"name": "spam-bar", "version": "0.1"},
-                        "input": {"type": "workflow-input", "path": "$.bar"},
-                        "heartbeat": 60,
-                        "timeout": 86400,
-                        "dependencies": ["foo"],
-                    },
-                    {
-                        "id": "yay",
-                        "type": {"name": "spam-foo", "version": "0.3"},
-                        "input": {"type": "workflow-input", "path": "$.yay"},
-                        "heartbeat": 60,
-                        "timeout": 86400,
-                        "dependencies": ["foo"],
-                    },
-                    {
-                        "id": "tin",
-                        "type": {"name": "spam-tin", "version": "1.2"},
-                        "input": {"type": "none"},
-                        "heartbeat": 30,
-                        "timeout": 43200,
-                        "dependencies": ["yay"],
-                    },
-                ],
-                "type": "dag",
-            }
-        )
+        return {
+            "name": "foo",
+            "version": "0.42",
+            "tasks": [
+                {
+                    "id": "foo",
+                    "type": {"name": "spam-foo", "version": "0.3"},
+                    "input": {"type": "workflow-input", "path": "$.foo"},
+                    "heartbeat": 60,
+                    "timeout": 86400,
+                    "task_list": "eggs",
+                    "priority": 1,
+                },
+                {
+                    "id": "bar",
+                    "type": {"name": "spam-bar", "version": "0.1"},
+                    "input": {"type": "workflow-input", "path": "$.bar"},
+                    "heartbeat": 60,
+                    "timeout": 86400,
+                    "dependencies": ["foo"],
+                },
+                {
+                    "id": "yay",
+                    "type": {"name": "spam-foo", "version": "0.3"},
+                    "input": {"type": "workflow-input", "path": "$.yay"},
+                    "heartbeat": 60,
+                    "timeout": 86400,
+                    "dependencies": ["foo"],
+                },
+                {
+                    "id": "tin",
+                    "type": {"name": "spam-tin", "version": "1.2"},
+                    "input": {"type": "none"},
+                    "heartbeat": 30,
+                    "timeout": 43200,
+                    "dependencies": ["yay"],
+                },
+            ],
+            "type": "dag",
+        }
+
+    @pytest.fixture
+    def workflow(self, spec):
+        """Example set-up DAG workflow."""
+        workflow = seddy_specs.DAGWorkflow.from_spec(spec)
         workflow.setup()
         return workflow
 
@@ -385,11 +487,17 @@ class TestDAGDecisionsBuilding:
         instance.build_decisions()
         assert instance.decisions in (expected_decisions, expected_decisions[::-1])
 
+        # Streamed history events
+        task_stream = {**task, "events": iter(task["events"])}
+        instance = seddy_specs.DAGBuilder(workflow, task_stream)
+        instance.build_decisions()
+        assert instance.decisions in (expected_decisions, expected_decisions[::-1])
+
     def test_foo_complete_yay_unsatisfied(self, workflow):
         """Test DAG decisions building after foo completes yet yay not ready."""
-        workflow.dependants["bar"] = ["yay"]
         assert workflow.task_specs[2].id == "yay"
         workflow.task_specs[2].dependencies = ["foo", "bar"]
+        workflow.setup()
         task = {
             "taskToken": "spam",
             "previousStartedEventId": 3,
@@ -1498,6 +1606,243 @@ class TestDAGDecisionsBuilding:
         instance.build_decisions()
         assert instance.decisions == [{"decisionType": "CompleteWorkflowExecution"}]
 
+    @pytest.fixture
+    def foo_complete_events(self):
+        """Execution history up to a decision task on 'foo' completion."""
+        return [
+            {
+                "eventId": 1,
+                "eventType": "WorkflowExecutionStarted",
+                "workflowExecutionStartedEventAttributes": {
+                    "input": (
+                        '{"foo": null, "bar": null, "yay": {"spam": [17], "eggs": [42]}}'
+                    )
+                },
+            },
+            {"eventId": 2, "eventType": "DecisionTaskScheduled"},
+            {"eventId": 3, "eventType": "DecisionTaskStarted"},
+            {"eventId": 4, "eventType": "DecisionTaskCompleted"},
+            {
+                "eventId": 5,
+                "eventType": "ActivityTaskScheduled",
+                "activityTaskScheduledEventAttributes": {
+                    "activityId": "foo",
+                    "activityType": {"name": "spam-foo", "version": "0.3"},
+                    "decisionTaskCompletedEventId": 4,
+                },
+            },
+            {
+                "eventId": 6,
+                "eventType": "ActivityTaskCompleted",
+                "activityTaskCompletedEventAttributes": {"scheduledEventId": 5},
+            },
+            {"eventId": 7, "eventType": "DecisionTaskScheduled"},
+            {"eventId": 8, "eventType": "DecisionTaskStarted"},
+        ]
+
+    def test_cached_state(self, workflow, foo_complete_events):
+        """Test DAG decisions building with cached execution state."""
+        # Setup environment
+        cache = _cache.ExecutionStateCache()
+        cache_patch = mock.patch.object(seddy_specs.DAGBuilder, "state_cache", cache)
+
+        # Build input
+        execution = {"workflowId": "1234", "runId": "9abc"}
+        events = foo_complete_events
+        start_task = {
+            "taskToken": "spam",
+            "workflowExecution": execution,
+            "previousStartedEventId": 0,
+            "startedEventId": 3,
+            "events": iter(events[:3]),
+        }
+        foo_complete_task = {
+            "taskToken": "eggs",
+            "workflowExecution": execution,
+            "previousStartedEventId": 3,
+            "startedEventId": 8,
+            "events": iter(events[3:]),
+        }
+        foo_complete_retry_task = {
+            "taskToken": "ham",
+            "workflowExecution": execution,
+            "previousStartedEventId": 3,
+            "startedEventId": 8,
+            "events": iter(events),
+        }
+
+        # Run function
+        with cache_patch:
+            instance = seddy_specs.DAGBuilder(workflow, start_task)
+            instance.build_decisions()
+            assert len(cache) == 1
+
+            res = []
+            for task in [foo_complete_task, foo_complete_retry_task]:
+                instance = seddy_specs.DAGBuilder(workflow, task)
+                instance.build_decisions()
+                res.append(instance.decisions)
+
+        # Check result
+        assert len(cache) == 1
+        assert res[0] == res[1]
+        (yay_decision,) = [
+            d
+            for d in res[0]
+            if d["scheduleActivityTaskDecisionAttributes"]["activityId"] == "yay"
+        ]
+        yay_decision_attrs = yay_decision["scheduleActivityTaskDecisionAttributes"]
+        assert yay_decision_attrs["input"] == '{"spam": [17], "eggs": [42]}'
+
+    @pytest.mark.parametrize("changed", [False, True])
+    def test_cached_state_reloaded(self, spec, workflow, foo_complete_events, changed):
+        """Test cached execution state is kept across unchanged reloads."""
+        # Setup environment
+        cache = _cache.ExecutionStateCache()
+        cache_patch = mock.patch.object(seddy_specs.DAGBuilder, "state_cache", cache)
+        if changed:
+            spec["tasks"][-1]["dependencies"] = ["bar"]
+        reloaded = seddy_specs.DAGWorkflow.from_spec(spec)
+        reloaded.setup()
+
+        # Build input
+        execution = {"workflowId": "1234", "runId": "9abc"}
+        start_task = {
+            "taskToken": "spam",
+            "workflowExecution": execution,
+            "previousStartedEventId": 0,
+            "startedEventId": 3,
+            "events": foo_complete_events[:3],
+        }
+        foo_complete_task = {
+            "taskToken": "eggs",
+            "workflowExecution": execution,
+            "previousStartedEventId": 3,
+            "startedEventId": 8,
+            "events": foo_complete_events[3:],
+        }
+
+        # Run function
+        with cache_patch:
+            seddy_specs.DAGBuilder(workflow, start_task).build_decisions()
+            instance = seddy_specs.DAGBuilder(reloaded, foo_complete_task)
+            if changed:
+                with pytest.raises(seddy_specs.PartialHistoryError):
+                    instance.build_decisions()
+            else:
+                instance.build_decisions()
+
+        # Check result
+        if changed:
+            assert not cache
+        else:
+            exp_ids = ["bar", "yay"]
+            attrs_key = "scheduleActivityTaskDecisionAttributes"
+            assert [d[attrs_key]["activityId"] for d in instance.decisions] == exp_ids
+            assert cache.get("9abc").workflow is reloaded
+
+    def test_cached_state_closed(self):
+        """Test execution state isn't cached after closing the execution."""
+        # Setup environment
+        cache = _cache.ExecutionStateCache()
+        cache_patch = mock.patch.object(seddy_specs.DAGBuilder, "state_cache", cache)
+
+        # Build input
+        workflow = seddy_specs.DAGWorkflow.from_spec(
+            {"name": "foo", "version": "0.44", "tasks": [], "type": "dag"}
+        )
+        workflow.setup()
+        task = {
+            "taskToken": "spam",
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+            "previousStartedEventId": 0,
+            "startedEventId": 3,
+            "events": [
+                {"eventId": 1, "eventType": "WorkflowExecutionStarted"},
+                {"eventId": 2, "eventType": "DecisionTaskScheduled"},
+                {"eventId": 3, "eventType": "DecisionTaskStarted"},
+            ],
+        }
+        instance = seddy_specs.DAGBuilder(workflow, task)
+
+        # Run function
+        with cache_patch:
+            instance.build_decisions()
+
+        # Check result
+        assert instance.decisions == [{"decisionType": "CompleteWorkflowExecution"}]
+        assert not cache
+
+    def test_partial_history_uncached(self, workflow, foo_complete_events):
+        """Test partial history with no cached execution state is rejected."""
+        # Build input
+        task = {
+            "taskToken": "eggs",
+            "workflowExecution": {"workflowId": "1234", "runId": "9abc"},
+            "previousStartedEventId": 3,
+            "startedEventId": 8,
+            "events": foo_complete_events[3:],
+        }
+        instance = seddy_specs.DAGBuilder(workflow, task)
+
+        # Run function
+        cache_patch = mock.patch.object(
+            seddy_specs.DAGBuilder, "state_cache", _cache.ExecutionStateCache()
+        )
+        with cache_patch, pytest.raises(seddy_specs.PartialHistoryError) as e:
+            instance.build_decisions()
+        assert "'9abc'" in str(e.value)
+
+
+class TestScheduleTemplate:
+    """Test ``seddy._specs._dag._ScheduleTemplate``."""
+
+    @pytest.fixture
+    def task(self):
+        """Example activity task specification."""
+        return _dag.Task(
+            "foo",
+            "spam",
+            "1.0",
+            heartbeat=60,
+            input=_dag.WorkflowInput("$.spam"),
+        )
+
+    def test_compile(self, task):
+        """Test compilation of static decision attributes."""
+        res = _dag._ScheduleTemplate.compile(task)
+        assert res.attributes == {
+            "activityId": "foo",
+            "activityType": {"name": "spam", "version": "1.0"},
+            "heartbeatTimeout": "60",
+        }
+        with pytest.raises(TypeError):
+            res.attributes["activityId"] = "bar"
+
+    def test_build(self, task):
+        """Test decision attributes building."""
+        template = _dag._ScheduleTemplate.compile(task)
+        get_workflow_input = mock.Mock(return_value={"spam": [42]})
+        res = template.build(get_workflow_input, {})
+        assert res == {
+            "activityId": "foo",
+            "activityType": {"name": "spam", "version": "1.0"},
+            "heartbeatTimeout": "60",
+            "input": "[42]",
+        }
+        assert "input" not in template.attributes
+        get_workflow_input.assert_called_once_with()
+
+    def test_build_no_input(self, task):
+        """Test decision attributes building for task without input."""
+        task.input = _dag.NoInput()
+        template = _dag._ScheduleTemplate.compile(task)
+        get_workflow_input = mock.Mock()
+        res = template.build(get_workflow_input, {})
+        assert res == template.attributes
+        assert res is not template.attributes
+        get_workflow_input.assert_not_called()
+
 
 class TestWorkflow:
     """Test ``seddy._specs.DAGWorkflow``."""
@@ -1579,3 +1924,55 @@ class TestWorkflow:
             "bar": [],
             "yay": [],
         }
+        assert instance.topology.task_ids == ("foo", "bar", "yay")
+        assert instance.topology.indices == {"foo": 0, "bar": 1, "yay": 2}
+        assert instance.topology.dependencies == ((), (0,), (0,))
+        assert instance.topology.get_dependants(0) == (1, 2)
+        assert instance.topology.get_dependants(2) == ()
+        assert instance.topology.roots == (0,)
+        assert instance.topology.order == (0, 1, 2)
+        assert instance.schedule_templates["foo"].attributes == {
+            "activityId": "foo",
+            "activityType": {"name": "spam-foo", "version": "0.3"},
+            "heartbeatTimeout": "60",
+            "startToCloseTimeout": "86400",
+            "taskList": {"name": "eggs"},
+            "taskPriority": "1",
+        }
+        assert instance.schedule_templates["bar"].attributes == {
+            "activityId": "bar",
+            "activityType": {"name": "spam-bar", "version": "0.1"},
+            "heartbeatTimeout": "60",
+            "startToCloseTimeout": "86400",
+        }
+        assert instance.schedule_templates["bar"].build_input is None
+
+    @pytest.mark.parametrize(
+        ("dependencies", "exp_message"),
+        [
+            pytest.param(
+                {"foo": ["yay"], "bar": ["foo"], "yay": ["bar"]},
+                "cycle between tasks: foo, bar, yay",
+                id="cycle",
+            ),
+            pytest.param(
+                {"bar": ["foo"], "yay": ["spam"]},
+                "Unknown dependency of task 'yay': spam",
+                id="unknown",
+            ),
+        ],
+    )
+    def test_setup_invalid(self, instance, dependencies, exp_message):
+        """Test DAG-type workflow specification pre-computation on bad DAG."""
+        for task in instance.task_specs:
+            task.dependencies = dependencies.get(task.id)
+        with pytest.raises(ValueError) as e:
+            instance.setup()
+        assert exp_message in str(e.value)
+
+    def test_setup_duplicate(self, instance):
+        """Test DAG-type workflow specification pre-computation on bad DAG."""
+        instance.task_specs[2].id = "bar"
+        with pytest.raises(ValueError) as e:
+            instance.setup()
+        assert str(e.value) == "Duplicate task ID: bar"
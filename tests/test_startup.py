@@ -0,0 +1,64 @@
+"""Test ``seddy`` start-up imports."""
+
+import os
+import sys
+import typing as t
+import subprocess
+
+import pytest
+
+CLI_EXCLUDED_MODULES = ["boto3", "botocore", "orjson", "yaml", "seddy._specs"]
+METADATA_MODULES = ["importlib.metadata", "importlib_metadata"]
+FIRST_CLIENT_SCRIPT = """
+import sys
+from seddy import decider, _util
+assert "boto3" not in sys.modules
+_util.preload_swf_client()
+from botocore import loaders
+load_file = loaders.JSONFileLoader.load_file
+loaders.JSONFileLoader.load_file = lambda *args: print(args[1]) or load_file(*args)
+_util.get_swf_client(socket_read_timeout=70.0, max_pool_connections=10)
+"""
+
+
+def _run_importtime(args: t.List[str], env: t.Dict[str, str] = None):
+    """Run Python with import-time profiling.
+
+    Returns:
+        tuple[str, set[str]]: output, and names of imported modules
+    """
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env={**os.environ, **(env or {})},
+        check=True,
+    )
+    modules = set()
+    for line in proc.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules.add(name.strip())
+    return proc.stdout, modules
+
+
+@pytest.mark.parametrize("args", [["-h"], ["--version"]])
+def test_cli(args):
+    """Ensure command-line help and version don't import heavy modules."""
+    out, modules = _run_importtime(["-m", "seddy", *args])
+    assert out
+    assert not set(CLI_EXCLUDED_MODULES) & modules
+    assert bool(set(METADATA_MODULES) & modules) is (args == ["--version"])
+
+
+def test_first_client():
+    """Ensure SWF client creation after pre-loading loads no data files."""
+    env = {
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "spam",
+        "AWS_SECRET_ACCESS_KEY": "eggs",
+    }
+    out, _ = _run_importtime(["-c", FIRST_CLIENT_SCRIPT], env)
+    assert not out
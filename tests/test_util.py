@@ -2,6 +2,10 @@
 
 import sys
 import json
+import asyncio
+import logging as lg
+import threading
+import concurrent.futures as cf
 from unittest import mock
 
 import yaml
@@ -32,6 +36,129 @@ def test_list_paginated():
     }
 
 
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_iter_paginated(prefetch):
+    """Test pages are requested one at a time, optionally one page ahead."""
+    # Build input
+    calls = []
+
+    def fn(foo, nextPageToken=None):
+        calls.append(nextPageToken)
+        tokens = {None: "spam", "spam": "eggs"}
+        resp = {"foo": foo, "spam": [nextPageToken]}
+        if nextPageToken in tokens:
+            resp["nextPageToken"] = tokens[nextPageToken]
+        return resp
+
+    # Run function
+    with cf.ThreadPoolExecutor(max_workers=1) as executor:
+        res = seddy_util.iter_paginated(
+            fn, {"foo": 42}, prefetch=executor if prefetch else None
+        )
+        assert next(res) == {"foo": 42, "spam": [None]}
+        executor.submit(lambda: None).result()  # wait on prefetch
+        assert calls == ([None, "spam"] if prefetch else [None])
+        assert list(res) == [
+            {"foo": 42, "spam": ["spam"]},
+            {"foo": 42, "spam": ["eggs"]},
+        ]
+
+    # Check calls
+    assert calls == [None, "spam", "eggs"]
+
+
+def test_stream_paginated():
+    """Test later pages are requested as the list is iterated over."""
+
+    # Build input
+    def fn(foo, nextPageToken=None):
+        if nextPageToken == "eggs":
+            raise ValueError("eggs")
+        tokens = {None: "spam", "spam": "eggs"}
+        return {"foo": foo, "spam": [1, 2], "nextPageToken": tokens[nextPageToken]}
+
+    fn_mock = mock.Mock(wraps=fn)
+
+    # Run function
+    res = seddy_util.stream_paginated(fn_mock, "spam", {"foo": 42})
+
+    # Check result
+    assert res["foo"] == 42
+    assert "nextPageToken" not in res
+    fn_mock.assert_called_once_with(foo=42)
+    assert [next(res["spam"]) for _ in range(4)] == [1, 2, 1, 2]
+    with pytest.raises(seddy_util.PaginationError) as e:
+        next(res["spam"])
+    assert isinstance(e.value.__cause__, ValueError)
+
+
+def test_rate_limiter():
+    """Test token-bucket rate limiting."""
+    # Setup environment
+    now = [100.0]
+    sleep_mock = mock.Mock(side_effect=lambda d: now.__setitem__(0, now[0] + d))
+    monotonic_patch = mock.patch.object(seddy_util.time, "monotonic", lambda: now[0])
+    sleep_patch = mock.patch.object(seddy_util.time, "sleep", sleep_mock)
+
+    # Run function
+    with monotonic_patch, sleep_patch:
+        rate_limiter = seddy_util.RateLimiter(4.0, burst=2)
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+        assert sleep_mock.call_count == 0
+        rate_limiter.acquire()
+        now[0] += 1.0  # refilled to burst
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+
+    # Check result
+    assert sleep_mock.call_args_list == [mock.call(0.25), mock.call(0.25)]
+
+
+def test_rate_limiter_invalid():
+    """Test non-positive rate is rejected."""
+    with pytest.raises(ValueError):
+        seddy_util.RateLimiter(0.0)
+
+
+def test_preload_swf_client():
+    """Test SWF client pre-loading."""
+    boto3 = pytest.importorskip("boto3")
+    botocore = pytest.importorskip("botocore")
+    client_mock = mock.Mock(wraps=boto3.client)
+    with mock.patch.object(boto3, "client", client_mock):
+        seddy_util.preload_swf_client()
+    client_mock.assert_called_once_with(
+        "swf",
+        region_name="us-east-1",
+        endpoint_url=seddy_util.AWS_SWF_ENDPOINT_URL,
+        config=mock.ANY,
+    )
+    (config,) = [c[1]["config"] for c in client_mock.call_args_list]
+    assert config.signature_version is botocore.UNSIGNED
+
+
+def test_list_paginated_async():
+    # Build input
+    async def fn(foo, bar=42, nextPageToken=None):
+        spams = {None: [0], "spam": [1, 2, 3], "eggs": [4, 7, 9], "ham": [10, 42, 99]}
+        tokens = {None: "spam", "spam": "eggs", "eggs": "ham"}
+        resp = {"foo": foo * bar, "spam": spams[nextPageToken]}
+        if nextPageToken in tokens:
+            resp["nextPageToken"] = tokens[nextPageToken]
+        return resp
+
+    kwargs = {"foo": "ab", "bar": 7}
+
+    # Run function
+    res = asyncio.run(seddy_util.list_paginated_async(fn, "spam", kwargs))
+    assert res == {
+        "foo": "ababababababab",
+        "spam": [0, 1, 2, 3, 4, 7, 9, 10, 42, 99],
+    }
+
+
 @pytest.fixture
 def workflows_spec():
     """Example workflows specifications."""
@@ -77,6 +204,126 @@ def test_load_workflows_yaml(tmp_path, workflows_spec):
     assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
 
 
+@pytest.mark.parametrize("c_loader", [True, False])
+def test_load_workflows_yaml_loader(tmp_path, workflows_spec, c_loader):
+    """Test workflows specs loading from YAML with and without libyaml."""
+    # Setup environment
+    loader_patch = mock.patch.object(
+        yaml, "CSafeLoader", getattr(yaml, "CSafeLoader", None) if c_loader else None
+    )
+
+    # Build input
+    workflows_file = tmp_path / "workflows.yml"
+    workflows_file.write_text(yaml.safe_dump(workflows_spec))
+
+    # Run function
+    with loader_patch:
+        assert seddy_specs_io.load_file(workflows_file) == workflows_spec
+
+
+def test_load_workflows_yaml_cached(tmp_path, workflows_spec, specs_cache_dir):
+    """Test parsed YAML workflows specs are cached."""
+    # Setup environment
+    parse_mock = mock.Mock(wraps=seddy_specs_io._parse)
+    parse_patch = mock.patch.object(seddy_specs_io, "_parse", parse_mock)
+    version_patch = mock.patch.object(
+        seddy_specs_io._util, "get_version", lambda: "0.0.1"
+    )
+
+    # Build input
+    workflows_file = tmp_path / "workflows.yml"
+    workflows_file.write_text(yaml.safe_dump(workflows_spec))
+
+    # Run function
+    with parse_patch:
+        assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
+        assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
+        assert parse_mock.call_count == 1
+        (cache_path,) = specs_cache_dir.iterdir()
+
+        workflows_spec["workflows"][0]["version"] = "1.1"
+        workflows_file.write_text(yaml.safe_dump(workflows_spec))
+        assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
+        assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
+        assert parse_mock.call_count == 2
+
+        with version_patch:
+            assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
+        assert parse_mock.call_count == 3
+
+        cache_path.write_bytes(cache_path.read_bytes()[:-10])
+        assert seddy_specs_io._load_specs(workflows_file) == workflows_spec
+        assert parse_mock.call_count == 4
+
+    assert list(specs_cache_dir.iterdir()) == [cache_path]
+
+
+@pytest.mark.parametrize(
+    ("cache_dir", "content"),
+    [
+        pytest.param("", "version: '1.0'\nworkflows: []\n", id="disabled"),
+        pytest.param(
+            None,
+            "version: '1.0'\ncreated: 2020-01-01\nworkflows: []\n",
+            id="timestamp",
+        ),
+    ],
+)
+def test_load_workflows_yaml_uncached(tmp_path, specs_cache_dir, cache_dir, content):
+    """Test disabled or unserialisable YAML workflows specs caching."""
+    # Setup environment
+    environ = {} if cache_dir is None else {"SEDDY_CACHE_DIR": cache_dir}
+    environ_patch = mock.patch.dict(seddy_specs_io.os.environ, environ)
+
+    # Build input
+    workflows_file = tmp_path / "workflows.yaml"
+    workflows_file.write_text(content)
+
+    # Run function
+    with environ_patch:
+        res = seddy_specs_io._load_specs(workflows_file)
+
+    # Check result
+    assert res == yaml.safe_load(content)
+    assert not list(specs_cache_dir.iterdir())
+
+
+def test_write_cache_failed(tmp_path, caplog):
+    """Test workflows specs cache write failure is warned about once."""
+    # Setup environment
+    failed_patch = mock.patch.object(seddy_specs_io, "_cache_write_failed", False)
+    caplog.set_level(lg.DEBUG, logger=seddy_specs_io.logger.name)
+
+    # Build input
+    (tmp_path / "cache").write_text("")
+    cache_path = tmp_path / "cache" / "workflows.bin"
+
+    # Run function
+    with failed_patch:
+        seddy_specs_io._write_cache(cache_path, b"spam\n", {"workflows": []})
+        seddy_specs_io._write_cache(cache_path, b"spam\n", {"workflows": []})
+
+    # Check result
+    levels = [r.levelno for r in caplog.records if "cache" in r.getMessage()]
+    assert levels == [lg.WARNING, lg.DEBUG]
+    assert list(tmp_path.iterdir()) == [tmp_path / "cache"]
+
+
+def test_get_cache_path_default(tmp_path):
+    """Test workflows specs cache defaults to the XDG cache directory."""
+    # Setup environment
+    environ = {"XDG_CACHE_HOME": str(tmp_path)}
+    environ_patch = mock.patch.dict(seddy_specs_io.os.environ, environ)
+
+    # Run function
+    with environ_patch:
+        del seddy_specs_io.os.environ["SEDDY_CACHE_DIR"]
+        res = seddy_specs_io._get_cache_path(tmp_path / "workflows.yml")
+
+    # Check result
+    assert res.parent == tmp_path / "seddy" / "specs"
+
+
 def test_load_workflows_yaml_raises(tmp_path, workflows_spec):
     """Test workflows specs loading from YAML raises when unavailable."""
     # Setup environment
@@ -109,8 +356,15 @@ def test_get_workflow(tmp_path, workflows_spec):
     workflows_file.write_text(json.dumps(workflows_spec))
 
     # Build expectation
-    _task = seddy_specs_dag.Task(id="foo", name="spam-foo", version="0.3", heartbeat=60,
-                                 timeout=86400, task_list="eggs", priority=1)
+    _task = seddy_specs_dag.Task(
+        id="foo",
+        name="spam-foo",
+        version="0.3",
+        heartbeat=60,
+        timeout=86400,
+        task_list="eggs",
+        priority=1,
+    )
     exp = seddy_specs.DAGWorkflow(name="spam", version="1.0", task_specs=[_task])
 
     # Run function
@@ -118,12 +372,12 @@ def test_get_workflow(tmp_path, workflows_spec):
 
     # Check result
     assert (
-        isinstance(res, exp.__class__) and
-        res.name == exp.name and
-        res.version == exp.version and
-        res.description == exp.description and
-        res.registration == exp.registration and
-        res.task_specs == exp.task_specs
+        isinstance(res, exp.__class__)
+        and res.name == exp.name
+        and res.version == exp.version
+        and res.description == exp.description
+        and res.registration == exp.registration
+        and res.task_specs == exp.task_specs
     )
 
 
@@ -141,3 +395,291 @@ def test_get_workflow_missing(tmp_path, workflows_spec, name, version):
     # Check result
     assert name in str(e.value)
     assert version in str(e.value)
+
+
+@pytest.fixture
+def workflows_dir(tmp_path, workflows_spec):
+    """Directory of workflows specifications files."""
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    (workflows_dir / "a.json").write_text(json.dumps(workflows_spec))
+    workflows_spec["workflows"][0]["version"] = "1.1"
+    (workflows_dir / "b.yaml").write_text(yaml.safe_dump(workflows_spec))
+    (workflows_dir / "README.md").write_text("# Workflows")
+    return workflows_dir
+
+
+@pytest.mark.parametrize(
+    ("pattern", "exp_versions"),
+    [
+        pytest.param("", ["1.0", "1.1"], id="directory"),
+        pytest.param("*.json", ["1.0"], id="glob"),
+        pytest.param("[ab].*", ["1.0", "1.1"], id="glob-all"),
+    ],
+)
+def test_load_workflows_many_files(workflows_dir, pattern, exp_versions):
+    """Test workflows specs loading from a directory or glob pattern."""
+    workflows = seddy_specs_io.load_workflows(workflows_dir / pattern)
+    assert [w.version for w in workflows] == exp_versions
+
+
+def test_load_workflows_glob_missing(tmp_path):
+    """Test workflows specs loading raises for unmatched glob pattern."""
+    with pytest.raises(FileNotFoundError):
+        seddy_specs_io.load_workflows(tmp_path / "*.json")
+
+
+def test_get_workflow_many_files(workflows_dir):
+    """Test getting a workflow only constructs that workflow."""
+    # Setup environment
+    construct_mock = mock.Mock(wraps=seddy_specs_io._construct_workflow)
+    construct_patch = mock.patch.object(
+        seddy_specs_io, "_construct_workflow", construct_mock
+    )
+
+    load_mock = mock.Mock(wraps=seddy_specs_io._load_specs)
+    load_patch = mock.patch.object(seddy_specs_io, "_load_specs", load_mock)
+
+    # Run function
+    with construct_patch, load_patch:
+        res = seddy_specs_io.get_workflow("spam", "1.1", workflows_dir)
+
+    # Check result
+    assert (res.name, res.version) == ("spam", "1.1")
+    construct_mock.assert_called_once()
+    assert load_mock.call_count == 2
+
+
+class TestWorkflowRegistry:
+    """Test ``seddy._specs._io.WorkflowRegistry``."""
+
+    @pytest.fixture
+    def workflows_file(self, tmp_path, workflows_spec):
+        workflows_spec["workflows"].append(
+            {**workflows_spec["workflows"][0], "version": "1.1"}
+        )
+        workflows_file = tmp_path / "workflows.json"
+        workflows_file.write_text(json.dumps(workflows_spec))
+        return workflows_file
+
+    def test_get(self, workflows_file):
+        """Test workflows are loaded and set up once."""
+        # Setup environment
+        load_mock = mock.Mock(wraps=seddy_specs_io.load_workflows)
+        load_patch = mock.patch.object(seddy_specs_io, "load_workflows", load_mock)
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file)
+        assert not instance.loaded
+
+        # Run function
+        with load_patch:
+            res_10 = instance.get("spam", "1.0")
+            res_11 = instance.get("spam", "1.1")
+            assert instance.get("spam", "1.0") is res_10
+
+        # Check result
+        load_mock.assert_called_once_with(workflows_file)
+        assert instance.loaded
+        assert len(instance) == 2
+        assert list(instance) == [res_10, res_11]
+        assert isinstance(res_10, seddy_specs.DAGWorkflow)
+        assert (res_10.name, res_10.version) == ("spam", "1.0")
+        assert (res_11.name, res_11.version) == ("spam", "1.1")
+        assert res_10.dependants == {None: ["foo"], "foo": []}
+
+    def test_get_lazy(self, workflows_file, workflows_spec):
+        """Test lazy workflows are indexed, then constructed on first lookup."""
+        # Setup environment
+        construct_mock = mock.Mock(wraps=seddy_specs_io._construct_workflow)
+        construct_patch = mock.patch.object(
+            seddy_specs_io, "_construct_workflow", construct_mock
+        )
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file, lazy=True)
+
+        # Run function
+        with construct_patch:
+            instance.load()
+            assert construct_mock.call_count == 0
+            assert len(instance) == 2
+
+            res_11 = instance.get("spam", "1.1")
+            assert instance.get("spam", "1.1") is res_11
+            assert construct_mock.call_count == 1
+
+            workflows_spec["workflows"].insert(0, {"name": "eggs", "version": "1"})
+            workflows_file.write_text(json.dumps(workflows_spec))
+            res_10 = instance.get("spam", "1.0")
+
+        # Check result
+        assert (res_11.name, res_11.version) == ("spam", "1.1")
+        assert (res_10.name, res_10.version) == ("spam", "1.0")
+        assert res_10.dependants == {None: ["foo"], "foo": []}
+        assert list(instance) == [res_10, res_11]
+
+    def test_get_lazy_missing(self, workflows_file, workflows_spec):
+        """Test lazy workflow removed since indexing raises."""
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file, lazy=True)
+        instance.load()
+        workflows_spec["workflows"].pop()
+        workflows_file.write_text(json.dumps(workflows_spec))
+        with pytest.raises(seddy_specs_io.WorkflowNotFound):
+            instance.get("spam", "1.1")
+        with pytest.raises(seddy_specs_io.WorkflowNotFound):
+            instance.get("spam", "1.2")
+
+    def test_load_lazy_keeps_unchanged(self, workflows_file, workflows_spec):
+        """Test lazy reload keeps set-up workflows with unchanged specs."""
+        # Setup environment
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file, lazy=True)
+        res_10 = instance.get("spam", "1.0")
+        res_11 = instance.get("spam", "1.1")
+        task_spec = {**workflows_spec["workflows"][1]["tasks"][0], "heartbeat": 42}
+        workflows_spec["workflows"][1]["tasks"] = [task_spec]
+        workflows_file.write_text(json.dumps(workflows_spec))
+
+        # Run function
+        instance.load()
+
+        # Check result
+        assert instance.get("spam", "1.0") is res_10
+        res_11_reloaded = instance.get("spam", "1.1")
+        assert res_11_reloaded is not res_11
+        assert res_11_reloaded.task_specs[0].heartbeat == 42
+
+    def test_get_lazy_while_loading(self, workflows_file):
+        """Test lazy workflow lookups aren't blocked by indexing on reload."""
+        # Setup environment
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file, lazy=True)
+        instance.load()
+        indexing = threading.Event()
+        indexed = threading.Event()
+        index_workflows = seddy_specs_io._index_workflows
+
+        def index_workflows_slowly(*args):
+            indexing.set()
+            indexed.wait(5.0)
+            return index_workflows(*args)
+
+        index_patch = mock.patch.object(
+            seddy_specs_io, "_index_workflows", index_workflows_slowly
+        )
+        thread = threading.Thread(target=instance.load)
+
+        # Run function
+        with index_patch:
+            thread.start()
+            assert indexing.wait(5.0)
+            res = instance.get("spam", "1.1")
+            assert not indexed.is_set()
+            indexed.set()
+            thread.join()
+
+        # Check result
+        assert res.version == "1.1"
+        assert instance.get("spam", "1.1") is res
+
+    def test_changed_directory(self, workflows_dir, workflows_spec):
+        """Test workflows specifications files added to directory are detected."""
+        instance = seddy_specs_io.WorkflowRegistry(workflows_dir, lazy=True)
+        instance.load()
+        assert not instance.changed
+        workflows_spec["workflows"][0]["version"] = "1.2"
+        (workflows_dir / "c.json").write_text(json.dumps(workflows_spec))
+        assert instance.changed
+        assert instance.reload()
+        assert instance.get("spam", "1.2").version == "1.2"
+
+    @pytest.mark.parametrize(("name", "version"), [("eggs", "1.0"), ("spam", "1.2")])
+    def test_get_missing(self, workflows_file, name, version):
+        """Test getting missing workflow raises."""
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file)
+        with pytest.raises(seddy_specs_io.WorkflowNotFound) as e:
+            instance.get(name, version)
+        assert name in str(e.value)
+        assert version in str(e.value)
+
+    def test_load(self, workflows_file, workflows_spec):
+        """Test workflows are reloaded explicitly."""
+        # Setup environment
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file)
+        instance.load()
+        workflows_spec["workflows"][0]["version"] = "1.2"
+        workflows_file.write_text(json.dumps(workflows_spec))
+        assert instance.get("spam", "1.0")
+
+        # Run function
+        instance.load()
+
+        # Check result
+        assert instance.get("spam", "1.2")
+        with pytest.raises(seddy_specs_io.WorkflowNotFound):
+            instance.get("spam", "1.0")
+
+    def test_from_workflows(self):
+        """Test registry construction from workflows, ignoring duplicates."""
+        # Build input
+        workflows = [
+            mock.Mock(spec=seddy_specs.Workflow),
+            mock.Mock(spec=seddy_specs.Workflow),
+            mock.Mock(spec=seddy_specs.Workflow),
+        ]
+        for workflow, version in zip(workflows, ["1.0", "1.1", "1.0"]):
+            workflow.name = "spam"
+            workflow.version = version
+
+        # Run function
+        res = seddy_specs_io.WorkflowRegistry.from_workflows(workflows)
+
+        # Check result
+        assert res.loaded
+        assert res.get("spam", "1.0") is workflows[0]
+        assert res.get("spam", "1.1") is workflows[1]
+        workflows[0].setup.assert_called_once_with()
+        workflows[2].setup.assert_not_called()
+
+    def test_reload(self, workflows_file, workflows_spec):
+        """Test workflows changes are detected and reloaded, keeping on error."""
+        # Setup environment
+        instance = seddy_specs_io.WorkflowRegistry(workflows_file)
+        instance.load()
+        assert not instance.changed
+        workflows_spec["workflows"][0]["version"] = "1.2"
+        workflows_file.write_text(json.dumps(workflows_spec) + "\n")
+        assert instance.changed
+
+        # Run function
+        assert instance.reload()
+        workflows_file.write_text("{")
+        assert instance.changed
+        assert not instance.reload()
+        assert not instance.changed  # failed change isn't retried
+        workflows_file.write_text("{ ")
+        assert instance.changed
+
+        # Check result
+        assert instance.get("spam", "1.2")
+        with pytest.raises(seddy_specs_io.WorkflowNotFound):
+            instance.get("spam", "1.0")
+
+
+def test_registry_watcher():
+    """Test workflows registry is reloaded in the background when triggered."""
+    # Setup environment
+    registry = mock.Mock(spec=seddy_specs_io.WorkflowRegistry)
+    registry.changed = False
+    reloaded = threading.Event()
+    registry.reload.side_effect = reloaded.set
+    instance = seddy_specs_io.RegistryWatcher(registry, 0.01)
+
+    # Run function
+    instance.start()
+    try:
+        assert not reloaded.wait(0.05)
+        instance.trigger()
+        assert reloaded.wait(1.0)
+    finally:
+        instance.stop()
+    instance._thread.join(1.0)
+
+    # Check result
+    registry.reload.assert_called_once_with()
+    assert not instance._thread.is_alive()